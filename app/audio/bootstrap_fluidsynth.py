@@ -6,6 +6,10 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Tuple
 
+from app.audio.log import get_channel
+
+_log = get_channel('fluidsynth')
+
 DLL_DIR = Path(__file__).resolve().parent.parent.parent / 'fluidsynth_dlls'
 POSSIBLE_DLLS = [
     'libfluidsynth-3.dll',
@@ -44,7 +48,7 @@ def _select_dll(dir_path: Path) -> Path:
     for name in POSSIBLE_DLLS:
         cand = dir_path / name
         if cand.exists():
-            print(f'[fluidsynth] Using DLL candidate: {cand.name}')
+            _log.info('Using DLL candidate: %s', cand.name)
             os.environ['PYFLUIDSYNTH_LIB'] = str(cand)
             return cand
     available = sorted(p.name for p in dir_path.glob('*.dll'))
@@ -52,17 +56,17 @@ def _select_dll(dir_path: Path) -> Path:
 
 
 def _report_dependencies(dir_path: Path) -> None:
-    print('[fluidsynth] Checking dependent DLLs...')
+    _log.debug('Checking dependent DLLs...')
     missing = []
     for dep in COMMON_DEPS:
         if (dir_path / dep).exists():
-            print(f'   OK  {dep}')
+            _log.debug('   OK  %s', dep)
         else:
-            print(f'   MISSING  {dep}')
+            _log.debug('   MISSING  %s', dep)
             missing.append(dep)
     if missing:
-        print('[fluidsynth] Missing dependencies: ' + ', '.join(missing))
-        print('   Suggested: copy full FluidSynth release or install via conda-forge.')
+        _log.warn('Missing dependencies: %s', ', '.join(missing))
+        _log.warn('Suggested: copy full FluidSynth release or install via conda-forge.')
 
 
 @contextmanager
@@ -105,7 +109,7 @@ def _try_alternative_load(dll_path: Path) -> None:
     try:
         with _temporary_cwd(dll_path.parent):
             ctypes.CDLL(dll_path.name)
-            print('[fluidsynth] Alternative ctypes load succeeded.')
+            _log.info('Alternative ctypes load succeeded.')
     except Exception as exc:
         raise RuntimeError(f'Alternative ctypes load failed: {exc}')
 
@@ -122,7 +126,7 @@ def bootstrap():
 
     ok, detail = _check_dll_dependencies(dll_path)
     if not ok:
-        print(f"[fluidsynth] DLL dependency check failed: {detail}")
+        _log.warn('DLL dependency check failed: %s', detail)
         _try_alternative_load(dll_path)
 
     try:
@@ -131,5 +135,5 @@ def bootstrap():
         raise ImportError('pyFluidSynth is not available. Install with "pip install pyFluidSynth".') from exc
 
     _FLUIDSYNTH_MODULE = fluidsynth
-    print('[fluidsynth] Module imported successfully.')
+    _log.info('Module imported successfully.')
     return fluidsynth
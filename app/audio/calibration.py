@@ -0,0 +1,142 @@
+"""Per-pad velocity calibration curves.
+
+A calibration entry describes how one hardware pad responds: the velocity it
+sends for a soft and for a hard hit, plus optional extra captures. Fitting an
+entry yields a 128-entry input curve that maps the pad's raw velocities onto a
+common range, so pads with very different sensitivity play evenly. Curves are
+installed in the engine with ``SoundEngine.set_pad_curves`` and composed into
+its velocity tables, so a hit still costs a single table read.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+CURVE_MODES = ("linear", "gamma", "piecewise")
+
+SOFT_TARGET = 32
+MEDIUM_TARGET = 80
+HARD_TARGET = 120
+
+Curve = Tuple[int, ...]
+Point = Tuple[int, int]
+
+
+def _clamp_vel(value: float) -> int:
+    return int(max(1, min(127, round(value))))
+
+
+def _anchors(soft: int, hard: int, points: Iterable[Sequence[int]] = ()) -> List[Point]:
+    soft = int(soft)
+    hard = int(hard)
+    if not 1 <= soft < hard <= 127:
+        raise ValueError(f"Calibracion invalida: suave={soft} fuerte={hard}")
+    anchors = {soft: SOFT_TARGET, hard: HARD_TARGET}
+    for point in points:
+        raw, target = int(point[0]), int(point[1])
+        if 1 <= raw <= 127 and raw not in anchors:
+            anchors[raw] = _clamp_vel(target)
+    return sorted(anchors.items())
+
+
+def _fit_linear(anchors: List[Point]) -> Curve:
+    n = len(anchors)
+    mean_x = sum(x for x, _ in anchors) / n
+    mean_y = sum(y for _, y in anchors) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in anchors)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in anchors)
+    slope = sxy / sxx if sxx else 1.0
+    offset = mean_y - slope * mean_x
+    return (0,) + tuple(_clamp_vel(offset + slope * vel) for vel in range(1, 128))
+
+
+def _fit_gamma(anchors: List[Point], hard: int) -> Curve:
+    # out = HARD_TARGET * (vel / hard) ** g, g por minimos cuadrados en escala log
+    num = 0.0
+    den = 0.0
+    for x, y in anchors:
+        if x == hard:
+            continue
+        lx = math.log(x / hard)
+        num += lx * math.log(y / HARD_TARGET)
+        den += lx * lx
+    exponent = num / den if den else 1.0
+    exponent = max(0.1, min(10.0, exponent))
+    return (0,) + tuple(
+        _clamp_vel(HARD_TARGET * math.pow(vel / hard, exponent)) for vel in range(1, 128)
+    )
+
+
+def _fit_piecewise(anchors: List[Point]) -> Curve:
+    knots = [(0, 0)] + anchors
+    if knots[-1][0] < 127:
+        knots.append((127, 127))
+    # Forzar monotonia: un golpe mas fuerte nunca suena mas suave
+    for i in range(1, len(knots)):
+        if knots[i][1] < knots[i - 1][1]:
+            knots[i] = (knots[i][0], knots[i - 1][1])
+    curve = [0] * 128
+    seg = 0
+    for vel in range(1, 128):
+        while seg < len(knots) - 2 and vel > knots[seg + 1][0]:
+            seg += 1
+        (x0, y0), (x1, y1) = knots[seg], knots[seg + 1]
+        t = (vel - x0) / (x1 - x0) if x1 != x0 else 1.0
+        curve[vel] = _clamp_vel(y0 + (y1 - y0) * t)
+    return tuple(curve)
+
+
+def fit_curve(soft: int, hard: int, mode: str = "linear", points: Iterable[Sequence[int]] = ()) -> Curve:
+    """Fit an input curve from the soft/hard anchors and optional extra captures."""
+    anchors = _anchors(soft, hard, points)
+    if mode == "linear":
+        return _fit_linear(anchors)
+    if mode == "gamma":
+        return _fit_gamma(anchors, int(hard))
+    if mode == "piecewise":
+        return _fit_piecewise(anchors)
+    raise ValueError(f"Modo de curva desconocido: {mode}")
+
+
+def normalize_profile(profile: Mapping) -> Dict[int, dict]:
+    """Return ``{pad_index: entry}`` for both the per-pad and the legacy flat layout."""
+    if "pads" in profile:
+        pads = profile.get("pads") or {}
+        return {int(pad): dict(entry) for pad, entry in pads.items()}
+    if "pad" in profile:
+        return {int(profile["pad"]): dict(profile)}
+    return {}
+
+
+def compile_profile(profile: Mapping) -> Tuple[Dict[int, Curve], List[int]]:
+    """Fit every pad of a profile; return ``({note: curve}, skipped_pads)``.
+
+    Entries saved before the MIDI note was recorded cannot be mapped to the
+    incoming messages and are reported as skipped.
+    """
+    curves: Dict[int, Curve] = {}
+    skipped: List[int] = []
+    for pad, entry in sorted(normalize_profile(profile).items()):
+        note = entry.get("note")
+        try:
+            if note is None:
+                raise ValueError("sin nota MIDI")
+            curves[int(note)] = fit_curve(
+                entry["soft"],
+                entry["hard"],
+                entry.get("mode", "linear"),
+                entry.get("points", ()),
+            )
+        except (KeyError, TypeError, ValueError):
+            skipped.append(pad)
+    return curves, skipped
+
+
+def apply_profile(engine, profile: Mapping | None) -> List[int]:
+    """Install a profile's curves in the engine (``None`` clears them)."""
+    if profile is None:
+        engine.set_pad_curves({})
+        return []
+    curves, skipped = compile_profile(profile)
+    engine.set_pad_curves(curves)
+    return skipped
@@ -0,0 +1,209 @@
+"""Low-latency note dispatch between the MIDI/GUI threads and the render thread."""
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import Callable
+
+EV_OFF = 0
+EV_ON = 1
+# marca en el anillo: hay un lote de control (escena) esperando en la cola aparte
+EV_CTL = 2
+# note_off automatico: la nota se suelta cuando el reloj llega al sello del registro (en el
+# anillo de golpes con sello, el sello es el gate del golpe anterior de la nota)
+EV_OFF_AT = 3
+
+# "sequencer": golpes con sello de captura, a un retardo fijo via el secuenciador de FluidSynth
+DISPATCH_MODES = ("ring", "direct", "sequencer")
+DEFAULT_DISPATCH = "ring"
+DISPATCH_LABELS = {
+    "ring": "Inmediato (minima latencia)",
+    "direct": "Directo desde el hilo MIDI",
+    "sequencer": "Con sello de tiempo (+1 periodo de audio)",
+}
+
+
+class EventRing:
+    """Preallocated ring buffer of fixed-size note events.
+
+    Records live in parallel lists sized once at construction, so pushing a
+    hit never allocates. There is a single consumer (the render thread).
+    Producers are the MIDI callback and the GUI thread; they are serialised by
+    a plain ``Lock`` that is practically never contended. An idle consumer
+    parks on a second bare ``Lock`` used as a binary semaphore: the producer
+    that finds it parked releases it, which is a single OS-level wake-up.
+    ``queue.Queue`` and ``threading.Event`` go through a ``Condition`` instead,
+    which allocates a waiter lock per wait and takes its mutex again on both
+    sides of the hand-off. Producers pay nothing when the consumer is busy.
+    """
+
+    __slots__ = (
+        "capacity",
+        "_mask",
+        "kind",
+        "note",
+        "vel",
+        "stamp",
+        "_head",
+        "_tail",
+        "_parked",
+        "_wake",
+        "_push_lock",
+        "dropped",
+    )
+
+    def __init__(self, capacity: int = 1024) -> None:
+        size = 1
+        while size < max(2, int(capacity)):
+            size <<= 1
+        self.capacity = size
+        self._mask = size - 1
+        self.kind = [0] * size
+        self.note = [0] * size
+        self.vel = [0] * size
+        self.stamp = [0] * size
+        self._head = 0
+        self._tail = 0
+        self._parked = False
+        # tomado mientras nadie espera: push lo suelta para despertar al consumidor
+        self._wake = threading.Lock()
+        self._wake.acquire()
+        self._push_lock = threading.Lock()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def push(self, kind: int, note: int, vel: int, stamp: int = 0) -> bool:
+        with self._push_lock:
+            head = self._head
+            if head - self._tail >= self.capacity:
+                self.dropped += 1
+                return False
+            idx = head & self._mask
+            self.kind[idx] = kind
+            self.note[idx] = note
+            self.vel[idx] = vel
+            self.stamp[idx] = stamp
+            self._head = head + 1
+            if self._parked:
+                self._parked = False
+                self._wake.release()
+        return True
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until at least one event is pending; return False on timeout.
+
+        There is no spin: a ``sleep(0)`` loop costs tens of microseconds per
+        turn and fights the producer for the GIL, which made the tail worse
+        than parking right away.
+        """
+        if self._head != self._tail:
+            return True
+        with self._push_lock:
+            if self._head != self._tail:
+                return True
+            self._parked = True
+        if self._wake.acquire(timeout=-1 if timeout is None else max(0.0, timeout)):
+            return True
+        with self._push_lock:
+            if self._parked:
+                self._parked = False
+            else:
+                # un push lo solto justo despues del timeout: se vuelve a tomar
+                self._wake.acquire()
+        return self._head != self._tail
+
+    def drain(self, handler: Callable[[int, int, int, int], None]) -> int:
+        """Feed every pending record to ``handler`` and release the slots."""
+        start = tail = self._tail
+        head = self._head
+        mask = self._mask
+        kind = self.kind
+        note = self.note
+        vel = self.vel
+        stamp = self.stamp
+        while tail != head:
+            idx = tail & mask
+            handler(kind[idx], note[idx], vel[idx], stamp[idx])
+            tail += 1
+            self._tail = tail
+        return tail - start
+
+
+class NoteOffQueue:
+    """Automatic note_offs pending on the render thread, ordered by due time.
+
+    A heap of ``(due_ns, note)`` with the latest due time of every note on the
+    side: a newer hit of the note (``cancel``) or a newer auto-off
+    (``schedule``) supersedes the entries already in the heap, which are then
+    skipped when they come up.
+
+    ``schedule``, ``next_due`` and ``fire`` belong to one thread (the render
+    thread, or the audio callback for sequencer ticks). ``cancel`` comes from
+    whichever thread plays the hit, which in "direct" mode is the MIDI
+    callback. Both ``cancel`` and the check-and-release of each entry in
+    ``fire`` hold ``_lock``: either the old note_off is out before ``cancel``
+    returns (so before the new note_on), or ``fire`` sees it cancelled. The
+    lock is never contended outside "direct" mode. ``release`` must not call
+    ``cancel``.
+    """
+
+    __slots__ = ("_heap", "_due", "_lock", "fired", "late_max_ns")
+
+    def __init__(self) -> None:
+        self._heap = []
+        self._due = [0] * 128
+        self._lock = threading.Lock()
+        self.fired = 0
+        self.late_max_ns = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, note: int, due_ns: int) -> None:
+        self._due[note] = due_ns
+        heapq.heappush(self._heap, (due_ns, note))
+
+    def cancel(self, note: int) -> None:
+        with self._lock:
+            self._due[note] = 0
+
+    def pending(self, note: int) -> int:
+        """Due time of the live entry of ``note``, 0 when there is none."""
+        return self._due[note]
+
+    def next_due(self) -> int:
+        """Due time of the next live entry, 0 when there is none."""
+        heap = self._heap
+        due = self._due
+        while heap and due[heap[0][1]] != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else 0
+
+    def timeout(self, now_ns: int) -> float | None:
+        """Seconds until the next entry is due (for ``EventRing.wait``)."""
+        nxt = self.next_due()
+        if not nxt:
+            return None
+        return max(0.0, (nxt - now_ns) / 1e9)
+
+    def fire(self, now_ns: int, release: Callable[[int, int], None]) -> int:
+        """Call ``release(note, due_ns)`` for every entry due at ``now_ns``; return how many."""
+        heap = self._heap
+        due = self._due
+        lock = self._lock
+        fired = 0
+        while heap and heap[0][0] <= now_ns:
+            when, note = heapq.heappop(heap)
+            with lock:
+                if due[note] != when:
+                    continue
+                due[note] = 0
+                release(note, when)
+            late = now_ns - when
+            if late > self.late_max_ns:
+                self.late_max_ns = late
+            fired += 1
+        self.fired += fired
+        return fired
@@ -0,0 +1,180 @@
+"""Audio driver selection with a remembered last-working driver."""
+from __future__ import annotations
+
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.audio.log import get_channel
+
+_log = get_channel("driver")
+
+PLATFORM_DRIVERS: Dict[str, List[str]] = {
+    "win": ["wasapi", "dsound", "winmm"],
+    # con un servidor de sonido activo, ALSA directo suele fallar o acaparar el dispositivo
+    "linux": ["pipewire", "pulseaudio", "alsa", "jack"],
+    "darwin": ["coreaudio", "portaudio"],
+}
+FALLBACK_DRIVERS = ["portaudio", "sdl2", "sdl3"]
+
+# Ajustes de FluidSynth que se recuerdan junto con el driver
+DRIVER_SETTINGS = {
+    "period_size": "audio.period-size",
+    "periods": "audio.periods",
+    "sample_rate": "synth.sample-rate",
+}
+
+
+def platform_drivers(platform: str = sys.platform) -> List[str]:
+    for prefix, drivers in PLATFORM_DRIVERS.items():
+        if platform.startswith(prefix):
+            return list(drivers)
+    return list(FALLBACK_DRIVERS)
+
+
+def _read_setting(fs, name: str):
+    getter = getattr(fs, "get_setting", None)
+    if getter is None:
+        return None
+    try:
+        return getter(name)
+    except Exception:
+        return None
+
+
+def _apply_setting(fs, name: str, value) -> None:
+    setter = getattr(fs, "setting", None)
+    if setter is None or value is None:
+        return
+    try:
+        setter(name, value)
+    except Exception as exc:
+        _log.warn("No se pudo aplicar %s=%s: %s", name, value, exc)
+
+
+def _release_driver(fs) -> None:
+    """Delete a half-created audio driver so a failed attempt leaves nothing behind."""
+    handle = getattr(fs, "audio_driver", None)
+    if not handle:
+        return
+    try:
+        import fluidsynth  # type: ignore
+
+        fluidsynth.delete_fluid_audio_driver(handle)
+    except Exception:
+        pass
+    fs.audio_driver = None
+
+
+def _driver_started(fs) -> bool:
+    # pyFluidSynth no lanza excepcion si new_fluid_audio_driver devuelve NULL
+    return bool(getattr(fs, "audio_driver", True))
+
+
+class DriverSelector:
+    """Starts FluidSynth's audio output, trying the remembered driver first.
+
+    ``cached`` is the ``audio_driver`` entry of the config (driver name plus
+    period size, period count and sample rate). Only when that driver fails is
+    the full platform list probed; every attempt is timed in ``timings``.
+    ``preferred`` buffer settings (a latency profile) override the remembered
+    ones.
+    """
+
+    def __init__(
+        self,
+        cached: Optional[dict] = None,
+        platform: str = sys.platform,
+        preferred: Optional[dict] = None,
+    ) -> None:
+        self.cached = dict(cached) if cached else None
+        self.platform = platform
+        self.preferred = dict(preferred) if preferred else {}
+        self.timings: List[dict] = []
+        self.selected: Optional[dict] = None
+
+    def candidates(self) -> List[str]:
+        order = platform_drivers(self.platform)
+        if self.cached and self.cached.get("driver"):
+            first = self.cached["driver"]
+            order = [first] + [drv for drv in order if drv != first]
+        return order
+
+    def settings_for(self, driver: str) -> dict:
+        settings = {}
+        if self.cached and self.cached.get("driver") == driver:
+            settings = {key: self.cached.get(key) for key in DRIVER_SETTINGS}
+        for key in DRIVER_SETTINGS:
+            if self.preferred.get(key) is not None:
+                settings[key] = self.preferred[key]
+        return settings
+
+    def sample_rate(self) -> Optional[float]:
+        """Sample rate to create the synth with, so it matches the output driver."""
+        rate = self.preferred.get("sample_rate")
+        if rate is None and self.cached:
+            rate = self.cached.get("sample_rate")
+        return float(rate) if rate else None
+
+    def _attempt(self, fs, driver: str, start: Callable[[str], None]) -> bool:
+        t0 = time.perf_counter()
+        error = None
+        try:
+            for key, value in self.settings_for(driver).items():
+                # la frecuencia se fija al crear el Synth (ver sample_rate())
+                if key != "sample_rate":
+                    _apply_setting(fs, DRIVER_SETTINGS[key], value)
+            start(driver)
+            ok = _driver_started(fs)
+            if not ok:
+                error = "driver no creado"
+        except Exception as exc:
+            ok = False
+            error = str(exc)
+        if not ok:
+            _release_driver(fs)
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        self.timings.append({"driver": driver, "ms": round(elapsed, 2), "ok": ok, "error": error})
+        if ok:
+            _log.info("Driver de audio cargado: %s (%.1f ms)", driver, elapsed)
+        else:
+            _log.warn("Driver %s falló en %.1f ms: %s", driver, elapsed, error)
+        return ok
+
+    def start(self, fs, start: Optional[Callable[[str], None]] = None) -> dict:
+        """Start the first working driver and return its description."""
+        start = start or (lambda driver: fs.start(driver=driver))
+        candidates = self.candidates()
+        if self.cached and self._attempt(fs, candidates[0], start):
+            return self._remember(fs, candidates[0])
+        if self.cached:
+            _log.warn("El driver recordado (%s) falló; se vuelve a sondear", candidates[0])
+            candidates = candidates[1:]
+        for driver in candidates:
+            if self._attempt(fs, driver, start):
+                return self._remember(fs, driver)
+        raise RuntimeError("No se pudo cargar ningún driver de audio")
+
+    def restart(self, fs, preferred: dict, start: Optional[Callable[[str], None]] = None) -> dict:
+        """Tear down the running driver and start it again with new buffer settings."""
+        self.preferred = dict(preferred)
+        start = start or (lambda driver: fs.start(driver=driver))
+        driver = (self.selected or {}).get("driver")
+        _release_driver(fs)
+        if driver and self._attempt(fs, driver, start):
+            return self._remember(fs, driver)
+        return self.start(fs, start)
+
+    def _remember(self, fs, driver: str) -> dict:
+        info = {"driver": driver}
+        previous = self.settings_for(driver)
+        for key, name in DRIVER_SETTINGS.items():
+            value = _read_setting(fs, name)
+            info[key] = value if value is not None else previous.get(key)
+        self.selected = info
+        return info
+
+    def report(self) -> str:
+        return ", ".join(
+            f"{t['driver']}={'ok' if t['ok'] else 'falla'} {t['ms']:.1f}ms" for t in self.timings
+        )
@@ -27,12 +27,18 @@ try:
 except Exception:
     fluidsynth = None
 
+from app.audio.dispatch import NoteOffQueue
+
 class SoundEngine:
     """API compatible con la legacy, pero segura si no hay FluidSynth."""
     def __init__(self, sf2: Path):
         self.fs = None
         self.q = queue.Queue()
+        # note_off automaticos: los dispara el hilo de _render, sin un Timer por golpe
+        self.note_offs = NoteOffQueue()
         self.ok = threading.Event()
+        self._setup_done = threading.Event()
+        self.error = None
         self.master_db = 20.0
         self.master_linear = 10 ** (self.master_db/20.0)
         self.limiter_enabled = False
@@ -47,30 +53,50 @@ class SoundEngine:
         self.sfid = None
         threading.Thread(target=self._setup, args=(sf2,), daemon=True).start()
         threading.Thread(target=self._render, daemon=True).start()
-        time.sleep(0.3)
+
+    def wait_ready(self, timeout=None) -> bool:
+        self._setup_done.wait(timeout)
+        if self.error:
+            raise RuntimeError(f"Error inicializando audio: {self.error}")
+        return self.ok.is_set()
 
     def _setup(self, sf2):
-        if fluidsynth is None:
-            self.fs = _DummyFS()
-        else:
-            self.fs = fluidsynth.Synth()
-            self.fs.start(driver="dsound" if sys.platform.startswith("win") else "alsa")
-        self.sfid = self.fs.sfload(str(sf2))
-        self.fs.program_select(0, self.sfid, 0, 0)
-        for ch in range(16):
-            try:
-                self.fs.cc(ch, 7, 127)
-                self.fs.cc(ch, 11, 127)
-            except Exception:
-                pass
-        self.ok.set()
+        try:
+            if fluidsynth is None:
+                self.fs = _DummyFS()
+            else:
+                self.fs = fluidsynth.Synth()
+                self.fs.start(driver="dsound" if sys.platform.startswith("win") else "alsa")
+            self.sfid = self.fs.sfload(str(sf2))
+            self.fs.program_select(0, self.sfid, 0, 0)
+            for ch in range(16):
+                try:
+                    self.fs.cc(ch, 7, 127)
+                    self.fs.cc(ch, 11, 127)
+                except Exception:
+                    pass
+            self.ok.set()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._setup_done.set()
 
     def _render(self):
+        offs = self.note_offs
         while True:
-            typ, note, vel = self.q.get()
-            if not self.ok.is_set():
+            try:
+                typ, note, vel = self.q.get(timeout=offs.timeout(time.perf_counter_ns()))
+            except queue.Empty:
+                typ = None
+            if offs:
+                offs.fire(time.perf_counter_ns(), self._release_note)
+            if typ is None or not self.ok.is_set():
+                continue
+            if typ == "off_at":
+                offs.schedule(note, vel)
                 continue
             if typ == "on":
+                offs.cancel(note)
                 for ch in range(1):
                     try: self.fs.noteon(ch, note, vel)
                     except Exception: pass
@@ -79,7 +105,13 @@ class SoundEngine:
                     try: self.fs.noteoff(ch, note)
                     except Exception: pass
 
-    def disparar(self, msg):
+    def _release_note(self, note, due_ns=0):
+        if not self.ok.is_set():
+            return
+        try: self.fs.noteoff(0, note)
+        except Exception: pass
+
+    def disparar(self, msg, auto_off_ms=None):
         t = getattr(msg, "type", None)
         if t == "control_change":
             try: self.fs.cc(getattr(msg, "channel", 0), msg.control, msg.value)
@@ -94,6 +126,9 @@ class SoundEngine:
                 ceiling = int(max(1, min(127, round(self.limiter_ceiling * 127))))
                 if v > ceiling: v = ceiling
             self.q.put(("on", msg.note, v))
+            if auto_off_ms:
+                due = time.perf_counter_ns() + int(max(1, auto_off_ms) * 1e6)
+                self.q.put(("off_at", msg.note, due))
         elif t in ("note_off", "note_on"):
             self.q.put(("off", msg.note, 0))
 
@@ -2,85 +2,219 @@
 from __future__ import annotations
 
 import math
-import queue
 import threading
 import time
+from collections import deque
 from pathlib import Path
-
-from mido import Message
+from typing import TYPE_CHECKING
 
 from app.audio.bootstrap_fluidsynth import bootstrap
+from app.audio.dispatch import DEFAULT_DISPATCH, DISPATCH_MODES, EV_CTL, EV_OFF, EV_OFF_AT, EV_ON, EventRing, NoteOffQueue
+from app.audio.drivers import DriverSelector
+from app.audio.latency import DEFAULT_PROFILE, LATENCY_PROFILES, buffer_latency_ms, get_profile
+from app.audio.log import get_channel
+from app.audio import scenes
+from app.audio.scenes import Scene
+from app.audio.sf2_loader import DEFAULT_LOADING, LOADING_MODES, READ_SHARE, SoundFontLoad, preread, rss_bytes
+from app.audio.timing import SCHEDULE_MARGIN_MS, StreamClock
+from app.audio.velocity import build_velocity_table, compose
+from app.audio.voices import ALT_CHANNELS, GEN_VOLENVRELEASE, OUTPUT_GROUPS, PAD_GROUPS, VoiceManager, VoicePolicy
+from app.startup import PROFILE
+
+if TYPE_CHECKING:
+    from mido import Message
+
+    from app.audio.offline import OfflineResult
+
+_log = get_channel("engine")
+_master_log = get_channel("master")
+_vol_log = get_channel("vol")
+
+# canales que suenan: 1..PAD_GROUPS para los pads, 0 para el resto de las notas, y su
+# canal hermano para ahogar redobles (app.audio.voices)
+CC_CHANNELS = tuple(range(PAD_GROUPS + 1)) + ALT_CHANNELS
+# canales mudos del modo "dynamic": el preset nuevo se preselecciona en PRELOAD (carga sus
+# muestras fuera del hilo de audio) y el anterior queda tomado en HOLD hasta despues del cambio
+PRELOAD_CHANNEL = 14
+HOLD_CHANNEL = 13
 
-fluidsynth = bootstrap()
 
 class SoundEngine:
-    def __init__(self, sf2: Path):
+    def __init__(
+        self,
+        sf2: Path,
+        dispatch_mode: str = DEFAULT_DISPATCH,
+        driver_cache: dict | None = None,
+        latency_profile: str | None = None,
+        sample_loading: str | None = None,
+        active_notes=(),
+        offline: bool = False,
+        voice_policy: VoicePolicy | None = None,
+        schedule_ms: float | None = None,
+    ):
+        if dispatch_mode not in DISPATCH_MODES:
+            raise ValueError(f"Modo de despacho desconocido: {dispatch_mode}")
+        # sin driver de audio: el audio sale de render() (ver app.audio.offline)
+        self.offline = bool(offline)
+        if self.offline:
+            dispatch_mode = "direct"
+        # estrategia de memoria de muestras (ver sf2_loader.LOADING_MODES)
+        self.sample_loading = sample_loading if sample_loading in LOADING_MODES else DEFAULT_LOADING
         self.fs = None
-        self.q = queue.Queue()
+        # "ring": golpes via EventRing al hilo de render; "direct": noteon en el hilo del llamador;
+        # "sequencer": al sello de captura + un retardo fijo (app.audio.timing)
+        self.dispatch_mode = dispatch_mode
+        self.ring = EventRing()
+        # golpes con sello: los agenda el callback de audio en el secuenciador
+        self.timed = EventRing()
+        self._seq = None
+        self._seq_dest = None
+        self.stream_clock = None
+        # retardo fijo de los golpes con sello (None = un periodo de audio + margen)
+        self.schedule_ms = float(schedule_ms) if schedule_ms is not None else None
+        self._delay_ns = 0
+        self.late_events = 0
+        # note_offs automaticos de disparar(auto_off_ms=...): los suelta el hilo de render
+        # (en offline, el bloque de render al que le toca)
+        self.note_offs = NoteOffQueue()
+        # los del modo secuenciador, en ticks: el callback de audio los pasa al secuenciador
+        # al empezar el bloque en que tocan
+        self.gate_offs = NoteOffQueue()
+        self._hit_ticks = [0] * 128
+        self.latency_profile = latency_profile if latency_profile in LATENCY_PROFILES else DEFAULT_PROFILE
+        self.drivers = DriverSelector(driver_cache, preferred=get_profile(self.latency_profile))
+        self.driver_info = None
         self.ok = threading.Event()
+        self._setup_done = threading.Event()
         self.error = None
         self.master_db = 20.0  # volumen inicial (dB) (antes -6.0)
         self.max_master_db = 30.0
-        self._extra_boost_db = 0.0
-        self._gen_attenuation = None
         self._last_gain_linear = None
-        self._last_extra_db = None
+        # Ganancia post-synth para lo que excede el tope de synth.gain (10.0 = +20 dB).
+        # La crea _setup en su hilo: app.audio.output importa numpy y no se paga al abrir la UI
+        self.output_stage = None
+        self._level_listener = None
+        self._output = None
+        self._driver_start = None
         self.limiter_enabled = False
         self.limiter_ceiling = 0.94
         self.master_linear = math.pow(10.0, self.master_db / 20.0)
-        self.max_layers = 4
-        self.layer_count = 1
-        self.gamma = 1.0
-        self.velocity_gain = 3.0
+        self._gamma = 1.0
+        self._velocity_gain = 3.0
         self.reverb_roomsize = 0.70
         self.reverb_damping = 0.20
         self.reverb_width = 0.90
         self.reverb_level = 0.60
         self.reverb_send = 1.0
         self._reverb_send_prev = self.reverb_send
+        self.reverb_active = True
+        self.brightness = 100
         self.sfid = None
+        self.bank = 0
+        self.program = 0
+        # lotes de escena (grupos, sello) que el hilo de render aplica al ver EV_CTL
+        self._control = deque()
+        self.last_recall = None
+        # ultimo valor escrito por canal/controlador (-1 = desconocido): no se repiten escrituras
+        self._cc_state = [[-1] * 128 for _ in range(16)]
+        self._cc_lock = threading.Lock()
+        # CCs de sliders: el ultimo valor por controlador, volcado una vez por bloque de audio
+        self._cc_pending = {}
+        self._cc_on_block = False
+        self._cc_marked = False
+        self.cc_calls = 0
+        self.cc_skipped = 0
+        # cambios de SoundFont listos para aplicarse entre dos bloques de audio
+        self._swaps = deque()
+        self._sf2_load = None
+        self.sf2_path = Path(sf2)
+        # notas que cubre el subconjunto cargado en modo "notes"
+        self._subset_notes = tuple(sorted({int(n) for n in active_notes}))
+        # SoundFontLibrary opcional (la instala la ventana principal)
+        self.library = None
+        # tope de golpes por nota y polifonia; lo usa solo el hilo de render
+        self.voices = VoiceManager(voice_policy)
+        self.voice_peak = 0
+        self.voice_saturated = 0
+        self._lib = None
+        # reloj de los golpes (el render offline lo reemplaza por el tiempo simulado)
+        self._now_ns = time.perf_counter_ns
         self.lock = threading.Lock()
+        # Curvas de entrada por nota (calibracion) y tablas vel->salida ya compuestas
+        self._pad_curves = {}
+        self._note_tables = []
+        # una reconstruccion a la vez: la ultima en instalarse leyo los ultimos valores
+        self._tables_lock = threading.Lock()
+        self._rebuild_velocity_tables()
+        # Cada pad suena en su propio canal MIDI -> grupo de salida propio para medirlo
+        self.pad_notes = ()
+        self._note_channel = [0] * 128
+        self._sounding_channel = [0] * 128
         # Verificar que el archivo SF2 existe
         if not sf2.exists():
             raise FileNotFoundError(f"Archivo SF2 no encontrado: {sf2}")
 
-        print(f"ðŸŽµ Cargando SoundFont: {sf2}")
+        _log.info("Cargando SoundFont: %s", sf2)
 
         threading.Thread(target=self._setup, args=(sf2,), daemon=True).start()
         threading.Thread(target=self._render, daemon=True).start()
 
-        # Esperar un momento para que se inicialice
-        time.sleep(1)
-
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until FluidSynth and the SoundFont are up; raise if setup failed."""
+        self._setup_done.wait(timeout)
         if self.error:
-            raise Exception(f"Error inicializando audio: {self.error}")
+            raise RuntimeError(f"Error inicializando audio: {self.error}")
+        return self.ok.is_set()
 
     def _setup(self, sf2):
         try:
-            self.fs = fluidsynth.Synth()
-            gen_mod = getattr(fluidsynth, 'generator', None)
-            if gen_mod:
-                try:
-                    self._gen_attenuation = getattr(gen_mod, 'ATTENUATION')
-                except Exception:
-                    self._gen_attenuation = None
-            print("âœ… Sintetizador creado")
-
-            # Probar diferentes drivers
-            drivers = ["wasapi", "dsound", "winmm", "alsa", "pulse", "jack"]
-            driver_loaded = False
+            fluidsynth = bootstrap()
+            PROFILE.mark("DLL bootstrap")
+            from app.audio.offline import OFFLINE_SAMPLE_RATE
+            from app.audio.output import CallbackOutput, OutputStage, fluid_lib
 
-            for drv in drivers:
-                try:
-                    self.fs.start(driver=drv)
-                    print(f"âœ… Driver de audio cargado: {drv}")
-                    driver_loaded = True
-                    break
-                except Exception as e:
-                    print(f"âš  Driver {drv} fallÃ³: {e}")
+            stage = OutputStage()
+            with self.lock:
+                # lo que la UI pidio mientras no habia etapa de salida
+                stage.set_limiter(self.limiter_enabled, self.limiter_ceiling)
+                if stage.meter is not None:
+                    stage.meter.on_activity = self._level_listener
+                self.output_stage = stage
+            rate = OFFLINE_SAMPLE_RATE if self.offline else self.drivers.sample_rate()
+            lib = fluid_lib(fluidsynth)
+            options = {}
+            if rate:
+                options["samplerate"] = rate
+            if lib is not None:
+                # un par estereo por grupo; el canal MIDI c suena en el grupo c % OUTPUT_GROUPS
+                options["synth.audio-channels"] = OUTPUT_GROUPS
+                options["synth.audio-groups"] = OUTPUT_GROUPS
+            if self.sample_loading == "dynamic":
+                options["synth.dynamic-sample-loading"] = 1
+            options["synth.polyphony"] = int(self.voices.policy.polyphony)
+            self.fs = fluidsynth.Synth(**options)
+            self._lib = lib
+            self._cc_state = [[-1] * 128 for _ in range(16)]
+            _log.info("Sintetizador creado")
+            if lib is not None:
+                self.output_stage.set_sample_rate(rate or self._synth_sample_rate())
+                self._output = CallbackOutput(lib, self.fs, self.output_stage, OUTPUT_GROUPS)
+                self._output.before_block = self._on_block
+                self._cc_on_block = True
+                self._driver_start = self._output.start
+                self._rebuild_velocity_tables()
+            else:
+                _log.warn("Sin NumPy/fluid_synth_process: el master queda limitado a +20 dB")
+            if self.dispatch_mode == "sequencer":
+                self._start_sequencer(fluidsynth)
 
-            if not driver_loaded:
-                raise Exception("No se pudo cargar ningÃºn driver de audio")
+            if self.offline:
+                _log.info("Render offline: sin driver de audio")
+            else:
+                # Driver recordado primero; sondeo completo solo si falla
+                self.driver_info = self.drivers.start(self.fs, self._driver_start)
+                self._update_schedule_delay()
+                PROFILE.mark("synth start")
 
             # ---- VOLUMEN AL MÃXIMO (compat con versiones viejas) ----
             try:
@@ -88,7 +222,7 @@ class SoundEngine:
                 if hasattr(self.fs, "set_gain"):
                     try:
                         self.fs.set_gain(10.0)  # 10.0 = tope de FluidSynth
-                        print("ðŸ”Š Gain por set_gain=10.0")
+                        _log.info("Gain por set_gain=10.0")
                     except Exception:
                         pass
 
@@ -98,27 +232,23 @@ class SoundEngine:
                     try:
                         # algunas versiones aceptan interfaz tipo dict
                         st["synth.gain"] = 10.0
-                        print("ðŸ”Š Gain por settings['synth.gain']=10.0")
+                        _log.info("Gain por settings['synth.gain']=10.0")
                     except Exception:
                         try:
                             # otras requieren .setnum()
                             st.setnum("synth.gain", 10.0)
-                            print("ðŸ”Š Gain por settings.setnum('synth.gain',10.0)")
+                            _log.info("Gain por settings.setnum('synth.gain',10.0)")
                         except Exception:
                             pass
 
                 # 3) SIEMPRE: asegurar volumen/expresiÃ³n MIDI al tope
-                for ch in range(16):
-                    try:
-                        self.fs.cc(ch, 7, 127)  # CC7 Volume
-                        self.fs.cc(ch, 11, 127)  # CC11 Expression
-                    except Exception:
-                        pass
+                self._push_cc(7, 127)  # CC7 Volume
+                self._push_cc(11, 127)  # CC11 Expression
 
                 self.set_reverb_send(self.reverb_send, remember=False)
 
             except Exception as _e:
-                print("âš  No se pudo forzar gain por API; quedan CC7/CC11 a 127.")
+                _log.warn("No se pudo forzar gain por API; quedan CC7/CC11 a 127.")
 
             # Activar reverb predeterminada usando los valores almacenados
             try:
@@ -133,58 +263,348 @@ class SoundEngine:
                 pass
 
             # Cargar SoundFont
-            sid = self.fs.sfload(str(sf2))
+            rss = rss_bytes()
+            font, notes = self._font_file(sf2, 0, 0, lambda fraction: None)
+            sid = self.fs.sfload(str(font))
             if sid == -1:
                 raise Exception("Error cargando SoundFont")
+            PROFILE.mark("sfload")
+            self._subset_notes = notes or self._subset_notes
 
             self.sfid = sid
-            self.fs.program_select(0, sid, 0, 0)
-            for ch in range(1, getattr(self, 'max_layers', 1)):
-                try:
-                    self.fs.program_select(ch, sid, 0, 0)
-                    self.fs.cc(ch, 7, 127)
-                    self.fs.cc(ch, 11, 127)
-                except Exception:
-                    pass
+            for ch in CC_CHANNELS:
+                self.fs.program_select(ch, sid, 0, 0)
             self.set_reverb_send(self.reverb_send, remember=False)
             self.set_reverb_active(self.reverb_level > 0)
-            print("âœ… SoundFont cargado correctamente")
+            self._push_cc(74, self.brightness)
+            self._log_sample_memory(sf2, rss)
+            _log.info("SoundFont cargado correctamente")
             with self.lock:
                 self._apply_master_gain_locked()
 
             self.ok.set()
+            # lo que los sliders pidieron antes de que el synth existiera
+            self._flush_cc()
+            PROFILE.mark("first-note-ready")
 
         except Exception as e:
             self.error = str(e)
-            print(f"âŒ Error en setup de audio: {e}")
+            _log.error("Error en setup de audio: %s", e)
+        finally:
+            self._setup_done.set()
 
     def _render(self):
+        ring = self.ring
+        offs = self.note_offs
+        clock = time.perf_counter_ns
         while True:
             try:
-                typ, note, vel = self.q.get()
-                if not self.ok.is_set():
-                    continue
+                # con note_offs pendientes se duerme hasta el proximo; los vencidos salen
+                # antes que los golpes nuevos
+                pending = ring.wait(timeout=offs.timeout(clock()) if offs else None)
+                if offs:
+                    offs.fire(clock(), self._release_note)
+                if pending:
+                    ring.drain(self._play_event)
+            except Exception as e:
+                _log.error("Error en render: %s", e)
 
-                if self.fs is None:
-                    continue
+    def _release_note(self, note: int, due_ns: int = 0) -> None:
+        self._play_event(EV_OFF, note, 0, 0)
 
-                if typ == "on":
-                    layers = getattr(self, 'layer_count', 1)
-                    for ch in range(layers):
-                        try:
-                            self.fs.noteon(ch, note, vel)
-                        except Exception:
-                            pass
-                else:
-                    # noteoff de FluidSynth no recibe velocidad
-                    for ch in range(getattr(self, 'max_layers', getattr(self, 'layer_count', 1))):
-                        try:
-                            self.fs.noteoff(ch, note)
-                        except Exception:
-                            pass
+    def _release_gate(self, note: int, due_tick: int) -> None:
+        # hilo de audio: due_tick cae en este bloque, antes de cualquier golpe por agendar
+        tick = max(due_tick, self.stream_clock.tick)
+        try:
+            self._seq.note_off(
+                time=tick, channel=self._sounding_channel[note], key=note, dest=self._seq_dest, absolute=True
+            )
+        except Exception:
+            pass
 
-            except Exception as e:
-                print(f"âš  Error en render: {e}")
+    def _play_event(self, kind: int, note: int, vel: int, stamp: int) -> None:
+        if kind == EV_CTL:
+            self._run_control()
+            return
+        if kind == EV_OFF_AT:
+            self.note_offs.schedule(note, stamp)
+            return
+        fs = self.fs
+        if fs is None or not self.ok.is_set():
+            return
+        try:
+            if kind == EV_ON:
+                ch, choke = self._pick_channel(note, self._now_ns())
+                if choke >= 0:
+                    fs.noteoff(choke, note)
+                fs.noteon(ch, note, vel)
+                self._count_voices()
+            else:
+                # noteoff de FluidSynth no recibe velocidad; va al canal donde empezo la nota
+                fs.noteoff(self._sounding_channel[note], note)
+        except Exception:
+            pass
+
+    def _pick_channel(self, note: int, now_ns: int):
+        """Voice-manager decision for a hit: ``(channel, choke channel or -1)``."""
+        # un golpe nuevo anula el note_off automatico del anterior (en modo "direct" desde el
+        # hilo MIDI: NoteOffQueue.cancel espera a un note_off que se este soltando)
+        self.note_offs.cancel(note)
+        ch, choke, restore = self.voices.note_on(note, self._note_channel[note], now_ns)
+        if restore:
+            self._set_release(ch, 0.0)
+        if choke >= 0:
+            # los golpes que se apilaron en el otro canal se apagan con un release corto
+            self._set_release(choke, self.voices.policy.choke_tc)
+        self._sounding_channel[note] = ch
+        return ch, choke
+
+    def _schedule_event(self, kind: int, note: int, vel: int, at_ns: int) -> None:
+        # hilo de audio, al principio del bloque: el secuenciador lo toca en su cuadro
+        clock = self.stream_clock
+        if kind == EV_OFF_AT:
+            # gate (ns) del golpe de la nota que se acaba de agendar
+            gate = int(round(at_ns * clock.ticks_per_second / 1e9))
+            self.gate_offs.schedule(note, self._hit_ticks[note] + max(1, gate))
+            return
+        tick = clock.tick_at(at_ns + self._delay_ns)
+        if tick < clock.tick:
+            # llego tarde para el retardo fijo: suena al principio de este bloque
+            self.late_events += 1
+            tick = clock.tick
+        seq = self._seq
+        dest = self._seq_dest
+        try:
+            if kind == EV_ON:
+                prev = self.gate_offs.pending(note)
+                if prev:
+                    # el note_off del golpe anterior: si cae antes que este se agenda ya (la cola
+                    # guarda uno por nota); si cae encima, se descarta
+                    self.gate_offs.cancel(note)
+                    if prev < tick:
+                        self._release_gate(note, prev)
+                ch, choke = self._pick_channel(note, at_ns)
+                self._hit_ticks[note] = tick
+                if choke >= 0:
+                    seq.note_off(time=tick, channel=choke, key=note, dest=dest, absolute=True)
+                seq.note_on(time=tick, channel=ch, key=note, velocity=vel, dest=dest, absolute=True)
+                self._count_voices()
+            else:
+                seq.note_off(time=tick, channel=self._sounding_channel[note], key=note, dest=dest, absolute=True)
+        except Exception:
+            pass
+
+    def _start_sequencer(self, fluidsynth) -> None:
+        if self._output is None or not hasattr(fluidsynth, "Sequencer"):
+            _log.warn("Sin secuenciador de FluidSynth o sin salida por bloques: despacho por anillo")
+            self.dispatch_mode = "ring"
+            return
+        rate = self._synth_sample_rate()
+        try:
+            # sin timer del sistema: el secuenciador avanza con las muestras que renderiza el synth,
+            # un tick por cuadro
+            seq = fluidsynth.Sequencer(time_scale=rate, use_system_timer=False)
+            self._seq_dest = seq.register_fluidsynth(self.fs)
+        except Exception as exc:
+            _log.warn("No pude crear el secuenciador (%s): despacho por anillo", exc)
+            self.dispatch_mode = "ring"
+            return
+        self.stream_clock = StreamClock(rate)
+        self._seq = seq
+        self._update_schedule_delay()
+
+    def _update_schedule_delay(self) -> None:
+        if self.schedule_ms is not None:
+            ms = float(self.schedule_ms)
+        else:
+            info = self._driver_profile()
+            ms = info["period_size"] * 1000.0 / info["sample_rate"] + SCHEDULE_MARGIN_MS
+        self._delay_ns = int(ms * 1e6)
+
+    def schedule_delay_ms(self) -> float:
+        """Fixed delay of timestamped events (0.0 unless the sequencer is in use)."""
+        return self._delay_ns / 1e6 if self._seq is not None else 0.0
+
+    def _set_release(self, channel: int, timecents: float) -> None:
+        lib = self._lib
+        if lib is not None and lib.set_gen is not None:
+            lib.set_gen(self.fs.synth, channel, GEN_VOLENVRELEASE, timecents)
+
+    def _count_voices(self) -> None:
+        active = self.active_voices()
+        if active > self.voice_peak:
+            self.voice_peak = active
+        if active >= self.voices.policy.polyphony:
+            # FluidSynth va a robar una voz para el proximo golpe
+            self.voice_saturated += 1
+
+    def active_voices(self) -> int:
+        lib = self._lib
+        if lib is None or self.fs is None:
+            return 0
+        return int(lib.active_voices(self.fs.synth))
+
+    def voice_stats(self) -> dict:
+        """Counters of the voice manager (peak and saturation since the last reset)."""
+        return {
+            "active": self.active_voices(),
+            "peak": self.voice_peak,
+            "polyphony": self.voices.policy.polyphony,
+            "chokes": self.voices.chokes,
+            "choked_hits": self.voices.choked_hits,
+            "saturated": self.voice_saturated,
+        }
+
+    def reset_voice_stats(self) -> None:
+        self.voice_peak = 0
+        self.voice_saturated = 0
+        self.voices.chokes = 0
+        self.voices.choked_hits = 0
+
+    def set_voice_policy(self, policy: VoicePolicy) -> None:
+        """Change the per-note cap, choke and polyphony budget while playing."""
+        self.voices.set_policy(policy)
+        lib = self._lib
+        if lib is not None and lib.set_polyphony is not None and self.fs is not None:
+            lib.set_polyphony(self.fs.synth, int(policy.polyphony))
+
+    def _dispatch(self, kind: int, note: int, vel: int, at_ns: int = 0) -> None:
+        if self.dispatch_mode == "direct":
+            self._play_event(kind, note, vel, 0)
+        elif self._seq is not None:
+            self.timed.push(kind, note, vel, at_ns or time.perf_counter_ns())
+        else:
+            self.ring.push(kind, note, vel, time.perf_counter_ns())
+
+    def _schedule_off(self, note: int, due_ns: int) -> None:
+        if self.offline:
+            self.note_offs.schedule(note, due_ns)
+        elif not self.ring.push(EV_OFF_AT, note, 0, due_ns):
+            _log.warn("Anillo lleno: la nota %d queda sin note_off automatico", note)
+
+    @property
+    def gamma(self) -> float:
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, value: float) -> None:
+        self._gamma = float(value)
+        self._rebuild_velocity_tables()
+
+    @property
+    def velocity_gain(self) -> float:
+        return self._velocity_gain
+
+    @velocity_gain.setter
+    def velocity_gain(self, value: float) -> None:
+        self._velocity_gain = float(value)
+        self._rebuild_velocity_tables()
+
+    def _rebuild_velocity_tables(self) -> None:
+        # la llaman la GUI, el hilo de setup y apply_scene: leer las entradas e instalar la
+        # tabla bajo el mismo lock evita que una tabla armada con valores viejos quede ultima
+        with self._tables_lock:
+            base = build_velocity_table(
+                self._gamma,
+                self._velocity_gain,
+                self.master_linear,
+                # sin etapa de salida queda el recorte viejo por velocidad
+                self.limiter_ceiling if self.limiter_enabled and self._output is None else None,
+            )
+            tables = [base] * 128
+            for note, curve in self._pad_curves.items():
+                tables[note] = compose(curve, base)
+            # Se reemplaza la lista entera: disparar() nunca ve una tabla a medio armar
+            self._note_tables = tables
+
+    def set_pad_curve(self, note: int, curve=None) -> None:
+        """Install (or clear with ``None``) the input velocity curve for one MIDI note."""
+        curves = dict(self._pad_curves)
+        if curve is None:
+            curves.pop(int(note), None)
+        else:
+            curves[int(note)] = curve
+        self.set_pad_curves(curves)
+
+    def set_pad_curves(self, curves) -> None:
+        """Replace every per-note input curve at once (e.g. a calibration profile)."""
+        checked = {}
+        for note, curve in curves.items():
+            note = int(note)
+            if not 0 <= note < 128:
+                raise ValueError(f"Nota MIDI fuera de rango: {note}")
+            checked[note] = tuple(int(v) for v in curve)
+        self._pad_curves = checked
+        self._rebuild_velocity_tables()
+
+    def set_pad_notes(self, notes) -> None:
+        """Route the notes of the visible pads to their own channels for per-pad meters."""
+        channels = [0] * 128
+        for idx, note in enumerate(list(notes)[:PAD_GROUPS]):
+            note = int(note)
+            if not 0 <= note < 128:
+                raise ValueError(f"Nota MIDI fuera de rango: {note}")
+            if channels[note] == 0:
+                channels[note] = idx + 1
+        self.pad_notes = tuple(int(n) for n in list(notes)[:PAD_GROUPS])
+        self._note_channel = channels
+        if self.sample_loading == "notes":
+            self._refresh_subset()
+
+    def render(self, events=(), seconds: float | None = None, block: int | None = None):
+        """Offline engines only: render timed events to an ``OfflineResult`` (see app.audio.offline)."""
+        from app.audio import offline as offline_render
+
+        return offline_render.render(self, events, seconds, block or offline_render.BLOCK)
+
+    def render_wav(self, path: Path, events=(), seconds: float | None = None) -> "OfflineResult":
+        result = self.render(events, seconds)
+        result.write_wav(path)
+        return result
+
+    def levels(self):
+        """Latest ``LevelSnapshot`` of the rendered output, or None without block output."""
+        stage = self.output_stage
+        if self._output is None or stage is None or stage.meter is None:
+            return None
+        return stage.meter.snapshot
+
+    def set_level_listener(self, callback) -> None:
+        """Call ``callback()`` from the audio thread when output goes from silence to sound."""
+        with self.lock:
+            self._level_listener = callback
+            stage = self.output_stage
+            if stage is not None and stage.meter is not None:
+                stage.meter.on_activity = callback
+
+    def set_latency_profile(self, name: str) -> dict | None:
+        """Switch buffer profile, restarting the audio driver if it is already running."""
+        profile = get_profile(name)
+        self.latency_profile = name if name in LATENCY_PROFILES else DEFAULT_PROFILE
+        if self.fs is None or not self.ok.is_set():
+            self.drivers.preferred = profile
+            return None
+        current_rate = (self.driver_info or {}).get("sample_rate")
+        if current_rate and float(current_rate) != float(profile["sample_rate"]):
+            # el Synth ya se creo con otra frecuencia; la nueva aplica al reiniciar la app
+            _log.info("Frecuencia %s Hz aplica en el proximo arranque", profile["sample_rate"])
+            profile["sample_rate"] = current_rate
+        with self.lock:
+            self.driver_info = self.drivers.restart(self.fs, profile, self._driver_start)
+        self._update_schedule_delay()
+        _log.info("Perfil de latencia %s: %.1f ms de buffer", self.latency_profile, self.buffer_latency_ms())
+        return self.driver_info
+
+    def buffer_latency_ms(self) -> float:
+        """Output buffering of the running driver (or of the selected profile)."""
+        return buffer_latency_ms(self._driver_profile())
+
+    def _driver_profile(self) -> dict:
+        info = dict(get_profile(self.latency_profile))
+        for key, value in (self.driver_info or {}).items():
+            if key in info and value:
+                info[key] = value
+        return info
 
     def set_master_gain_db(self, db: float):
         try:
@@ -197,23 +617,31 @@ class SoundEngine:
             self.master_db = value
             self.master_linear = math.pow(10.0, self.master_db / 20.0)
             self._apply_master_gain_locked()
+        self._rebuild_velocity_tables()
         if abs(prev - self.master_db) > 0.05:
-            print(f"Master gain ajustado a {self.master_db:.1f} dB")
+            _master_log.info("Master gain ajustado a %.1f dB", self.master_db)
 
     def set_limiter_enabled(self, enabled: bool):
         with self.lock:
             prev = self.limiter_enabled
             self.limiter_enabled = bool(enabled)
+            if self.output_stage is not None:
+                self.output_stage.set_limiter(self.limiter_enabled, self.limiter_ceiling)
         if prev != self.limiter_enabled:
+            self._rebuild_velocity_tables()
             estado = 'activado' if self.limiter_enabled else 'desactivado'
-            print(f"Limitador {estado}")
+            _master_log.info("Limitador %s", estado)
 
-    def _update_layer_count(self, count: int):
-        count = int(max(1, min(self.max_layers, count)))
-        if count == getattr(self, 'layer_count', 1):
-            return
-        self.layer_count = count
-        print(f'[MASTER] capas activas: {self.layer_count}')
+    def limiter_reduction_db(self) -> float:
+        """Peak gain reduction of the output limiter since the previous call."""
+        stage = self.output_stage
+        return stage.gain_reduction_db() if stage is not None else 0.0
+
+    def _synth_sample_rate(self) -> float:
+        try:
+            return float(self.fs.get_setting('synth.sample-rate'))
+        except Exception:
+            return 44100.0
 
     def _apply_master_gain_locked(self):
         fs = self.fs
@@ -229,47 +657,27 @@ class SoundEngine:
             try:
                 if hasattr(fs, 'set_gain'):
                     fs.set_gain(base_gain)
-                    print(f'[MASTER] set_gain -> {base_gain:.3f}')
+                    _master_log.debug('set_gain -> %.3f', base_gain)
                 else:
                     st = getattr(fs, 'settings', None)
                     if st is not None:
                         try:
                             st['synth.gain'] = base_gain
-                            print(f'[MASTER] settings[''synth.gain''] = {base_gain:.3f}')
+                            _master_log.debug('settings[synth.gain] = %.3f', base_gain)
                         except Exception:
                             st.setnum('synth.gain', float(base_gain))
-                            print(f'[MASTER] settings.setnum(synth.gain, {base_gain:.3f})')
+                            _master_log.debug('settings.setnum(synth.gain, %.3f)', base_gain)
             except Exception:
                 pass
             self._last_gain_linear = base_gain
-        layer_mult = max(1.0, desired_amp / base_gain)
-        layer_count = int(math.ceil(layer_mult))
-        self._update_layer_count(layer_count)
-        extra_db = max(0.0, target_db - 20.0)
-        self._set_extra_boost_db(extra_db)
-
-
-    def _set_extra_boost_db(self, extra_db: float):
-        if self._gen_attenuation is None or not hasattr(self.fs, 'set_gen'):
-            if self._gen_attenuation is None:
-                print('[MASTER] ATTENUATION generator no disponible')
-            elif not hasattr(self.fs, 'set_gen'):
-                print('[MASTER] set_gen no soportado en este Fluidsynth')
-            self._extra_boost_db = 0.0
-            self._last_extra_db = 0.0
-            return
-        max_extra = max(0.0, self.max_master_db - 20.0)
-        bounded = max(0.0, min(max_extra, extra_db))
-        if self._last_extra_db is not None and abs(self._last_extra_db - bounded) < 0.1:
-            return
-        value = -bounded * 10.0
-        try:
-            self.fs.set_gen(0, self._gen_attenuation, value)
-            print(f'[MASTER] extra boost {bounded:.1f} dB -> set_gen ATTENUATION={value:.1f}')
-        except Exception as e:
-            print(f'[MASTER] extra boost fall?: {e}')
-        self._extra_boost_db = bounded
-        self._last_extra_db = bounded
+        # Lo que supera el tope de FluidSynth se aplica en la etapa de salida,
+        # sin duplicar voces en otros canales
+        post_gain = desired_amp / base_gain
+        if post_gain > 1.0 and self._output is None:
+            _master_log.warn('boost de %.1f dB por encima de +20 dB no disponible sin etapa de salida',
+                             20.0 * math.log10(post_gain))
+        if self.output_stage is not None:
+            self.output_stage.set_gain_linear(post_gain)
 
     def set_reverb(self, roomsize=None, level=None, damping=None, width=None):
         if roomsize is not None:
@@ -281,8 +689,12 @@ class SoundEngine:
         if width is not None:
             self.reverb_width = max(0.0, min(1.0, float(width)))
 
+        self._push_reverb()
+
+    def _push_reverb(self) -> int:
+        """Send the stored reverb parameters to FluidSynth; return the number of calls."""
         if not self.fs:
-            return
+            return 0
 
         rs = self.reverb_roomsize
         dp = self.reverb_damping
@@ -292,13 +704,13 @@ class SoundEngine:
         try:
             if hasattr(self.fs, "set_reverb"):
                 self.fs.set_reverb(rs, dp, wd, lv)
-                return
+                return 1
         except Exception:
             pass
 
         st2 = getattr(self.fs, "settings", None)
         if not st2:
-            return
+            return 0
 
         def _set(k, v):
             try:
@@ -313,6 +725,7 @@ class SoundEngine:
         _set("synth.reverb.damp", dp)
         _set("synth.reverb.width", wd)
         _set("synth.reverb.level", lv)
+        return 4
 
     def set_reverb_send(self, amount: float, *, remember: bool = True):
         try:
@@ -322,47 +735,320 @@ class SoundEngine:
         target = max(0.0, min(1.0, target))
         if remember:
             self.reverb_send = target
-        if not self.fs:
+        self.set_cc(91, int(round(target * 127)))
+
+    def set_brightness(self, value: int) -> None:
+        """CC74 (brightness / filter cutoff) on every channel in use."""
+        self.brightness = max(0, min(127, int(value)))
+        self.set_cc(74, self.brightness)
+
+    def set_cc(self, control: int, value: int) -> None:
+        """Queue a controller change for the channels in use.
+
+        Only the last value per controller is kept and it is written at the
+        start of the next audio block (or by the render thread without block
+        output), so a slider drag costs at most one write per block and
+        channel, and none when the value did not change.
+        """
+        self._cc_pending[int(control)] = max(0, min(127, int(value)))
+        if self._cc_on_block:
             return
-        try:
-            val = int(round(target * 127))
-            for ch in range(16):
-                self.fs.cc(ch, 91, val)
-        except Exception:
-            pass
+        if self.dispatch_mode == "direct" or not self.ok.is_set():
+            self._flush_cc()
+        elif not self._cc_marked:
+            self._cc_marked = True
+            if not self.ring.push(EV_CTL, 0, 0):
+                self._flush_cc()
+
+    def _flush_cc(self) -> None:
+        self._cc_marked = False
+        pending = self._cc_pending
+        if not pending or not self.fs:
+            return
+        while pending:
+            try:
+                control, value = pending.popitem()
+            except KeyError:
+                return
+            self._push_cc(control, value)
+
+    def _push_cc(self, control: int, value: int, channels=CC_CHANNELS) -> int:
+        """Write a controller now, skipping channels that already hold ``value``."""
+        fs = self.fs
+        if not fs:
+            return 0
+        calls = 0
+        with self._cc_lock:
+            for ch in channels:
+                row = self._cc_state[ch]
+                if row[control] == value:
+                    self.cc_skipped += 1
+                    continue
+                try:
+                    fs.cc(ch, control, value)
+                except Exception:
+                    continue
+                row[control] = value
+                calls += 1
+            self.cc_calls += calls
+        return calls
 
     def load_sf2_live(self, new_sf2: Path, bank: int = 0, preset: int = 0):
+        """Blocking variant of ``load_sf2_async`` (returns the new font id)."""
+        return self.load_sf2_async(new_sf2, bank, preset).result()
+
+    def load_sf2_async(
+        self,
+        new_sf2: Path,
+        bank: int = 0,
+        preset: int = 0,
+        *,
+        select: bool = True,
+        unload_previous: bool = True,
+    ) -> SoundFontLoad:
+        """Load a SoundFont on a worker thread; the current one plays until the swap.
+
+        Returns a ``SoundFontLoad`` to poll for progress. Starting another
+        selecting load cancels this one if it has not been swapped in yet.
+        ``select=False`` only makes the font resident (see ``select_sf2``).
+        """
         if not self.fs:
             raise RuntimeError("Synth no inicializado")
         p = Path(new_sf2)
         if not p.exists():
             raise FileNotFoundError(f"SF2 no encontrado: {new_sf2}")
-        sid = self.fs.sfload(str(p))
-        if sid == -1:
-            raise RuntimeError("No se pudo cargar el nuevo SoundFont")
+        load = SoundFontLoad(p, bank, preset, select, unload_previous)
+        if select:
+            previous, self._sf2_load = self._sf2_load, load
+            if previous is not None:
+                previous.cancel()
+        threading.Thread(target=self._load_sf2_worker, args=(load,), name="sf2-load", daemon=True).start()
+        return load
+
+    def _load_sf2_worker(self, load: SoundFontLoad) -> None:
+        fs = self.fs
+        try:
+            load.stage = "lectura"
+
+            def report(fraction: float) -> None:
+                load.progress = READ_SHARE * fraction
+
+            font = load.path
+            if self.sample_loading == "notes":
+                font, load.notes = self._font_file(load.path, load.bank, load.preset, report)
+            # en modo "dynamic" solo se leen las muestras del preset: leer todo el archivo sobra
+            if font == load.path and self.sample_loading != "dynamic":
+                if not preread(load.path, report, lambda: load.cancelled):
+                    load.finish("cancelado")
+                    return
+            if load.cancelled:
+                load.finish("cancelado")
+                return
+            load.stage = "carga"
+            rss = rss_bytes()
+            # sin actualizar los presets MIDI: los canales siguen con la fuente actual
+            sid = fs.sfload(str(font))
+            if sid == -1:
+                raise RuntimeError("No se pudo cargar el nuevo SoundFont")
+            load.sfid = sid
+            if load.cancelled:
+                fs.sfunload(sid, False)
+                load.finish("cancelado")
+                return
+            if not load.select:
+                load.finish()
+                return
+            self._pin_presets(load)
+            self._log_sample_memory(load.path, rss)
+            self._swap_and_wait(load)
+            if load.cancelled and self.sfid != sid:
+                # cancelado antes del cambio: la fuente nueva nunca sono
+                if load.unload_previous and hasattr(fs, "sfunload"):
+                    try:
+                        fs.sfunload(sid, False)
+                    except Exception as exc:
+                        _log.warn("No pude descargar el SoundFont cancelado: %s", exc)
+                load.finish("cancelado")
+                return
+            old = load.previous
+            if load.unload_previous and old is not None and old != sid and hasattr(fs, "sfunload"):
+                load.stage = "descarga"
+                try:
+                    fs.sfunload(old, True)
+                except Exception as exc:
+                    _log.warn("No pude descargar el SoundFont anterior: %s", exc)
+            _log.info("SoundFont cambiado: %s", load.path.name)
+            load.finish()
+            if self.sample_loading == "notes":
+                # los pads cambiaron de notas mientras se cargaba
+                self._refresh_subset()
+        except Exception as exc:
+            _log.error("Error cargando SoundFont %s: %s", load.path, exc)
+            load.finish("error", str(exc))
+
+    def _swap_and_wait(self, load: SoundFontLoad) -> None:
+        load.stage = "cambio"
+        load.progress = 0.95
+        self._swaps.append(load)
+        if not self._cc_on_block:
+            self._wake_control()
+        if not load.swapped.wait(0.5):
+            # sin bloques de audio (driver detenido): se cambia desde aca
+            self._run_swaps()
+        self._release_hold()
+
+    def _pin_presets(self, load: SoundFontLoad) -> None:
+        """Dynamic mode: load the new preset's samples here, not in the swap on the audio thread."""
+        if self.sample_loading != "dynamic":
+            return
         try:
-            self.fs.program_select(0, sid, bank, preset)
+            if self.sfid is not None:
+                self.fs.program_select(HOLD_CHANNEL, self.sfid, self.bank, self.program)
+            self.fs.program_select(PRELOAD_CHANNEL, load.sfid, load.bank, load.preset)
+        except Exception as exc:
+            _log.warn("No pude precargar el preset %s:%s: %s", load.bank, load.preset, exc)
+
+    def _release_hold(self) -> None:
+        # el preset anterior deja de estar tomado: sus muestras se liberan en este hilo
+        if self.sample_loading != "dynamic" or self.sfid is None:
+            return
+        try:
+            self.fs.program_select(HOLD_CHANNEL, self.sfid, self.bank, self.program)
         except Exception:
             pass
-        for ch in range(1, getattr(self, 'max_layers', 1)):
+
+    def _wanted_notes(self) -> tuple:
+        return tuple(sorted(set(self.pad_notes))) or self._subset_notes
+
+    def _font_file(self, path: Path, bank: int, program: int, report) -> tuple:
+        """File to sfload for ``path`` and the notes it covers (notes mode builds a subset)."""
+        notes = self._wanted_notes()
+        if self.sample_loading != "notes" or not notes:
+            return path, ()
+        from app.audio.sf2_subset import build_subset
+
+        try:
+            info = build_subset(path, bank, program, notes, report=report)
+        except Exception as exc:
+            # la fuente completa tambien cubre estas notas: no se reintenta en cada cambio
+            _log.warn("Sin subconjunto de %s (%s); se carga completo", path.name, exc)
+            return path, notes
+        _log.info(
+            "Subconjunto de %s para %s: %d zonas, %d muestras, %.1f de %.1f MB",
+            path.name, list(notes), info.zones, info.samples, info.size / 1e6, info.source_size / 1e6,
+        )
+        return info.path, notes
+
+    def _refresh_subset(self) -> None:
+        wanted = self._wanted_notes()
+        if not wanted or wanted == self._subset_notes or not self.ok.is_set():
+            return
+        pending = self._sf2_load
+        if pending is not None and not pending.done():
+            # la carga en curso vuelve a mirar las notas cuando termina
+            return
+        try:
+            self.load_sf2_async(self.sf2_path, self.bank, self.program)
+        except Exception as exc:
+            _log.warn("No pude recargar las notas de los pads: %s", exc)
+
+    def _log_sample_memory(self, path: Path, before: int | None) -> None:
+        after = rss_bytes()
+        if before is not None and after is not None:
+            _log.info(
+                "Muestras de %s (carga %s): %+.1f MB residentes, %.1f MB en total",
+                Path(path).name, self.sample_loading, (after - before) / 1e6, after / 1e6,
+            )
+
+    def select_sf2(self, sfid: int, bank: int = 0, preset: int = 0, path: Path | None = None) -> SoundFontLoad:
+        """Switch to a font that is already loaded: only program_select, between two blocks."""
+        load = SoundFontLoad(path or Path(f"sfid-{sfid}"), bank, preset, True, False)
+        load.sfid = int(sfid)
+        load.resident = True
+        load.stage = "cambio"
+        previous, self._sf2_load = self._sf2_load, load
+        if previous is not None:
+            previous.cancel()
+        if self.sample_loading == "dynamic":
+            # las muestras del preset se cargan al seleccionarlo: nunca en el hilo de audio
+            def warm() -> None:
+                self._pin_presets(load)
+                self._swap_and_wait(load)
+
+            threading.Thread(target=warm, name="sf2-select", daemon=True).start()
+            return load
+        self._swaps.append(load)
+        if not self._cc_on_block:
+            self._wake_control()
+        return load
+
+    def unload_sf2(self, sfid: int) -> None:
+        """Free a resident font in the background (never the one playing)."""
+        fs = self.fs
+        if fs is None or sfid is None or sfid == self.sfid or not hasattr(fs, "sfunload"):
+            return
+
+        def work() -> None:
             try:
-                self.fs.program_select(ch, sid, bank, preset)
-                self.fs.cc(ch, 7, 127)
-                self.fs.cc(ch, 11, 127)
-            except Exception:
-                pass
-        if self.sfid is not None and self.sfid != sid and hasattr(self.fs, "sfunload"):
+                fs.sfunload(sfid, False)
+            except Exception as exc:
+                _log.warn("No pude descargar el SoundFont %s: %s", sfid, exc)
+
+        threading.Thread(target=work, name="sf2-unload", daemon=True).start()
+
+    def _wake_control(self) -> None:
+        if self.dispatch_mode == "direct" or not self.ok.is_set():
+            self._run_control()
+        elif not self.ring.push(EV_CTL, 0, 0):
+            self._run_control()
+
+    def _on_block(self) -> None:
+        seq = self._seq
+        if seq is not None:
+            self.stream_clock.block(time.perf_counter_ns(), seq.get_tick())
+            if self.timed:
+                self.timed.drain(self._schedule_event)
+            if self.gate_offs:
+                # los que caen en este bloque: un golpe que se agende despues ya cae en el siguiente
+                clock = self.stream_clock
+                self.gate_offs.fire(clock.tick + max(clock.period, 1) - 1, self._release_gate)
+        self._flush_cc()
+        if self.offline and self.note_offs:
+            self.note_offs.fire(self._now_ns(), self._release_note)
+        if self._swaps:
+            self._run_swaps()
+
+    def _run_swaps(self) -> None:
+        fs = self.fs
+        while self._swaps:
             try:
-                self.fs.sfunload(self.sfid, True)
-            except Exception:
-                pass
-        self.sfid = sid
-        self.set_reverb_send(self.reverb_send, remember=False)
-        self.set_reverb_active(self.reverb_level > 0)
-        with self.lock:
-            self._apply_master_gain_locked()
+                load = self._swaps.popleft()
+            except IndexError:
+                return
+            if load.cancelled:
+                load.swapped.set()
+                if load.resident:
+                    load.finish("cancelado")
+                continue
+            try:
+                for ch in CC_CHANNELS:
+                    fs.program_select(ch, load.sfid, load.bank, load.preset)
+            except Exception as exc:
+                _log.warn("program_select fallo en el cambio de SoundFont: %s", exc)
+            load.previous = self.sfid
+            self.sfid = load.sfid
+            self.bank = load.bank
+            self.program = load.preset
+            self.sf2_path = load.path
+            if load.notes:
+                self._subset_notes = load.notes
+            load.swapped.set()
+            if load.resident:
+                # no hay hilo de carga que cierre el pedido
+                load.finish()
 
     def set_reverb_active(self, active: bool):
+        self.reverb_active = bool(active)
         if active:
             restore = self.reverb_send if self.reverb_send > 0 else getattr(self, '_reverb_send_prev', 1.0)
             if restore <= 0:
@@ -372,17 +1058,24 @@ class SoundEngine:
         else:
             self._reverb_send_prev = self.reverb_send if self.reverb_send > 0 else getattr(self, '_reverb_send_prev', 1.0)
             self.set_reverb_send(0.0, remember=True)
+        self._push_reverb_on(active)
+
+    def _push_reverb_on(self, active: bool) -> int:
         if not self.fs:
-            return
+            return 0
+        calls = 0
         try:
             if active and hasattr(self.fs, 'reverb_on'):
                 self.fs.reverb_on()
+                calls += 1
             elif not active and hasattr(self.fs, 'reverb_off'):
                 self.fs.reverb_off()
+                calls += 1
         except Exception:
             pass
         st = getattr(self.fs, 'settings', None)
         if st:
+            calls += 1
             try:
                 st['synth.reverb.active'] = 1 if active else 0
             except Exception:
@@ -390,26 +1083,142 @@ class SoundEngine:
                     st.setint('synth.reverb.active', 1 if active else 0)
                 except Exception:
                     pass
+        return calls
+
+    # -- escenas -------------------------------------------------------------
+    def scene(self) -> Scene:
+        """Immutable snapshot of the current sound settings."""
+        send = self.reverb_send if self.reverb_active else self._reverb_send_prev
+        return Scene(
+            self.reverb_roomsize, self.reverb_damping, self.reverb_width, self.reverb_level,
+            self.reverb_active, send, self.brightness, self.master_db, self.limiter_enabled,
+            self._velocity_gain, self._gamma, self.bank, self.program,
+        )
+
+    def apply_scene(self, scene: Scene) -> tuple:
+        """Recall ``scene``; return the groups of settings that changed.
+
+        The engine-side state (velocity tables, output stage) is switched here
+        in one go; every FluidSynth call the diff needs is queued as a single
+        batch that the render thread runs between two notes. With ``direct``
+        dispatch, or before the synth exists, the batch runs inline.
+        """
+        with self.lock:
+            groups = scenes.diff(self.scene(), scene)
+            if not groups:
+                return groups
+            self.reverb_roomsize, self.reverb_damping, self.reverb_width, self.reverb_level = (
+                max(0.0, min(1.0, float(v))) for v in scene[:4]
+            )
+            self.reverb_active = bool(scene.reverb_active)
+            self._reverb_send_prev = max(0.0, min(1.0, float(scene.reverb_send)))
+            self.reverb_send = self._reverb_send_prev if self.reverb_active else 0.0
+            self.brightness = max(0, min(127, int(scene.brightness)))
+            self.master_db = max(-60.0, min(self.max_master_db, float(scene.master_db)))
+            self.master_linear = math.pow(10.0, self.master_db / 20.0)
+            self.limiter_enabled = bool(scene.limiter)
+            if self.output_stage is not None:
+                self.output_stage.set_limiter(self.limiter_enabled, self.limiter_ceiling)
+            self._velocity_gain = float(scene.velocity_gain)
+            self._gamma = float(scene.gamma)
+            self.bank, self.program = int(scene.bank), int(scene.program)
+        if {scenes.MASTER, scenes.LIMITER, scenes.VELOCITY} & set(groups):
+            self._rebuild_velocity_tables()
+        # la escena manda sobre un arrastre de slider todavia sin volcar
+        self._cc_pending.pop(91, None)
+        self._cc_pending.pop(74, None)
+        self._control.append((groups, time.perf_counter_ns()))
+        self._wake_control()
+        return groups
 
-    def disparar(self, msg: Message):
+    def _run_control(self) -> None:
+        if self._cc_pending:
+            self._flush_cc()
+        if self._swaps:
+            self._run_swaps()
+        control = self._control
+        while control:
+            try:
+                groups, stamp = control.popleft()
+            except IndexError:
+                return
+            calls = 0
+            for group in groups:
+                try:
+                    calls += self._push_group(group)
+                except Exception as exc:
+                    _log.warn("Escena: fallo %s: %s", group, exc)
+            self.last_recall = {
+                "groups": groups,
+                "calls": calls,
+                "latency_us": (time.perf_counter_ns() - stamp) / 1000.0,
+            }
+            _log.debug("escena aplicada: %s, %d llamadas", ",".join(groups), calls)
+
+    def _push_group(self, group: str) -> int:
+        if group == scenes.REVERB:
+            return self._push_reverb()
+        if group == scenes.REVERB_ACTIVE:
+            return self._push_reverb_on(self.reverb_active)
+        if group == scenes.SEND:
+            return self._push_cc(91, int(round(self.reverb_send * 127)))
+        if group == scenes.BRIGHTNESS:
+            return self._push_cc(74, self.brightness)
+        if group == scenes.MASTER:
+            with self.lock:
+                prev = self._last_gain_linear
+                self._apply_master_gain_locked()
+            return int(self.fs is not None and prev != self._last_gain_linear)
+        if group == scenes.PROGRAM:
+            if not self.fs or self.sfid is None:
+                return 0
+            for ch in CC_CHANNELS:
+                self.fs.program_select(ch, self.sfid, self.bank, self.program)
+            return len(CC_CHANNELS)
+        # LIMITER / VELOCITY: estado de Python, ya aplicado en apply_scene
+        return 0
+
+    def disparar(self, msg: Message, auto_off_ms: float | None = None, at_ns: int | None = None):
+        """Play ``msg``; a note_on with ``auto_off_ms`` is released that many ms later.
+
+        The note_off is timed on the render thread (``NoteOffQueue``), not by a
+        GUI timer, so it is not delayed by a busy event loop. Offline it lands
+        on its exact frame; with the sequencer dispatch it is scheduled
+        ``auto_off_ms`` after the frame the note starts on.
+
+        ``at_ns`` is the capture time of the event (``perf_counter_ns``, as
+        early as the input allows; default: now). With the sequencer dispatch
+        the event plays at ``at_ns + schedule_delay_ms()`` in the audio stream,
+        whatever the thread scheduling in between.
+        """
         try:
             if msg.type == "control_change":  # â† NUEVO
-                self.fs.cc(getattr(msg, "channel", 0), msg.control, msg.value);
+                ch = getattr(msg, "channel", 0)
+                # los pads suenan en canales 1..PAD_GROUPS: el canal 0 les llega a todos
+                if ch == 0:
+                    channels = CC_CHANNELS
+                else:
+                    channels = (ch, ALT_CHANNELS[ch]) if ch < len(ALT_CHANNELS) else (ch,)
+                self._push_cc(msg.control, msg.value, channels)
                 return
             if msg.type == "note_on" and msg.velocity:
-                x = max(0.0, min(1.0, msg.velocity / 127.0))
-                shaped = pow(x, self.gamma) * 127.0
-                master_scale = self.master_linear if self.master_linear < 1.0 else 1.0
-                v = int(max(1, min(127, shaped * self.velocity_gain * master_scale)))
-                if self.limiter_enabled:
-                    ceiling = int(max(1, min(127, round(self.limiter_ceiling * 127))))
-                    if v > ceiling:
-                        v = ceiling
-                # DEBUG volume tracing
-                print(f"[VOL] note {msg.note} vel_in={msg.velocity} -> vel_out={v} (master={self.master_db:.1f} dB, scale={master_scale:.3f}, gain={self.master_linear:.3f})")
-                self.q.put(("on", msg.note, v))
+                v = self._note_tables[msg.note][msg.velocity]
+                if _vol_log.debug_enabled:
+                    _vol_log.debug(
+                        "note %d vel_in=%d -> vel_out=%d (master=%.1f dB, gain=%.3f)",
+                        msg.note, msg.velocity, v, self.master_db, self.master_linear,
+                    )
+                self._dispatch(EV_ON, msg.note, v, at_ns or 0)
+                if auto_off_ms:
+                    gate_ns = int(max(1.0, auto_off_ms) * 1e6)
+                    if self._seq is not None:
+                        # el gate viaja detras del golpe: se cuenta desde el tick en que suena
+                        if not self.timed.push(EV_OFF_AT, msg.note, 0, gate_ns):
+                            _log.warn("Anillo lleno: la nota %d queda sin note_off automatico", msg.note)
+                    else:
+                        self._schedule_off(msg.note, (at_ns or self._now_ns()) + gate_ns)
 
             elif msg.type in ("note_off", "note_on"):
-                self.q.put(("off", msg.note, 0))
+                self._dispatch(EV_OFF, msg.note, 0, at_ns or 0)
         except Exception as e:
-            print(f"âš  Error disparando nota: {e}")
+            _log.error("Error disparando nota: %s", e)
@@ -0,0 +1,29 @@
+"""Audio buffer latency profiles for FluidSynth's output driver."""
+from __future__ import annotations
+
+from typing import Dict
+
+DEFAULT_PROFILE = "practice"
+
+# period_size x periods / sample_rate = buffering added by the driver
+LATENCY_PROFILES: Dict[str, Dict[str, int]] = {
+    "stage": {"period_size": 64, "periods": 2, "sample_rate": 48000},
+    "practice": {"period_size": 128, "periods": 2, "sample_rate": 48000},
+    "safe": {"period_size": 256, "periods": 3, "sample_rate": 44100},
+}
+
+PROFILE_LABELS = {
+    "stage": "Escenario (minima latencia)",
+    "practice": "Practica",
+    "safe": "Segura (equipos lentos)",
+}
+
+
+def get_profile(name: str | None) -> Dict[str, int]:
+    """Return a copy of the named profile, falling back to the default one."""
+    return dict(LATENCY_PROFILES.get(name or "", LATENCY_PROFILES[DEFAULT_PROFILE]))
+
+
+def buffer_latency_ms(profile: Dict[str, int]) -> float:
+    """Nominal output buffering of a profile in milliseconds."""
+    return profile["period_size"] * profile["periods"] * 1000.0 / profile["sample_rate"]
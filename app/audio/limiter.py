@@ -0,0 +1,146 @@
+"""Look-ahead brickwall limiter for the float blocks of the output stage.
+
+Every step is vectorised over the block, there is no per-sample Python loop:
+
+* the signal is delayed by ``lookahead`` samples and the gain each sample
+  needs to stay under the ceiling is computed on the undelayed input;
+* a sliding minimum over the look-ahead window lowers the gain before the peak
+  arrives, and a moving average over ``attack`` samples turns that step into a
+  ramp that still never exceeds the required gain;
+* the exponential release is the recursion ``a[i] = max(a_req[i], a[i-1]*r)``
+  over the attenuation ``a = 1 - g``, solved in closed form with a cumulative
+  maximum of ``a_req[i] * r**-i``.
+"""
+from __future__ import annotations
+
+import math
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_TINY = 1e-9
+
+
+class LookaheadLimiter:
+    """Stereo brickwall limiter processing ``(2, n)`` float32 blocks in place."""
+
+    def __init__(
+        self,
+        sample_rate: float = 48000.0,
+        ceiling: float = 0.94,
+        lookahead_ms: float = 1.0,
+        attack_ms: float = 0.75,
+        release_ms: float = 60.0,
+        max_frames: int = 2048,
+    ) -> None:
+        self.ceiling = float(ceiling)
+        self.lookahead_ms = float(lookahead_ms)
+        self.attack_ms = float(attack_ms)
+        self.release_ms = float(release_ms)
+        self._max_frames = int(max_frames)
+        self._meter_lock = threading.Lock()
+        self.reduction_db = 0.0
+        self._peak_reduction_db = 0.0
+        self.configure(sample_rate)
+
+    def configure(self, sample_rate: float) -> None:
+        """(Re)build delay line and release tables for a sample rate; resets state."""
+        self.sample_rate = float(sample_rate)
+        self.lookahead = max(1, int(round(self.lookahead_ms * self.sample_rate / 1000.0)))
+        self.attack = max(1, min(self.lookahead, int(round(self.attack_ms * self.sample_rate / 1000.0))))
+        self._alloc(self._max_frames)
+        self.reset()
+
+    def _alloc(self, frames: int) -> None:
+        self._max_frames = int(frames)
+        self._work = np.zeros((2, self.lookahead + frames), dtype=np.float32)
+        self._req = np.ones(self.lookahead + frames, dtype=np.float32)
+        self._hold = np.ones(self.attack + frames, dtype=np.float32)
+        r = math.exp(-1.0 / max(1.0, self.release_ms * self.sample_rate / 1000.0))
+        steps = np.arange(frames, dtype=np.float64)
+        self._r = r
+        self._r_pow = r ** steps
+        self._r_inv = r ** -steps
+        self._views = {}
+
+    def _grow(self, frames: int) -> None:
+        # bloque mas largo a mitad de stream: se conservan el retardo y la atenuacion
+        delay = self._work[:, :self.lookahead].copy()
+        held = self._hold[:self.attack].copy()
+        self._alloc(frames)
+        self._work[:, :self.lookahead] = delay
+        self._hold[:self.attack] = held
+
+    def _windows(self, frames: int):
+        # el periodo del driver es fijo: las vistas se crean una sola vez por tamaño
+        views = self._views.get(frames)
+        if views is None:
+            req = self._req[:self.lookahead + frames]
+            hold = self._hold[:self.attack + frames]
+            views = (
+                req,
+                hold,
+                sliding_window_view(req, self.lookahead + 1),
+                sliding_window_view(hold, self.attack + 1),
+            )
+            self._views[frames] = views
+        return views
+
+    def reset(self) -> None:
+        self._work[:, :self.lookahead] = 0.0
+        self._hold[:self.attack] = 1.0
+        self._atten = 0.0
+        self.reduction_db = 0.0
+
+    @property
+    def latency_samples(self) -> int:
+        return self.lookahead
+
+    def set_ceiling(self, ceiling: float) -> None:
+        self.ceiling = max(0.01, min(1.0, float(ceiling)))
+
+    def process(self, block) -> None:
+        frames = block.shape[1]
+        if frames > self._max_frames:
+            self._grow(frames)
+        la = self.lookahead
+        work = self._work[:, :la + frames]
+        work[:, la:] = block
+
+        # ganancia que necesita cada muestra (antes del retardo) para no pasar el techo
+        req, hold, req_windows, hold_windows = self._windows(frames)
+        np.max(np.abs(work), axis=0, out=req)
+        np.maximum(req, _TINY, out=req)
+        np.divide(self.ceiling, req, out=req)
+        np.minimum(req, 1.0, out=req)
+
+        # minimo deslizante: la ganancia baja antes de que llegue el pico
+        np.min(req_windows, axis=1, out=hold[self.attack:])
+        # rampa de ataque: cada promedio solo incluye minimos que ya cubren la muestra
+        smooth = hold_windows.mean(axis=1)
+
+        atten_req = 1.0 - smooth
+        atten = np.maximum.accumulate(atten_req * self._r_inv[:frames])
+        np.maximum(atten, self._atten * self._r, out=atten)
+        atten *= self._r_pow[:frames]
+        gain = 1.0 - atten
+
+        np.multiply(work[:, :frames], gain, out=block, casting="unsafe")
+        work[:, :la] = work[:, frames:frames + la]
+        hold[:self.attack] = hold[frames:frames + self.attack]
+        self._atten = float(atten[-1])
+
+        floor = float(gain.min())
+        reduction = -20.0 * math.log10(max(floor, _TINY)) if floor < 1.0 else 0.0
+        self.reduction_db = reduction
+        with self._meter_lock:
+            if reduction > self._peak_reduction_db:
+                self._peak_reduction_db = reduction
+
+    def take_peak_reduction(self) -> float:
+        """Largest gain reduction (dB) since the previous call; for UI meters."""
+        with self._meter_lock:
+            peak = self._peak_reduction_db
+            self._peak_reduction_db = 0.0
+        return peak
@@ -0,0 +1,186 @@
+"""Asynchronous, rate-limited logging for the audio package.
+
+Callers never touch the console: a record is appended to an in-memory deque
+and a background writer thread formats and prints it. Each category
+(``engine``, ``vol``, ``master``...) has its own verbosity and a token-bucket
+rate limit so a drum roll cannot flood the output.
+
+Verbosity comes from the ``TIMBAL_LOG`` environment variable, e.g.
+``TIMBAL_LOG=info,vol=debug`` or ``TIMBAL_LOG=off``. With ``off`` the writer
+thread is never started and every ``channel.debug_enabled`` / ``info_enabled``
+check is False, so a guarded hot path only pays for that branch.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {"debug": DEBUG, "info": INFO, "warn": WARN, "error": ERROR, "off": OFF}
+_LABELS = {DEBUG: "DEBUG", INFO: "INFO", WARN: "WARN", ERROR: "ERROR"}
+
+Record = Tuple[float, str, int, str, tuple]
+
+
+def _parse_spec(spec: str) -> Tuple[int, Dict[str, int]]:
+    default = INFO
+    per_channel: Dict[str, int] = {}
+    for part in (spec or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if "=" in part:
+            name, _, level = part.partition("=")
+            if level in LEVEL_NAMES:
+                per_channel[name.strip()] = LEVEL_NAMES[level]
+        elif part in LEVEL_NAMES:
+            default = LEVEL_NAMES[part]
+    return default, per_channel
+
+
+class Channel:
+    """Logging category with its own level and rate limit."""
+
+    __slots__ = (
+        "name",
+        "level",
+        "debug_enabled",
+        "info_enabled",
+        "rate",
+        "burst",
+        "_tokens",
+        "_stamp",
+        "suppressed",
+        "_sink",
+    )
+
+    def __init__(self, sink: "LogSink", name: str, level: int, rate: float = 20.0, burst: int = 40) -> None:
+        self._sink = sink
+        self.name = name
+        self.rate = float(rate)
+        self.burst = int(burst)
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self.suppressed = 0
+        self.set_level(level)
+
+    def set_level(self, level: int) -> None:
+        self.level = int(level)
+        self.debug_enabled = self.level <= DEBUG
+        self.info_enabled = self.level <= INFO
+
+    def _allow(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        if self._tokens < 1.0:
+            self.suppressed += 1
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def log(self, level: int, fmt: str, *args) -> None:
+        if level < self.level or not self._allow():
+            return
+        self._sink.submit(self.name, level, fmt, args)
+
+    def debug(self, fmt: str, *args) -> None:
+        self.log(DEBUG, fmt, *args)
+
+    def info(self, fmt: str, *args) -> None:
+        self.log(INFO, fmt, *args)
+
+    def warn(self, fmt: str, *args) -> None:
+        self.log(WARN, fmt, *args)
+
+    def error(self, fmt: str, *args) -> None:
+        self.log(ERROR, fmt, *args)
+
+
+class LogSink:
+    """Owns the channels, the recent-events ring and the writer thread."""
+
+    def __init__(self, spec: str = "", *, history: int = 512, stream=None) -> None:
+        self.default_level, self._overrides = _parse_spec(spec)
+        self.channels: Dict[str, Channel] = {}
+        self.recent: Deque[Record] = deque(maxlen=history)
+        self._pending: Deque[Record] = deque()
+        self._stream = stream
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def channel(self, name: str) -> Channel:
+        with self._lock:
+            chan = self.channels.get(name)
+            if chan is None:
+                chan = Channel(self, name, self._overrides.get(name, self.default_level))
+                self.channels[name] = chan
+            return chan
+
+    def set_level(self, name: str, level: int) -> None:
+        self.channel(name).set_level(level)
+
+    def submit(self, name: str, level: int, fmt: str, args: tuple) -> None:
+        record = (time.time(), name, level, fmt, args)
+        self.recent.append(record)
+        self._pending.append(record)
+        if self._thread is None:
+            self._start()
+        self._wake.set()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="audio-log", daemon=True)
+                self._thread.start()
+
+    def _writer(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        stream = self._stream or sys.stdout
+        lines: List[str] = []
+        while self._pending:
+            lines.append(format_record(self._pending.popleft()))
+        for chan in list(self.channels.values()):
+            if chan.suppressed:
+                count, chan.suppressed = chan.suppressed, 0
+                lines.append(f"[{chan.name}] {count} mensajes suprimidos por limite de tasa")
+        if not lines:
+            return
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except Exception:
+            pass
+
+
+def format_record(record: Record) -> str:
+    _, name, level, fmt, args = record
+    try:
+        text = fmt % args if args else fmt
+    except Exception:
+        text = f"{fmt} {args!r}"
+    if level >= WARN:
+        return f"[{name}] {_LABELS.get(level, level)}: {text}"
+    return f"[{name}] {text}"
+
+
+SINK = LogSink(os.environ.get("TIMBAL_LOG", ""))
+
+
+def get_channel(name: str) -> Channel:
+    return SINK.channel(name)
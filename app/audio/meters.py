@@ -0,0 +1,107 @@
+"""Output level metering computed on the render thread.
+
+The audio callback folds a few array reductions per block into running
+peak/sum-of-squares accumulators and, once per window, publishes an immutable
+``LevelSnapshot``. Publishing is a single attribute assignment, so the UI can
+read ``meter.snapshot`` at display rate without locks and never sees a
+half-written set of values.
+"""
+from __future__ import annotations
+
+import math
+from typing import Callable, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - sin numpy no hay medidores reales
+    np = None
+
+from app.audio.voices import OUTPUT_GROUPS, PAD_GROUPS
+
+# por debajo de -80 dBFS el master se considera en silencio
+SILENCE = 1e-4
+
+
+class LevelSnapshot(NamedTuple):
+    seq: int
+    master_peak: float
+    master_rms: float
+    pad_peak: Tuple[float, ...]
+    pad_rms: Tuple[float, ...]
+    # el master supero 1.0 antes del limitador/clipper en esta ventana
+    over: bool
+
+    def audible(self) -> bool:
+        return self.master_peak > SILENCE
+
+
+EMPTY_SNAPSHOT = LevelSnapshot(0, 0.0, 0.0, (0.0,) * PAD_GROUPS, (0.0,) * PAD_GROUPS, False)
+
+
+def to_dbfs(value: float, floor: float = -90.0) -> float:
+    return 20.0 * math.log10(value) if value > 0.0 else floor
+
+
+class LevelMeter:
+    """Accumulates block levels and publishes a snapshot every ``window_ms``.
+
+    ``on_activity`` (if set) is called from the audio thread when a window
+    becomes audible after silence, so an idle UI can sleep instead of polling.
+    """
+
+    def __init__(self, sample_rate: float = 48000.0, window_ms: float = 20.0) -> None:
+        self.window_ms = float(window_ms)
+        self.snapshot = EMPTY_SNAPSHOT
+        self._seq = 0
+        self._audible = False
+        self.on_activity: Optional[Callable[[], None]] = None
+        self._pad_peak = np.zeros(PAD_GROUPS)
+        self._pad_sq = np.zeros(PAD_GROUPS)
+        self.configure(sample_rate)
+
+    def configure(self, sample_rate: float) -> None:
+        self._window = max(1, int(sample_rate * self.window_ms / 1000.0))
+        self._reset()
+
+    def _reset(self) -> None:
+        self._frames = 0
+        self._master_peak = 0.0
+        self._master_sq = 0.0
+        self._pad_peak.fill(0.0)
+        self._pad_sq.fill(0.0)
+        self._over = False
+
+    def add(self, master, groups=None, group_gain: float = 1.0, pre_peak: float = 0.0) -> None:
+        """Fold one block in: ``master`` is (2, n) post-processing, ``groups`` (G, 2, n) dry."""
+        frames = master.shape[1]
+        self._master_peak = max(self._master_peak, float(np.max(np.abs(master))))
+        self._master_sq += float(np.vdot(master, master))
+        if groups is not None and groups.shape[0] > PAD_GROUPS:
+            pads = groups[1:OUTPUT_GROUPS]
+            np.maximum(self._pad_peak, np.abs(pads).max(axis=(1, 2)) * group_gain, out=self._pad_peak)
+            self._pad_sq += np.einsum("gcn,gcn->g", pads, pads) * (group_gain * group_gain)
+        if pre_peak > 1.0:
+            self._over = True
+        self._frames += frames
+        if self._frames >= self._window:
+            self._publish()
+
+    def _publish(self) -> None:
+        count = 2.0 * self._frames
+        self._seq += 1
+        audible = self._master_peak > SILENCE
+        self.snapshot = LevelSnapshot(
+            self._seq,
+            self._master_peak,
+            math.sqrt(self._master_sq / count),
+            tuple(float(v) for v in self._pad_peak),
+            tuple(math.sqrt(v / count) for v in self._pad_sq),
+            self._over,
+        )
+        self._reset()
+        if audible and not self._audible and self.on_activity is not None:
+            try:
+                self.on_activity()
+            except Exception:
+                pass
+        self._audible = audible
@@ -0,0 +1,249 @@
+"""Post-synth output stage: FluidSynth renders into NumPy buffers we own.
+
+Instead of letting FluidSynth's audio driver pull samples straight from the
+synth, the engine starts the driver with ``new_fluid_audio_driver2`` and a
+callback. The callback asks the synth for a block via ``fluid_synth_process``
+into preallocated float32 buffers, runs the ``OutputStage`` over them
+(vectorised gain, then either the look-ahead limiter or a soft-knee safety
+clipper) and copies the result to the driver.
+"""
+from __future__ import annotations
+
+import ctypes
+from typing import Optional
+
+try:
+    import numpy as np
+    from app.audio.limiter import LookaheadLimiter
+    from app.audio.meters import LevelMeter
+except ImportError:  # pragma: no cover - numpy es opcional en equipos viejos
+    np = None
+    LookaheadLimiter = None
+    LevelMeter = None
+
+from app.audio.log import get_channel
+
+_log = get_channel("output")
+
+_FLOAT_P = ctypes.POINTER(ctypes.c_float)
+_FLOAT_PP = ctypes.POINTER(_FLOAT_P)
+# en el callback los buffers llegan como direcciones (int): indexarlos no crea punteros ctypes
+_ADDR_P = ctypes.POINTER(ctypes.c_void_p)
+AUDIO_FUNC = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, _ADDR_P, ctypes.c_int, _ADDR_P
+)
+# vistas numpy de los buffers del driver que se guardan como maximo
+MAX_DRIVER_VIEWS = 64
+
+MAX_BOOST_DB = 40.0
+
+
+class _FluidLib:
+    """ctypes prototypes for the libfluidsynth calls pyFluidSynth does not wrap."""
+
+    def __init__(self, cdll) -> None:
+        self.synth_process = cdll.fluid_synth_process
+        self.synth_process.argtypes = [
+            ctypes.c_void_p, ctypes.c_int, ctypes.c_int, _FLOAT_PP, ctypes.c_int, _FLOAT_PP,
+        ]
+        self.synth_process.restype = ctypes.c_int
+        self.new_driver2 = cdll.new_fluid_audio_driver2
+        self.new_driver2.argtypes = [ctypes.c_void_p, AUDIO_FUNC, ctypes.c_void_p]
+        self.new_driver2.restype = ctypes.c_void_p
+        self.settings_setstr = cdll.fluid_settings_setstr
+        self.settings_setstr.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+        self.settings_setstr.restype = ctypes.c_int
+        self.active_voices = cdll.fluid_synth_get_active_voice_count
+        self.active_voices.argtypes = [ctypes.c_void_p]
+        self.active_voices.restype = ctypes.c_int
+        # para el manejo de voces; si faltan, los golpes se ahogan con el release normal
+        self.set_gen = _optional(
+            cdll, "fluid_synth_set_gen", [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_float]
+        )
+        self.set_polyphony = _optional(cdll, "fluid_synth_set_polyphony", [ctypes.c_void_p, ctypes.c_int])
+
+
+def _optional(cdll, name: str, argtypes):
+    try:
+        func = getattr(cdll, name)
+    except AttributeError:
+        return None
+    func.argtypes = argtypes
+    func.restype = ctypes.c_int
+    return func
+
+
+_LIB: Optional[_FluidLib] = None
+
+
+def fluid_lib(fluidsynth_module) -> Optional[_FluidLib]:
+    """Return the prototypes, or None when NumPy or the C symbols are missing."""
+    global _LIB
+    if _LIB is None:
+        cdll = getattr(fluidsynth_module, "_fl", None)
+        if cdll is None or np is None:
+            return None
+        try:
+            _LIB = _FluidLib(cdll)
+        except AttributeError as exc:
+            _log.warn("libfluidsynth sin API de proceso por bloques: %s", exc)
+            return None
+    return _LIB
+
+
+class BlockRenderer:
+    """Renders blocks into reusable float32 buffers, one stereo pair per output group.
+
+    With ``groups`` > 1 the synth must be created with ``synth.audio-groups``
+    (and ``synth.audio-channels``) set to the same value: MIDI channel ``c``
+    then lands in group ``c % groups``. ``render`` returns the stereo mix of all
+    groups plus effects, and the dry per-group view used for metering.
+    """
+
+    def __init__(self, lib: _FluidLib, synth_ptr, max_frames: int = 2048, groups: int = 1) -> None:
+        self._lib = lib
+        self._synth = synth_ptr
+        self.groups = max(1, int(groups))
+        self._alloc(max_frames)
+
+    def _alloc(self, frames: int) -> None:
+        rows = 2 * self.groups
+        # filas 0..rows-1: dry por grupo; las dos ultimas: efectos (reverb/chorus)
+        self.buffer = np.zeros((rows + 2, frames), dtype=np.float32)
+        self.mix = np.zeros((2, frames), dtype=np.float32)
+        ptrs = [self.buffer[ch].ctypes.data_as(_FLOAT_P) for ch in range(rows + 2)]
+        self._out = (_FLOAT_P * rows)(*ptrs[:rows])
+        self._fx = (_FLOAT_P * 2)(*ptrs[rows:])
+
+    def render(self, frames: int):
+        if frames > self.buffer.shape[1]:
+            self._alloc(frames)
+        buffer = self.buffer[:, :frames]
+        buffer.fill(0.0)
+        rows = 2 * self.groups
+        self._lib.synth_process(self._synth, frames, 2, self._fx, rows, self._out)
+        mix = self.mix[:, :frames]
+        if self.groups == 1:
+            np.add(buffer[0:2], buffer[2:4], out=mix)
+        else:
+            np.sum(buffer.reshape(self.groups + 1, 2, frames), axis=0, out=mix)
+        return mix, buffer[:rows].reshape(self.groups, 2, frames)
+
+
+class OutputStage:
+    """Post-synth gain followed by the brickwall limiter or a soft-knee clipper.
+
+    Everything runs in place on the audio thread; the UI only flips flags and
+    reads the limiter's gain-reduction meter and ``meter.snapshot``.
+    """
+
+    def __init__(self, knee: float = 0.85, sample_rate: float = 48000.0) -> None:
+        self.gain = 1.0
+        self.knee = float(knee)
+        self.clipped_blocks = 0
+        self.limiter = LookaheadLimiter(sample_rate) if LookaheadLimiter is not None else None
+        self.limiter_enabled = False
+        self._limiter_reset = False
+        self.meter = LevelMeter(sample_rate) if LevelMeter is not None else None
+
+    def set_gain_linear(self, gain: float) -> None:
+        self.gain = max(0.0, min(10.0 ** (MAX_BOOST_DB / 20.0), float(gain)))
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        if self.limiter is not None and float(sample_rate) != self.limiter.sample_rate:
+            self.limiter.configure(sample_rate)
+        if self.meter is not None:
+            self.meter.configure(sample_rate)
+
+    def set_limiter(self, enabled: bool, ceiling: float | None = None) -> None:
+        if self.limiter is None:
+            return
+        if ceiling is not None:
+            self.limiter.set_ceiling(ceiling)
+        if enabled and not self.limiter_enabled:
+            # el retardo guarda audio viejo: se limpia en el hilo de audio
+            self._limiter_reset = True
+        self.limiter_enabled = bool(enabled)
+
+    def gain_reduction_db(self) -> float:
+        """Peak limiter gain reduction since the last call (0.0 when bypassed)."""
+        if self.limiter is None:
+            return 0.0
+        return self.limiter.take_peak_reduction()
+
+    def process(self, block, groups=None) -> None:
+        """Gain, limit and meter ``block`` (2, n); ``groups`` are the dry pairs for pad meters."""
+        gain = self.gain
+        if gain != 1.0:
+            block *= gain
+        peak = float(np.max(np.abs(block)))
+        if self.limiter_enabled:
+            if self._limiter_reset:
+                self._limiter_reset = False
+                self.limiter.reset()
+            self.limiter.process(block)
+        elif peak > self.knee:
+            self._soft_clip(block)
+        if self.meter is not None:
+            self.meter.add(block, groups, gain, peak)
+
+    def _soft_clip(self, block) -> None:
+        # solo por encima de la rodilla: knee + (1-knee)*tanh((|x|-knee)/(1-knee))
+        knee = self.knee
+        self.clipped_blocks += 1
+        span = 1.0 - knee
+        mag = np.abs(block)
+        over = mag > knee
+        shaped = knee + span * np.tanh((mag[over] - knee) / span)
+        block[over] = np.copysign(shaped, block[over])
+
+
+class CallbackOutput:
+    """Starts a FluidSynth audio driver whose callback goes through an OutputStage."""
+
+    def __init__(self, lib: _FluidLib, fs, stage: OutputStage, groups: int = 1) -> None:
+        self._lib = lib
+        self._fs = fs
+        self.stage = stage
+        self.renderer = BlockRenderer(lib, fs.synth, groups=groups)
+        # se llama al principio de cada bloque (p. ej. para volcar CCs acumulados)
+        self.before_block = None
+        # (direccion, largo) -> vista numpy del buffer del driver, que los reusa bloque a bloque
+        self._views = {}
+        # hay que conservar la referencia: si el callback se libera, el driver salta a memoria invalida
+        self._func = AUDIO_FUNC(self._callback)
+
+    def start(self, driver: str) -> None:
+        self._lib.settings_setstr(self._fs.settings, b"audio.driver", driver.encode())
+        # delete_fluid_audio_driver sirve para ambos tipos de driver
+        self._fs.audio_driver = self._lib.new_driver2(self._fs.settings, self._func, None)
+
+    def active_voices(self) -> int:
+        return int(self._lib.active_voices(self._fs.synth))
+
+    def _callback(self, data, length, nfx, fx, nout, out) -> int:
+        try:
+            hook = self.before_block
+            if hook is not None:
+                hook()
+            block, groups = self.renderer.render(length)
+            self.stage.process(block, groups)
+            for ch in range(nout):
+                np.copyto(self._view(out[ch], length), block[ch & 1])
+            for ch in range(nfx):
+                self._view(fx[ch], length).fill(0.0)
+        except Exception as exc:
+            _log.error("Error en callback de audio: %s", exc)
+        return 0
+
+    def _view(self, addr: int, length: int):
+        views = self._views
+        key = (addr, length)
+        view = views.get(key)
+        if view is None:
+            # solo la primera vez que aparece un buffer (o si el driver los cambia)
+            if len(views) >= MAX_DRIVER_VIEWS:
+                views.clear()
+            view = np.ctypeslib.as_array((ctypes.c_float * length).from_address(addr))
+            views[key] = view
+        return view
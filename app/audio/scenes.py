@@ -0,0 +1,84 @@
+"""Engine scenes: immutable snapshots of every sound setting, recalled as one batch.
+
+A ``Scene`` holds the values a performer switches between songs: reverb
+parameters, reverb send, CC74 brightness, master gain, limiter, velocity curve
+and SoundFont program. ``SoundEngine.scene()`` captures the current state and
+``SoundEngine.apply_scene()`` recalls one; ``diff()`` tells which groups of
+settings differ, so a recall only touches what actually changed.
+"""
+from __future__ import annotations
+
+from typing import Mapping, NamedTuple, Tuple
+
+# grupos de diff, en el orden en que se aplican
+REVERB = "reverb"
+REVERB_ACTIVE = "reverb_active"
+SEND = "send"
+BRIGHTNESS = "brightness"
+MASTER = "master"
+LIMITER = "limiter"
+VELOCITY = "velocity"
+PROGRAM = "program"
+
+
+class Scene(NamedTuple):
+    # por defecto, los valores de un SoundEngine recien creado
+    reverb_room: float = 0.70
+    reverb_damp: float = 0.20
+    reverb_width: float = 0.90
+    reverb_level: float = 0.60
+    reverb_active: bool = True
+    reverb_send: float = 1.0
+    brightness: int = 100
+    master_db: float = 20.0
+    limiter: bool = False
+    velocity_gain: float = 3.0
+    gamma: float = 1.0
+    bank: int = 0
+    program: int = 0
+
+    def to_dict(self) -> dict:
+        return dict(self._asdict())
+
+    @classmethod
+    def from_dict(cls, data: Mapping, base: "Scene | None" = None) -> "Scene":
+        """Build a scene from a (possibly partial) mapping; missing fields come from ``base``."""
+        base = base or cls()
+        values = {}
+        for field in cls._fields:
+            value = data.get(field, getattr(base, field))
+            values[field] = type(cls._field_defaults[field])(value)
+        return cls(**values)
+
+
+def _send(scene: Scene) -> int:
+    if not scene.reverb_active:
+        return 0
+    return int(round(max(0.0, min(1.0, scene.reverb_send)) * 127))
+
+
+def diff(current: Scene, target: Scene) -> Tuple[str, ...]:
+    """Groups of settings that differ between two scenes (empty if nothing to do).
+
+    Values are compared the way they reach FluidSynth: the send as the 0..127
+    CC91 it produces (0 while the reverb is off), so sub-step float noise does
+    not trigger a write.
+    """
+    groups = []
+    if current[:4] != target[:4]:
+        groups.append(REVERB)
+    if current.reverb_active != target.reverb_active:
+        groups.append(REVERB_ACTIVE)
+    if _send(current) != _send(target):
+        groups.append(SEND)
+    if current.brightness != target.brightness:
+        groups.append(BRIGHTNESS)
+    if abs(current.master_db - target.master_db) > 1e-6:
+        groups.append(MASTER)
+    if current.limiter != target.limiter:
+        groups.append(LIMITER)
+    if current.velocity_gain != target.velocity_gain or current.gamma != target.gamma:
+        groups.append(VELOCITY)
+    if (current.bank, current.program) != (target.bank, target.program):
+        groups.append(PROGRAM)
+    return tuple(groups)
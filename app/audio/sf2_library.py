@@ -0,0 +1,262 @@
+"""SoundFont library: resident fonts kept in an LRU and an on-disk metadata index.
+
+Recently used fonts stay loaded in the synth (not selected) while their
+sample memory fits in ``budget_mb``, so going back to one of them is a
+``program_select`` instead of a reload. ``info()`` reads the preset list and
+sample size straight from the SF2 chunks and caches them in a JSON index keyed
+by path, size and mtime, so a picker can show a font's contents without
+loading or even parsing it again.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from app.audio.log import get_channel
+
+_log = get_channel("sf2")
+
+PHDR_SIZE = 38
+RECENT_MAX = 8
+
+
+class Sf2Info(NamedTuple):
+    path: str
+    name: str
+    size: int
+    mtime: float
+    sample_bytes: int
+    presets: Tuple[Tuple[int, int, str], ...]  # (banco, programa, nombre)
+
+
+def read_sf2_info(path: Path) -> Sf2Info:
+    """Parse the RIFF structure of an SF2; sample data is skipped, never read."""
+    path = Path(path)
+    st = path.stat()
+    name = path.stem
+    sample_bytes = 0
+    presets: List[Tuple[int, int, str]] = []
+    with open(path, "rb") as fh:
+        riff, size, form = struct.unpack("<4sI4s", fh.read(12))
+        if riff != b"RIFF" or form != b"sfbk":
+            raise ValueError(f"No es un SoundFont 2: {path.name}")
+        end = min(8 + size, st.st_size)
+        while fh.tell() + 8 <= end:
+            chunk, length = struct.unpack("<4sI", fh.read(8))
+            start = fh.tell()
+            if chunk == b"LIST":
+                kind = fh.read(4)
+                list_end = start + length
+                while fh.tell() + 8 <= list_end:
+                    sub, sub_len = struct.unpack("<4sI", fh.read(8))
+                    sub_start = fh.tell()
+                    if kind == b"INFO" and sub == b"INAM":
+                        title = fh.read(sub_len).split(b"\0", 1)[0].decode("latin-1").strip()
+                        name = title or name
+                    elif kind == b"sdta" and sub in (b"smpl", b"sm24"):
+                        sample_bytes += sub_len
+                    elif kind == b"pdta" and sub == b"phdr":
+                        data = fh.read(sub_len)
+                        # el ultimo registro es el terminador "EOP"
+                        for off in range(0, len(data) - 2 * PHDR_SIZE + 1, PHDR_SIZE):
+                            raw, program, bank = struct.unpack_from("<20sHH", data, off)
+                            label = raw.split(b"\0", 1)[0].decode("latin-1").strip()
+                            presets.append((bank, program, label))
+                    fh.seek(sub_start + sub_len + (sub_len & 1))
+            fh.seek(start + length + (length & 1))
+    return Sf2Info(str(path), name, st.st_size, st.st_mtime, sample_bytes, tuple(sorted(presets)))
+
+
+class SoundFontLibrary:
+    """LRU of fonts resident in one ``SoundEngine`` plus the metadata index."""
+
+    def __init__(self, engine, index_path: Path | None = None, budget_mb: float = 512.0) -> None:
+        self.engine = engine
+        self.index_path = Path(index_path) if index_path else None
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.recent: List[str] = []
+        self._index = {}
+        self._resident: "OrderedDict[str, int]" = OrderedDict()
+        self._active: Optional[str] = None
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._load_index()
+
+    # -- indice de metadatos -------------------------------------------------
+    @staticmethod
+    def _key(path) -> str:
+        return str(Path(path).resolve())
+
+    def _load_index(self) -> None:
+        if self.index_path is None or not self.index_path.exists():
+            return
+        try:
+            raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+            for key, entry in raw.get("fonts", {}).items():
+                entry["presets"] = tuple(tuple(p) for p in entry.get("presets", ()))
+                self._index[key] = Sf2Info(**entry)
+            self.recent = [p for p in raw.get("recent", []) if isinstance(p, str)][:RECENT_MAX]
+        except Exception as exc:
+            _log.warn("Indice de SoundFonts ilegible (%s); se rearma", exc)
+            self._index = {}
+
+    def _schedule_save(self) -> None:
+        # fuera del hilo de la GUI: el fsync puede tardar
+        if self.index_path is not None:
+            threading.Thread(target=self._save_index, name="sf2-index", daemon=True).start()
+
+    def _save_index(self) -> None:
+        if self.index_path is None:
+            return
+        from app.state.settings import atomic_write
+
+        with self._lock:
+            doc = {
+                "recent": list(self.recent),
+                "fonts": {key: info._asdict() for key, info in self._index.items()},
+            }
+        try:
+            with self._save_lock:
+                atomic_write(self.index_path, json.dumps(doc, ensure_ascii=False, indent=1))
+        except Exception as exc:
+            _log.warn("No pude guardar el indice de SoundFonts: %s", exc)
+
+    def info(self, path) -> Sf2Info:
+        """Metadata of a font, from the index when the file did not change."""
+        key = self._key(path)
+        st = Path(key).stat()
+        with self._lock:
+            cached = self._index.get(key)
+        if cached is not None and cached.size == st.st_size and cached.mtime == st.st_mtime:
+            return cached
+        info = read_sf2_info(Path(key))
+        with self._lock:
+            self._index[key] = info
+        self._schedule_save()
+        return info
+
+    def known(self) -> List[Sf2Info]:
+        """Every indexed font (no file access)."""
+        with self._lock:
+            return sorted(self._index.values(), key=lambda info: info.name.lower())
+
+    # -- fuentes residentes --------------------------------------------------
+    def resident(self) -> List[str]:
+        with self._lock:
+            return list(self._resident)
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sample_bytes(key) for key in self._resident)
+
+    def _sample_bytes(self, key: str) -> int:
+        info = self._index.get(key)
+        return info.sample_bytes if info is not None else 0
+
+    def adopt(self, path, sfid: int) -> None:
+        """Register the font the engine loaded by itself (the one at startup)."""
+        key = self._key(path)
+        self._safe_info(key)
+        with self._lock:
+            self._resident[key] = int(sfid)
+            self._active = key
+            self._touch_recent(key)
+        self._schedule_save()
+
+    def select(self, path, bank: int = 0, preset: int = 0):
+        """Play ``path``: a program_select if resident, otherwise a background load.
+
+        Returns the engine's ``SoundFontLoad``; the previous font stays
+        resident and the least recently used ones are unloaded once the
+        budget is exceeded.
+        """
+        key = self._key(path)
+        self._safe_info(key)
+        with self._lock:
+            sfid = self._resident.get(key)
+            self._active = key
+            self._touch_recent(key)
+            if sfid is not None:
+                self._resident.move_to_end(key)
+        if not self._keeps_resident():
+            # cada fuente se recorta a las notas de los pads: no hay nada que dejar residente
+            with self._lock:
+                self._resident.clear()
+            load = self.engine.load_sf2_async(Path(key), bank, preset)
+        elif sfid is not None:
+            load = self.engine.select_sf2(sfid, bank, preset, Path(key))
+        else:
+            load = self.engine.load_sf2_async(Path(key), bank, preset, unload_previous=False)
+            load.add_done_callback(lambda done: self._loaded(key, done))
+        self._schedule_save()
+        return load
+
+    def preload(self, paths: Iterable) -> threading.Thread:
+        """Warm start: load recent fonts in the background, unselected, while they fit."""
+        keys = [self._key(p) for p in paths] if self._keeps_resident() else []
+
+        def work() -> None:
+            for key in keys:
+                if not Path(key).exists():
+                    continue
+                info = self._safe_info(key)
+                with self._lock:
+                    if key in self._resident:
+                        continue
+                    needed = info.sample_bytes if info else 0
+                    if self.resident_bytes() + needed > self.budget:
+                        continue
+                try:
+                    load = self.engine.load_sf2_async(Path(key), select=False)
+                    load.result()
+                except Exception as exc:
+                    _log.warn("Precarga de %s fallo: %s", Path(key).name, exc)
+                    continue
+                with self._lock:
+                    self._resident[key] = load.sfid
+                    self._resident.move_to_end(key, last=False)
+                _log.info("SoundFont residente: %s", Path(key).name)
+
+        thread = threading.Thread(target=work, name="sf2-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def _keeps_resident(self) -> bool:
+        return getattr(self.engine, "sample_loading", "full") != "notes"
+
+    def _safe_info(self, key: str) -> Optional[Sf2Info]:
+        try:
+            return self.info(key)
+        except Exception as exc:
+            _log.warn("Sin metadatos para %s: %s", Path(key).name, exc)
+            return None
+
+    def _touch_recent(self, key: str) -> None:
+        if key in self.recent:
+            self.recent.remove(key)
+        self.recent.insert(0, key)
+        del self.recent[RECENT_MAX:]
+
+    def _loaded(self, key: str, load) -> None:
+        if load.error or load.sfid is None or load.stage != "listo":
+            return
+        with self._lock:
+            self._resident[key] = load.sfid
+            self._resident.move_to_end(key)
+            evict = []
+            total = sum(self._sample_bytes(k) for k in self._resident)
+            for other in list(self._resident):
+                if total <= self.budget:
+                    break
+                if other == self._active:
+                    continue
+                total -= self._sample_bytes(other)
+                evict.append(self._resident.pop(other))
+        for sfid in evict:
+            self.engine.unload_sf2(sfid)
+        if evict:
+            _log.info("SoundFonts descargados por presupuesto: %d", len(evict))
@@ -0,0 +1,162 @@
+"""Background SoundFont loading: progress handle and file pre-read.
+
+``SoundEngine.load_sf2_async`` runs the load on a worker thread. The file is
+first read sequentially into the OS page cache, which is the slow part for a
+large SF2 on disk and lets us report progress by bytes; ``sfload`` then parses
+from memory. The new font is loaded without touching the channel programs,
+so the previous one keeps playing until the engine swaps programs between two
+audio blocks and unloads the old font afterwards.
+
+``LOADING_MODES`` are the sample memory strategies: "full" keeps every sample
+of the font in RAM (FluidSynth's default), "dynamic" turns on
+``synth.dynamic-sample-loading`` so only the samples of presets selected on a
+channel are loaded, and "notes" loads a subset of the active preset holding
+only the zones of the pad notes (``app.audio.sf2_subset``).
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Callable
+
+CHUNK = 4 << 20
+
+# fracciones del progreso total que ocupa cada etapa
+READ_SHARE = 0.85
+STAGES = ("pendiente", "lectura", "carga", "cambio", "descarga", "listo", "error", "cancelado")
+
+LOADING_MODES = ("full", "dynamic", "notes")
+DEFAULT_LOADING = "full"
+LOADING_LABELS = {
+    "full": "Completa (todo en memoria)",
+    "dynamic": "Dinamica (solo el preset en uso)",
+    "notes": "Solo las notas de los pads",
+}
+
+
+class SoundFontLoad:
+    """State of one background load; the GUI polls it, ``add_done_callback`` is for non-GUI code.
+
+    ``stage`` walks through ``STAGES`` and ``progress`` goes from 0.0 to 1.0.
+    ``sfid`` is the new font id once loaded, ``previous`` the id it replaced.
+    With ``select`` False the font is only loaded (kept resident, not
+    played); with ``unload_previous`` False the replaced font stays loaded.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        bank: int = 0,
+        preset: int = 0,
+        select: bool = True,
+        unload_previous: bool = True,
+    ) -> None:
+        self.path = Path(path)
+        self.bank = int(bank)
+        self.preset = int(preset)
+        self.select = bool(select)
+        self.unload_previous = bool(unload_previous)
+        self.stage = "pendiente"
+        self.progress = 0.0
+        self.error = None
+        self.sfid = None
+        self.previous = None
+        self.cancelled = False
+        # notas del subconjunto cargado (modo "notes"); vacio = fuente completa
+        self.notes = ()
+        # fuente ya cargada (SoundEngine.select_sf2): solo falta el program_select
+        self.resident = False
+        self.swapped = threading.Event()
+        self._done = threading.Event()
+        self._callbacks = []
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def result(self, timeout: float | None = None) -> int:
+        """Block until finished; return the new font id or raise the load error."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"SoundFont todavia cargando: {self.path.name}")
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        if self.cancelled:
+            raise RuntimeError(f"Carga cancelada: {self.path.name}")
+        return self.sfid
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def add_done_callback(self, callback: Callable[["SoundFontLoad"], None]) -> None:
+        """Run ``callback(load)`` once finished, on the thread that finishes it (keep it short)."""
+        self._callbacks.append(callback)
+        if self._done.is_set() and callback in self._callbacks:
+            self._callbacks.remove(callback)
+            callback(self)
+
+    def finish(self, stage: str = "listo", error: str | None = None) -> None:
+        self.error = error
+        self.stage = stage
+        if stage == "listo":
+            self.progress = 1.0
+        self._done.set()
+        while self._callbacks:
+            try:
+                self._callbacks.pop(0)(self)
+            except IndexError:
+                break
+            except Exception:
+                pass
+
+
+def preread(path: Path, report: Callable[[float], None], should_stop: Callable[[], bool] = lambda: False) -> bool:
+    """Read ``path`` once so ``sfload`` finds it in the page cache; False if stopped."""
+    size = max(1, Path(path).stat().st_size)
+    done = 0
+    buf = bytearray(CHUNK)
+    with open(path, "rb", buffering=0) as fh:
+        while True:
+            if should_stop():
+                return False
+            n = fh.readinto(buf)
+            if not n:
+                return True
+            done += n
+            report(min(1.0, done / size))
+
+
+def rss_bytes() -> int | None:
+    """Resident memory of this process, or None where it cannot be read."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class _Counters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = _Counters()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return int(counters.WorkingSetSize)
+            return None
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
@@ -0,0 +1,314 @@
+"""Note-subset SoundFonts: keep only the zones the active pads can play.
+
+``build_subset`` writes a valid SF2 holding one preset (``bank``/``program``)
+reduced to the preset and instrument zones whose key range covers one of
+``notes``, with every velocity layer of those zones and only the samples they
+reference. The source sample chunk is memory-mapped, so building touches just
+the pages of the samples kept; ``sfload`` of the result then puts a few MB in
+RAM instead of the whole font. Subsets are cached under ``CACHE_DIR`` keyed by
+source file, preset and notes, so going back to a note set is a plain load.
+"""
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+CACHE_DIR = Path.home() / ".timbal_app" / "sf2_cache"
+CACHE_MAX = 32
+
+GEN_INSTRUMENT = 41
+GEN_KEY_RANGE = 43
+GEN_SAMPLE_ID = 53
+# puntos en cero que la especificacion pide despues de cada muestra
+GUARD_POINTS = 46
+LINKED_TYPES = 2 | 4 | 8
+ROM_SAMPLE = 0x8000
+
+# (nombre de subchunk, tamano de registro)
+PDTA = (
+    (b"phdr", 38),
+    (b"pbag", 4),
+    (b"pmod", 10),
+    (b"pgen", 4),
+    (b"inst", 22),
+    (b"ibag", 4),
+    (b"imod", 10),
+    (b"igen", 4),
+    (b"shdr", 46),
+)
+
+
+class _Chunks(NamedTuple):
+    info: bytes  # LIST INFO completo, se copia tal cual
+    smpl: Tuple[int, int]  # (offset, largo) en el archivo
+    sm24: Tuple[int, int]
+    pdta: Dict[bytes, bytes]
+
+
+class SubsetInfo(NamedTuple):
+    path: Path
+    zones: int
+    samples: int
+    size: int  # bytes del subconjunto en disco
+    source_size: int
+
+
+def _walk(fh, end: int):
+    while fh.tell() + 8 <= end:
+        tag, length = struct.unpack("<4sI", fh.read(8))
+        start = fh.tell()
+        yield tag, start, length
+        fh.seek(start + length + (length & 1))
+
+
+def _read_chunks(path: Path) -> _Chunks:
+    info = b""
+    smpl = sm24 = (0, 0)
+    pdta: Dict[bytes, bytes] = {}
+    with open(path, "rb") as fh:
+        riff, size, form = struct.unpack("<4sI4s", fh.read(12))
+        if riff != b"RIFF" or form != b"sfbk":
+            raise ValueError(f"No es un SoundFont 2: {path.name}")
+        for tag, start, length in _walk(fh, 8 + size):
+            if tag != b"LIST":
+                continue
+            kind = fh.read(4)
+            if kind == b"INFO":
+                fh.seek(start - 8)
+                info = fh.read(length + 8)
+                continue
+            for sub, sub_start, sub_len in _walk(fh, start + length):
+                if kind == b"sdta" and sub == b"smpl":
+                    smpl = (sub_start, sub_len)
+                elif kind == b"sdta" and sub == b"sm24":
+                    sm24 = (sub_start, sub_len)
+                elif kind == b"pdta":
+                    pdta[sub] = fh.read(sub_len)
+    missing = [name.decode() for name, _ in PDTA if name not in pdta]
+    if not info or missing:
+        raise ValueError(f"SoundFont incompleto ({', '.join(missing) or 'INFO'}): {path.name}")
+    return _Chunks(info, smpl, sm24, pdta)
+
+
+def _records(data: bytes, size: int) -> List[bytes]:
+    return [data[off:off + size] for off in range(0, len(data) - size + 1, size)]
+
+
+def _zones(bags: List[bytes], first: int, last: int) -> List[Tuple[int, int, int, int]]:
+    """(gen_start, gen_end, mod_start, mod_end) of bags ``first``..``last``-1."""
+    out = []
+    for bag in range(first, last):
+        gen0, mod0 = struct.unpack("<HH", bags[bag])
+        gen1, mod1 = struct.unpack("<HH", bags[bag + 1])
+        out.append((gen0, gen1, mod0, mod1))
+    return out
+
+
+def _key_range(gens: List[bytes], default: Tuple[int, int] = (0, 127)) -> Tuple[int, int]:
+    for gen in gens:
+        oper, lo, hi = struct.unpack("<HBB", gen)
+        if oper == GEN_KEY_RANGE:
+            return lo, hi
+    return default
+
+
+def _terminal(gens: List[bytes], oper: int):
+    if gens:
+        last, amount = struct.unpack("<HH", gens[-1])
+        if last == oper:
+            return amount
+    return None
+
+
+def _select_zones(zones, gens, oper: int, notes):
+    """Zones to keep: the global one plus those covering ``notes``.
+
+    Returns ``[(zone, target, covered_notes)]``; ``target`` is the terminal
+    generator amount (instrument or sample index), None for the global zone.
+    """
+    kept = []
+    default = (0, 127)
+    for idx, (g0, g1, _, _) in enumerate(zones):
+        zone_gens = gens[g0:g1]
+        target = _terminal(zone_gens, oper)
+        if target is None:
+            if idx == 0:
+                # la zona global da el rango por defecto de las demas
+                default = _key_range(zone_gens)
+                kept.append((zones[idx], None, ()))
+            continue
+        lo, hi = _key_range(zone_gens, default)
+        covered = tuple(n for n in notes if lo <= n <= hi)
+        if covered:
+            kept.append((zones[idx], target, covered))
+    return kept
+
+
+def subset_path(source: Path, bank: int, program: int, notes: Iterable[int], cache_dir: Path | None = None) -> Path:
+    """Cache file name of a subset (changes with the source's size and mtime)."""
+    source = Path(source).resolve()
+    st = source.stat()
+    key = f"{source}|{st.st_size}|{st.st_mtime_ns}|{bank}|{program}|{sorted(set(notes))}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir or CACHE_DIR) / f"{source.stem}-{digest}.sf2"
+
+
+def build_subset(
+    source: Path,
+    bank: int,
+    program: int,
+    notes: Iterable[int],
+    cache_dir: Path | None = None,
+    report: Callable[[float], None] = lambda fraction: None,
+) -> SubsetInfo:
+    """Write (or reuse) the subset of ``source`` for ``notes``; see the module docstring."""
+    source = Path(source)
+    notes = tuple(sorted({int(n) for n in notes}))
+    if not notes:
+        raise ValueError("Hace falta al menos una nota para recortar el SoundFont")
+    target = subset_path(source, bank, program, notes, cache_dir)
+    chunks = _read_chunks(source)
+    pd = {name: _records(chunks.pdta[name], size) for name, size in PDTA}
+    phdr, pbag, pmod, pgen = pd[b"phdr"], pd[b"pbag"], pd[b"pmod"], pd[b"pgen"]
+    inst, ibag, imod, igen, shdr = pd[b"inst"], pd[b"ibag"], pd[b"imod"], pd[b"igen"], pd[b"shdr"]
+
+    preset = None
+    for idx in range(len(phdr) - 1):
+        _, prog, bnk, _ = struct.unpack_from("<20sHHH", phdr[idx])
+        if (bnk, prog) == (bank, program):
+            preset = idx
+            break
+    if preset is None:
+        raise ValueError(f"El SoundFont no tiene el preset {bank}:{program}: {source.name}")
+
+    first = struct.unpack_from("<H", phdr[preset], 24)[0]
+    last = struct.unpack_from("<H", phdr[preset + 1], 24)[0]
+    preset_zones = _select_zones(_zones(pbag, first, last), pgen, GEN_INSTRUMENT, notes)
+
+    # notas que cada instrumento tiene que cubrir (union de las zonas de preset que lo usan)
+    inst_notes: Dict[int, set] = {}
+    for _, instrument, covered in preset_zones:
+        if instrument is not None:
+            inst_notes.setdefault(instrument, set()).update(covered)
+    inst_map = {old: new for new, old in enumerate(sorted(inst_notes))}
+
+    inst_zones = {}
+    sample_ids = set()
+    for old in inst_map:
+        first = struct.unpack_from("<H", inst[old], 20)[0]
+        last = struct.unpack_from("<H", inst[old + 1], 20)[0]
+        kept = _select_zones(_zones(ibag, first, last), igen, GEN_SAMPLE_ID, sorted(inst_notes[old]))
+        inst_zones[old] = kept
+        sample_ids.update(sample for _, sample, _ in kept if sample is not None)
+    # los pares estereo viajan juntos
+    pending = list(sample_ids)
+    while pending:
+        link, kind = struct.unpack_from("<HH", shdr[pending.pop()], 42)
+        if kind & LINKED_TYPES and link < len(shdr) - 1 and link not in sample_ids:
+            sample_ids.add(link)
+            pending.append(link)
+    sample_map = {old: new for new, old in enumerate(sorted(sample_ids))}
+
+    if target.exists():
+        target.touch()
+        return SubsetInfo(target, len(preset_zones), len(sample_map), target.stat().st_size, source.stat().st_size)
+
+    # -- muestras: copia de los rangos usados desde el chunk mapeado -------------
+    smpl_out = bytearray()
+    sm24_out = bytearray()
+    new_shdr = []
+    guard16 = bytes(2 * GUARD_POINTS)
+    guard8 = bytes(GUARD_POINTS)
+    with open(source, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        smpl_off = chunks.smpl[0]
+        sm24_off = chunks.sm24[0] if chunks.sm24[1] else None
+        for done, old in enumerate(sorted(sample_ids)):
+            name, start, end, loop0, loop1, rate, key, corr, link, kind = struct.unpack("<20sIIIIIBbHH", shdr[old])
+            if kind & ROM_SAMPLE:
+                new_shdr.append(shdr[old])
+                continue
+            base = len(smpl_out) // 2
+            smpl_out += mm[smpl_off + 2 * start:smpl_off + 2 * end]
+            smpl_out += guard16
+            if sm24_off is not None:
+                sm24_out += mm[sm24_off + start:sm24_off + end]
+                sm24_out += guard8
+            shift = base - start
+            new_link = sample_map.get(link, sample_map[old]) if kind & LINKED_TYPES else 0
+            new_shdr.append(struct.pack(
+                "<20sIIIIIBbHH", name, base, end + shift, max(0, loop0 + shift), max(0, loop1 + shift),
+                rate, key, corr, new_link, kind,
+            ))
+            report((done + 1) / len(sample_ids))
+    new_shdr.append(shdr[-1])
+
+    # -- pdta reindexado ----------------------------------------------------------
+    out_gens: Dict[bytes, List[bytes]] = {b"pgen": [], b"igen": []}
+    out_mods: Dict[bytes, List[bytes]] = {b"pmod": [], b"imod": []}
+
+    def copy_zones(kept, gens, mods, gen_key, mod_key, oper, remap) -> List[bytes]:
+        bags = []
+        for (g0, g1, m0, m1), zone_target, _ in kept:
+            bags.append(struct.pack("<HH", len(out_gens[gen_key]), len(out_mods[mod_key])))
+            for gen in gens[g0:g1]:
+                gen_oper = struct.unpack_from("<H", gen)[0]
+                if gen_oper == oper and zone_target is not None:
+                    gen = struct.pack("<HH", oper, remap[zone_target])
+                out_gens[gen_key].append(gen)
+            out_mods[mod_key].extend(mods[m0:m1])
+        return bags
+
+    new_pbag = copy_zones(preset_zones, pgen, pmod, b"pgen", b"pmod", GEN_INSTRUMENT, inst_map)
+    new_ibag: List[bytes] = []
+    new_inst = []
+    for old in sorted(inst_map):
+        new_inst.append(inst[old][:20] + struct.pack("<H", len(new_ibag)))
+        new_ibag += copy_zones(inst_zones[old], igen, imod, b"igen", b"imod", GEN_SAMPLE_ID, sample_map)
+    new_inst.append(inst[-1][:20] + struct.pack("<H", len(new_ibag)))
+    new_pbag.append(struct.pack("<HH", len(out_gens[b"pgen"]), len(out_mods[b"pmod"])))
+    new_ibag.append(struct.pack("<HH", len(out_gens[b"igen"]), len(out_mods[b"imod"])))
+    new_phdr = [
+        phdr[preset][:24] + struct.pack("<H", 0) + phdr[preset][26:],
+        phdr[-1][:24] + struct.pack("<H", len(new_pbag) - 1) + phdr[-1][26:],
+    ]
+    terminal = {b"pgen": bytes(4), b"igen": bytes(4), b"pmod": bytes(10), b"imod": bytes(10)}
+    for key, records in list(out_gens.items()) + list(out_mods.items()):
+        records.append(terminal[key])
+
+    pdta = {
+        b"phdr": new_phdr, b"pbag": new_pbag, b"pmod": out_mods[b"pmod"], b"pgen": out_gens[b"pgen"],
+        b"inst": new_inst, b"ibag": new_ibag, b"imod": out_mods[b"imod"], b"igen": out_gens[b"igen"],
+        b"shdr": new_shdr,
+    }
+    sdta = _chunk(b"smpl", bytes(smpl_out))
+    if sm24_out:
+        sdta += _chunk(b"sm24", bytes(sm24_out))
+    body = (
+        chunks.info
+        + _chunk(b"LIST", b"sdta" + sdta)
+        + _chunk(b"LIST", b"pdta" + b"".join(_chunk(name, b"".join(pdta[name])) for name, _ in PDTA))
+    )
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # a medio escribir nunca queda con el nombre final: el cache no se valida al reusar
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(b"RIFF" + struct.pack("<I", 4 + len(body)) + b"sfbk" + body)
+    os.replace(tmp, target)
+    _trim_cache(target.parent)
+    return SubsetInfo(target, len(preset_zones), len(sample_map), target.stat().st_size, source.stat().st_size)
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack("<4sI", tag, len(data)) + data + (b"\0" if len(data) & 1 else b"")
+
+
+def _trim_cache(folder: Path) -> None:
+    files = sorted(folder.glob("*.sf2"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[CACHE_MAX:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
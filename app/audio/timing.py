@@ -0,0 +1,70 @@
+"""Timestamped events: host time <-> audio stream position.
+
+With ``dispatch_mode="sequencer"`` a hit is not played when the render thread
+gets to it but at its capture time plus a fixed delay, placed in the audio
+stream by FluidSynth's sequencer (driven by the synth's own sample clock, no
+system timer). ``StreamClock`` is the map between the two time bases: the audio
+callback reports the sequencer tick at the start of every block together with
+``perf_counter_ns``. Callbacks can run late but never early, so the clock keeps
+the earliest anchor it has seen and only follows drift with the smallest error
+of each window; a jump beyond ``RESYNC_NS`` (xrun, driver restart) re-anchors.
+"""
+from __future__ import annotations
+
+# margen sobre un periodo de audio para el retardo fijo de los eventos con sello
+SCHEDULE_MARGIN_MS = 2.0
+RESYNC_NS = 50_000_000
+WINDOW_BLOCKS = 256
+
+
+class StreamClock:
+    """Maps ``perf_counter_ns`` to stream ticks; fed by the audio callback only."""
+
+    def __init__(self, ticks_per_second: float) -> None:
+        self.ticks_per_second = float(ticks_per_second)
+        self._ns_per_tick = 1e9 / self.ticks_per_second
+        self.anchor_ns = 0
+        self.anchor_tick = 0
+        self.tick = 0
+        # ticks del ultimo bloque (0 hasta el segundo bloque)
+        self.period = 0
+        self.synced = False
+        self.resyncs = 0
+        self._min_error = None
+        self._blocks = 0
+
+    def block(self, now_ns: int, tick: int) -> None:
+        """Record the start of a block: ``tick`` is due to play at about ``now_ns``."""
+        if self.synced and tick > self.tick:
+            self.period = tick - self.tick
+        self.tick = tick
+        if not self.synced:
+            self._anchor(now_ns, tick)
+            return
+        error = now_ns - (self.anchor_ns + (tick - self.anchor_tick) * self._ns_per_tick)
+        if error < 0 or error > RESYNC_NS:
+            # un bloque antes de lo previsto: el ancla estaba atrasada; muy tarde: se corto el audio
+            if error > 0:
+                self.resyncs += 1
+            self._anchor(now_ns, tick)
+            return
+        if self._min_error is None or error < self._min_error:
+            self._min_error = error
+        self._blocks += 1
+        if self._blocks >= WINDOW_BLOCKS:
+            # deriva entre el reloj de la placa y el del host: el menor atraso de la ventana
+            self.anchor_ns += int(self._min_error)
+            self._min_error = None
+            self._blocks = 0
+
+    def tick_at(self, host_ns: int) -> int:
+        """Stream tick that plays at ``host_ns`` (per the current anchor)."""
+        return self.anchor_tick + int(round((host_ns - self.anchor_ns) / self._ns_per_tick))
+
+    def _anchor(self, now_ns: int, tick: int) -> None:
+        self.anchor_ns = now_ns
+        self.anchor_tick = tick
+        self.synced = True
+        self._min_error = None
+        self._blocks = 0
+
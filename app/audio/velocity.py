@@ -0,0 +1,47 @@
+"""Velocity shaping tables for SoundEngine.disparar."""
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+VelocityTable = Tuple[int, ...]
+
+IDENTITY: VelocityTable = tuple(range(128))
+
+
+def shape_velocity(
+    velocity: int,
+    gamma: float,
+    velocity_gain: float,
+    master_linear: float,
+    limiter_ceiling: Optional[float] = None,
+) -> int:
+    """Reference implementation of the per-hit velocity formula."""
+    x = max(0.0, min(1.0, velocity / 127.0))
+    shaped = pow(x, gamma) * 127.0
+    master_scale = master_linear if master_linear < 1.0 else 1.0
+    v = int(max(1, min(127, shaped * velocity_gain * master_scale)))
+    if limiter_ceiling is not None:
+        ceiling = int(max(1, min(127, round(limiter_ceiling * 127))))
+        if v > ceiling:
+            v = ceiling
+    return v
+
+
+def build_velocity_table(
+    gamma: float,
+    velocity_gain: float,
+    master_linear: float,
+    limiter_ceiling: Optional[float] = None,
+) -> VelocityTable:
+    """Precompute ``shape_velocity`` for every MIDI velocity (0 stays 0)."""
+    return (0,) + tuple(
+        shape_velocity(vel, gamma, velocity_gain, master_linear, limiter_ceiling)
+        for vel in range(1, 128)
+    )
+
+
+def compose(curve: Sequence[int], table: VelocityTable) -> VelocityTable:
+    """Apply a per-pad input curve before the global shaping table."""
+    if len(curve) != 128:
+        raise ValueError("La curva de velocidad debe tener 128 entradas")
+    return (0,) + tuple(table[max(1, min(127, int(curve[vel])))] for vel in range(1, 128))
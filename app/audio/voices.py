@@ -0,0 +1,94 @@
+"""Voice bookkeeping for timbal rolls: per-note cap, choke and polyphony budget.
+
+FluidSynth already releases the previous voice of a note when it is struck
+again, but a timpani release is the whole decay of the drum: during a roll
+every hit keeps ringing and the voices of one pad pile up until the synth runs
+out of polyphony and steals voices of the other pads. ``VoiceManager`` counts
+the hits of each note still ringing (struck less than ``ring_s`` ago). When a
+note reaches ``per_note``, the next hit moves to the note's other channel and
+the first channel is choked: its release is shortened by ``choke_tc``
+timecents (a channel generator offset, so it also reaches the voices already
+releasing) and its voices are released, so the pile fades out in a fraction of
+its natural decay instead of being cut with a click.
+
+Each note channel has a partner in the same output group (``ALT_CHANNELS``),
+so the pad meters do not change. The manager only decides; the render thread
+makes the FluidSynth calls.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Tuple
+
+# Grupo de salida 0 = todo lo que no es pad; los pads van en los grupos 1..PAD_GROUPS
+# (aca y no en meters, que necesita numpy: el motor los usa al importarse)
+PAD_GROUPS = 5
+OUTPUT_GROUPS = PAD_GROUPS + 1
+# canal hermano de cada canal de notas 0..PAD_GROUPS, en el mismo grupo de salida
+# (canal % OUTPUT_GROUPS); se evita el 9, que FluidSynth trata como percusion GM
+ALT_CHANNELS = (6, 7, 8, 15, 10, 11)
+GEN_VOLENVRELEASE = 38
+
+
+class VoicePolicy(NamedTuple):
+    per_note: int = 3  # golpes sonando por nota antes de ahogar (0 = sin tope)
+    polyphony: int = 128  # synth.polyphony: tope de voces de FluidSynth
+    choke_tc: float = -4800.0  # acorta el release x 2^(tc/1200): -4800 = 16 veces
+    ring_s: float = 2.5  # cuanto se considera que sigue sonando un golpe
+
+    @classmethod
+    def from_dict(cls, data) -> "VoicePolicy":
+        """Build from a config dict, ignoring unknown keys and bad values."""
+        values = {}
+        for field, default in cls._field_defaults.items():
+            try:
+                values[field] = type(default)((data or {})[field])
+            except (KeyError, TypeError, ValueError):
+                values[field] = default
+        return cls(**values)
+
+
+class VoiceManager:
+    """Decides the channel of every note_on; runs on the render thread only."""
+
+    def __init__(self, policy: VoicePolicy | None = None) -> None:
+        self.policy = policy or VoicePolicy()
+        self._ring_ns = int(self.policy.ring_s * 1e9)
+        # por nota: sellos de los golpes que siguen sonando y cual canal del par usa
+        self._hits = [[] for _ in range(128)]
+        self._side = [0] * 128
+        # canales ahogados: hay que devolverles el release antes de volver a usarlos
+        self._choked = set()
+        self.chokes = 0
+        self.choked_hits = 0
+
+    def set_policy(self, policy: VoicePolicy) -> None:
+        self.policy = policy
+        self._ring_ns = int(policy.ring_s * 1e9)
+
+    def note_on(self, note: int, channel: int, now_ns: int) -> Tuple[int, int, bool]:
+        """Return ``(play_channel, choke_channel or -1, restore_release)`` for a hit."""
+        hits = self._hits[note]
+        horizon = now_ns - self._ring_ns
+        while hits and hits[0] < horizon:
+            hits.pop(0)
+        choke = -1
+        cap = self.policy.per_note
+        if cap > 0 and len(hits) >= cap:
+            choke = self.channel(note, channel)
+            self._side[note] ^= 1
+            self._choked.add(choke)
+            self.chokes += 1
+            self.choked_hits += len(hits)
+            hits.clear()
+        play = self.channel(note, channel)
+        restore = play in self._choked
+        if restore:
+            self._choked.discard(play)
+        hits.append(now_ns)
+        return play, choke, restore
+
+    def channel(self, note: int, channel: int) -> int:
+        """Channel the note currently sounds on, given its base channel."""
+        if self._side[note] and channel < len(ALT_CHANNELS):
+            return ALT_CHANNELS[channel]
+        return channel
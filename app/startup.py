@@ -0,0 +1,47 @@
+"""Startup phase timing for ``main.py --profile-startup``."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import List, Tuple
+
+
+class StartupProfile:
+    """Collects named timestamps from any thread and formats a breakdown."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._t0 = time.perf_counter()
+        self._marks: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def mark(self, phase: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._marks.append((phase, time.perf_counter()))
+
+    def report(self) -> str:
+        with self._lock:
+            marks = sorted(self._marks, key=lambda item: item[1])
+        lines = ["Arranque (ms)          fase     acumulado"]
+        prev = self._t0
+        for phase, stamp in marks:
+            lines.append(
+                f"  {phase:<18} {(stamp - prev) * 1000:8.1f}  {(stamp - self._t0) * 1000:10.1f}"
+            )
+            prev = stamp
+        return "\n".join(lines)
+
+    def print_once(self) -> None:
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        print(self.report(), flush=True)
+
+
+PROFILE = StartupProfile()
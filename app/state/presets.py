@@ -1,9 +1,310 @@
+"""Preset repository: reverb, dynamics, note sets, calibration profiles and scenes.
 
+Every preset is one JSON file under ``PRESETS_DIR/<kind>/<name>.json``. The
+repository scans those folders once and keeps an in-memory index (name, kind,
+mtime, size); bodies are parsed on first use and kept in a small LRU, so
+switching presets on stage is a dictionary lookup. Writes go through a temp
+file + rename, and ``watch()`` polls the folders so files edited or copied in
+from outside show up without a restart.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from .settings import save_json, load_json
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.audio.log import get_channel
+from app.audio.scenes import Scene
+from app.state.settings import atomic_write
+
+_log = get_channel("config")
+
 PRESETS_DIR = Path.home() / ".timbal_app" / "presets"
-def save_preset(name: str, data: dict):
-    PRESETS_DIR.mkdir(parents=True, exist_ok=True)
-    save_json(PRESETS_DIR / f"{name}.json", data)
-def load_preset(name: str) -> dict:
-    return load_json(PRESETS_DIR / f"{name}.json")
+KINDS = ("reverb", "dynamics", "note_set", "calibration", "scene")
+# save_preset()/load_preset() sin tipo: la API vieja escribia en la raiz
+LEGACY_KIND = ""
+
+_NOTE_RE = re.compile(r"^[A-G]#?-?\d$")
+_BAD_NAME = re.compile(r'[\\/:*?"<>|]')
+
+
+def _clone(value):
+    # copia de un arbol JSON; bastante mas rapida que copy.deepcopy
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+class PresetInfo(NamedTuple):
+    kind: str
+    name: str
+    path: Path
+    mtime: float
+    size: int
+
+
+def _check_name(name: str) -> str:
+    name = (name or "").strip()
+    if not name or name.startswith(".") or _BAD_NAME.search(name):
+        raise ValueError(f"Nombre de preset invalido: {name!r}")
+    return name
+
+
+def _number(body: dict, key: str, low: float, high: float, optional: bool = True) -> None:
+    value = body.get(key)
+    if value is None and optional:
+        return
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+        raise ValueError(f"{key}={value!r} fuera de rango [{low}, {high}]")
+
+
+def _validate_reverb(body: dict) -> None:
+    unknown = set(body) - {"active", "level", "room", "damp"}
+    if unknown:
+        raise ValueError(f"Claves desconocidas: {sorted(unknown)}")
+    if not isinstance(body.get("active", True), bool):
+        raise ValueError("active debe ser booleano")
+    for key in ("level", "room", "damp"):
+        _number(body, key, 0, 100)
+
+
+def _validate_dynamics(body: dict) -> None:
+    unknown = set(body) - {"master_db", "velocity_gain", "limiter", "reverb_send"}
+    if unknown:
+        raise ValueError(f"Claves desconocidas: {sorted(unknown)}")
+    _number(body, "master_db", -60, 40)
+    _number(body, "velocity_gain", 0, 100)
+    _number(body, "reverb_send", 0, 1)
+    if not isinstance(body.get("limiter", False), bool):
+        raise ValueError("limiter debe ser booleano")
+
+
+def _validate_note_set(body: dict) -> None:
+    sets = body.get("sets")
+    if not isinstance(sets, list) or not sets:
+        raise ValueError("note_set necesita una lista 'sets'")
+    for row in sets:
+        if not isinstance(row, list) or not all(isinstance(n, str) and _NOTE_RE.match(n) for n in row):
+            raise ValueError(f"Fila de notas invalida: {row!r}")
+
+
+def _validate_calibration(body: dict) -> None:
+    pads = body.get("pads")
+    if not isinstance(pads, dict):
+        raise ValueError("calibration necesita un dict 'pads'")
+    for pad, entry in pads.items():
+        int(pad)
+        if not isinstance(entry, dict) or "soft" not in entry or "hard" not in entry:
+            raise ValueError(f"Pad {pad}: faltan soft/hard")
+
+
+def _validate_scene(body: dict) -> None:
+    unknown = set(body) - set(Scene._fields)
+    if unknown:
+        raise ValueError(f"Claves desconocidas: {sorted(unknown)}")
+    Scene.from_dict(body)
+
+
+_VALIDATORS: Dict[str, Callable[[dict], None]] = {
+    "reverb": _validate_reverb,
+    "dynamics": _validate_dynamics,
+    "note_set": _validate_note_set,
+    "calibration": _validate_calibration,
+    "scene": _validate_scene,
+}
+
+
+def validate(kind: str, body) -> None:
+    """Raise ValueError if ``body`` is not a valid preset of ``kind``."""
+    if kind not in KINDS and kind != LEGACY_KIND:
+        raise ValueError(f"Tipo de preset desconocido: {kind!r}")
+    if not isinstance(body, dict):
+        raise ValueError("Un preset es un objeto JSON")
+    check = _VALIDATORS.get(kind)
+    if check is not None:
+        check(body)
+
+
+class PresetRepository:
+    """Indexed, cached view of the presets folder (see the module docstring).
+
+    ``get()`` returns a copy, so callers can modify what they receive
+    without corrupting the cache. All methods are thread-safe; the watcher
+    thread only takes the lock to swap the index.
+    """
+
+    def __init__(self, root: Path = PRESETS_DIR, cache_size: int = 32) -> None:
+        self.root = Path(root)
+        self.cache_size = int(cache_size)
+        self.disk_reads = 0
+        self._lock = threading.RLock()
+        self._index: Dict[Tuple[str, str], PresetInfo] = {}
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, dict]]" = OrderedDict()
+        self._watch_stop: Optional[threading.Event] = None
+        self.refresh()
+
+    # -- indice --------------------------------------------------------------
+    def _folder(self, kind: str) -> Path:
+        return self.root / kind if kind else self.root
+
+    def _scan(self) -> Dict[Tuple[str, str], PresetInfo]:
+        index = {}
+        for kind in KINDS + (LEGACY_KIND,):
+            try:
+                entries = list(os.scandir(self._folder(kind)))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                name = entry.name[:-5]
+                index[(kind, name)] = PresetInfo(kind, name, Path(entry.path), st.st_mtime, st.st_size)
+        return index
+
+    def refresh(self) -> List[Tuple[str, str]]:
+        """Rescan the folders; return the (kind, name) keys that changed."""
+        index = self._scan()
+        with self._lock:
+            old = self._index
+            changed = [
+                key for key in set(old) | set(index)
+                if key not in old or key not in index
+                or old[key].mtime != index[key].mtime or old[key].size != index[key].size
+            ]
+            self._index = index
+            for key in changed:
+                self._cache.pop(key, None)
+        return sorted(changed)
+
+    def names(self, kind: str) -> List[str]:
+        with self._lock:
+            return sorted(name for (k, name) in self._index if k == kind)
+
+    def list(self, kind: str | None = None) -> List[PresetInfo]:
+        with self._lock:
+            infos = [info for key, info in self._index.items() if kind is None or key[0] == kind]
+        return sorted(infos, key=lambda info: (info.kind, info.name))
+
+    def exists(self, kind: str, name: str) -> bool:
+        with self._lock:
+            return (kind, name) in self._index
+
+    # -- lectura / escritura -------------------------------------------------
+    def get(self, kind: str, name: str) -> Optional[dict]:
+        """Return a copy of the preset body, or None if it does not exist or is invalid."""
+        key = (kind, name)
+        with self._lock:
+            info = self._index.get(key)
+            if info is None:
+                return None
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == info.mtime:
+                self._cache.move_to_end(key)
+                return _clone(cached[1])
+        try:
+            body = json.loads(info.path.read_text(encoding="utf-8"))
+            validate(kind, body)
+        except Exception as exc:
+            _log.warn("Preset %s/%s ilegible: %s", kind or "-", name, exc)
+            return None
+        with self._lock:
+            self.disk_reads += 1
+            self._remember(key, info.mtime, body)
+        return _clone(body)
+
+    def save(self, kind: str, name: str, body: dict) -> PresetInfo:
+        name = _check_name(name)
+        validate(kind, body)
+        folder = self._folder(kind)
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"{name}.json"
+        body = _clone(body)
+        atomic_write(path, json.dumps(body, ensure_ascii=False, indent=2))
+        st = path.stat()
+        info = PresetInfo(kind, name, path, st.st_mtime, st.st_size)
+        with self._lock:
+            self._index[(kind, name)] = info
+            self._remember((kind, name), info.mtime, body)
+        return info
+
+    def delete(self, kind: str, name: str) -> bool:
+        with self._lock:
+            info = self._index.pop((kind, name), None)
+            self._cache.pop((kind, name), None)
+        if info is None:
+            return False
+        try:
+            info.path.unlink()
+        except OSError as exc:
+            _log.warn("No pude borrar el preset %s: %s", info.path, exc)
+        return True
+
+    def _remember(self, key: Tuple[str, str], mtime: float, body: dict) -> None:
+        self._cache[key] = (mtime, body)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # -- vigilancia ----------------------------------------------------------
+    def watch(self, interval: float = 2.0, on_change: Callable[[List[Tuple[str, str]]], None] | None = None) -> None:
+        """Poll the folders every ``interval`` seconds from a daemon thread.
+
+        ``on_change`` runs on that thread with the changed keys; GUI code must
+        hop back to its own thread (e.g. through a queued signal).
+        """
+        if self._watch_stop is not None:
+            return
+        stop = self._watch_stop = threading.Event()
+
+        def loop() -> None:
+            while not stop.wait(interval):
+                try:
+                    changed = self.refresh()
+                except Exception as exc:
+                    _log.warn("Fallo el sondeo de presets: %s", exc)
+                    continue
+                if changed:
+                    _log.debug("presets cambiados fuera de la app: %s", changed)
+                    if on_change is not None:
+                        on_change(changed)
+
+        threading.Thread(target=loop, name="presets-watch", daemon=True).start()
+
+    def stop_watch(self) -> None:
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
+
+
+_REPOSITORY: Optional[PresetRepository] = None
+_REPOSITORY_LOCK = threading.Lock()
+
+
+def get_repository() -> PresetRepository:
+    """The application-wide repository (indexed on first use)."""
+    global _REPOSITORY
+    with _REPOSITORY_LOCK:
+        if _REPOSITORY is None:
+            _REPOSITORY = PresetRepository(PRESETS_DIR)
+        return _REPOSITORY
+
+
+def save_preset(name: str, data: dict, kind: str = LEGACY_KIND) -> None:
+    get_repository().save(kind, name, data)
+
+
+def load_preset(name: str, kind: str = LEGACY_KIND) -> dict:
+    body = get_repository().get(kind, name)
+    if body is None:
+        raise FileNotFoundError(f"No existe el preset {name!r}")
+    return body
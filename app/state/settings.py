@@ -1,10 +1,18 @@
 """Legacy configuration helpers (JSON on disk)."""
 from __future__ import annotations
 
+import atexit
+import copy
 import json
 import os
+import threading
+import time
 from pathlib import Path
 
+from app.audio.log import get_channel
+
+_log = get_channel("config")
+
 
 def _app_config_dir() -> Path:
     base = Path(os.environ.get('APPDATA', Path.home() / 'AppData' / 'Roaming'))
@@ -14,30 +22,214 @@ def _app_config_dir() -> Path:
 
 
 CONFIG_PATH = _app_config_dir() / 'config.json'
+# reintentos de una escritura fallida: el retardo se duplica hasta el tope
+RETRY_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+
+def atomic_write(path: Path, text: str) -> None:
+    # se escribe al lado y se renombra: un corte a mitad de escritura deja el archivo viejo intacto
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        fh.write(text)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class ConfigStore:
+    """In-memory config with debounced, atomic background writes.
+
+    ``load()`` always returns the same live dict, so pages share one view of
+    the config and reads never touch the disk after the first one. ``save()``
+    only diffs the top-level keys against the last saved shadow copy, records
+    the dirty ones and wakes the writer thread. The writer waits until no new
+    change arrived for ``debounce`` seconds (at most ``max_delay``), then writes
+    the whole document once via a temp file + rename. A failed write keeps the
+    keys dirty and is retried with a doubling delay; ``last_error`` holds the
+    failure until a write succeeds.
+    """
+
+    def __init__(self, path: Path, debounce: float = 0.4, max_delay: float = 2.0) -> None:
+        self.path = Path(path)
+        self.debounce = float(debounce)
+        self.max_delay = float(max_delay)
+        self.writes = 0
+        self.failures = 0
+        self.last_error = None
+        self._retry_at = 0.0
+        self._data = None
+        self._shadow = {}
+        self._dirty = set()
+        self._changed_at = 0.0
+        self._generation = 0
+        self._written = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def load(self) -> dict:
+        if self._data is None:
+            data = {}
+            try:
+                if self.path.exists():
+                    data = json.loads(self.path.read_text(encoding='utf-8'))
+            except Exception as exc:
+                _log.warn("Config ilegible (%s); se empieza vacia", exc)
+            self._data = data
+            self._shadow = copy.deepcopy(data)
+        return self._data
+
+    def save(self, cfg: dict | None = None) -> None:
+        live = self.load()
+        if cfg is not None and cfg is not live:
+            # compat: save_config(dict_nuevo) reemplazaba el archivo entero
+            live.clear()
+            live.update(cfg)
+        with self._cond:
+            dirty = {key for key in live if key not in self._shadow or self._shadow[key] != live[key]}
+            dirty.update(key for key in self._shadow if key not in live)
+            if not dirty:
+                return
+            for key in dirty:
+                if key in live:
+                    self._shadow[key] = copy.deepcopy(live[key])
+                else:
+                    self._shadow.pop(key, None)
+            self._dirty |= dirty
+            self._changed_at = time.monotonic()
+            self._generation += 1
+            self._ensure_writer()
+            self._cond.notify_all()
+
+    def set(self, key: str, value) -> None:
+        self.load()[key] = value
+        self.save()
+
+    def pending(self) -> set:
+        with self._cond:
+            return set(self._dirty)
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Write pending changes now (e.g. on exit); True once they are on disk.
+
+        False if the write failed (see ``last_error``; the writer keeps
+        retrying) or did not finish within ``timeout``.
+        """
+        with self._cond:
+            if self._written >= self._generation:
+                return True
+            target = self._generation
+            failures = self.failures
+            # sin esperar el debounce ni el retardo de un reintento
+            self._changed_at = 0.0
+            self._retry_at = 0.0
+            self._ensure_writer()
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._written >= target or self.failures > failures, timeout)
+            return self._written >= target
+
+    def _ensure_writer(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._writer, name="config-writer", daemon=True)
+            self._thread.start()
+
+    def _writer(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._written < self._generation)
+                first = time.monotonic()
+                while True:
+                    now = time.monotonic()
+                    quiet = self._changed_at + self.debounce - now
+                    overdue = first + self.max_delay - now
+                    wait = max(min(quiet, overdue), self._retry_at - now)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                generation = self._generation
+                keys = sorted(self._dirty)
+                self._dirty.clear()
+                text = json.dumps(self._shadow, ensure_ascii=False, indent=2)
+            try:
+                atomic_write(self.path, text)
+            except Exception as exc:
+                with self._cond:
+                    # las claves siguen pendientes: se reintenta todo el documento mas tarde
+                    self._dirty.update(keys)
+                    self.failures += 1
+                    self.last_error = exc
+                    delay = min(RETRY_MAX_DELAY, RETRY_DELAY * 2 ** min(self.failures - 1, 16))
+                    self._retry_at = time.monotonic() + delay
+                    self._cond.notify_all()
+                _log.warn("No pude guardar la configuración (reintento en %.1f s): %s", delay, exc)
+                continue
+            self.writes += 1
+            _log.debug("config guardada (%s)", ", ".join(keys))
+            with self._cond:
+                self._written = generation
+                self.failures = 0
+                self.last_error = None
+                self._retry_at = 0.0
+                self._cond.notify_all()
+
+
+STORE = ConfigStore(CONFIG_PATH)
+atexit.register(STORE.flush)
 
 
 def load_config() -> dict:
-    try:
-        if CONFIG_PATH.exists():
-            return json.loads(CONFIG_PATH.read_text(encoding='utf-8'))
-    except Exception:
-        pass
-    return {}
+    return STORE.load()
 
 
 def save_config(cfg: dict) -> None:
-    try:
-        CONFIG_PATH.write_text(json.dumps(cfg, ensure_ascii=False, indent=2), encoding='utf-8')
-    except Exception:
-        print('Aviso: no pude guardar la configuración.')
+    STORE.save(cfg)
 
-def save_calibration_profile(profile_name: str, settings: dict):
+def _upgrade_profile(profile: dict | None) -> dict:
+    profile = dict(profile or {})
+    if 'pads' not in profile:
+        # perfiles viejos guardaban un solo pad como {pad, soft, hard}
+        profile = {'pads': {str(profile['pad']): profile}} if 'pad' in profile else {'pads': {}}
+    return profile
+
+def _calibration_repository():
+    """Preset repository holding the calibration profiles (migrated out of config.json once)."""
+    from app.state.presets import get_repository
+
+    repo = get_repository()
     config = load_config()
-    if 'calibration_profiles' not in config:
-        config['calibration_profiles'] = {}
-    config['calibration_profiles'][profile_name] = settings
-    save_config(config)
+    legacy = config.get('calibration_profiles')
+    if legacy:
+        for name, profile in legacy.items():
+            if not repo.exists('calibration', name):
+                try:
+                    repo.save('calibration', name, _upgrade_profile(profile))
+                except Exception as exc:
+                    _log.warn("No pude migrar el perfil %s: %s", name, exc)
+                    return repo
+        config.pop('calibration_profiles', None)
+        save_config(config)
+    return repo
+
+def save_calibration_profile(profile_name: str, settings: dict):
+    """Store one pad's calibration inside the named profile (other pads are kept)."""
+    repo = _calibration_repository()
+    profile = _upgrade_profile(repo.get('calibration', profile_name))
+    profile['pads'][str(settings['pad'])] = settings
+    repo.save('calibration', profile_name, profile)
+
+def calibration_profile_names() -> list:
+    return _calibration_repository().names('calibration')
+
+def load_calibration_profile(profile_name: str) -> dict | None:
+    return _calibration_repository().get('calibration', profile_name)
 
 def load_calibration_profiles() -> dict:
-    config = load_config()
-    return config.get('calibration_profiles', {})
+    repo = _calibration_repository()
+    return {name: repo.get('calibration', name) for name in repo.names('calibration')}
+
+def set_active_calibration_profile(config: dict, profile_name: str | None) -> None:
+    if profile_name:
+        config['calibration_profile'] = profile_name
+    else:
+        config.pop('calibration_profile', None)
+    save_config(config)
@@ -2,18 +2,137 @@
 TOKENS = {
   "bg": "#1f2937", "panel": "#0f172a", "accent": "#3b82f6",
   "text": "#e5e7eb", "muted": "#94a3b8", "danger": "#ef4444",
-  "radius": "10px"
+  "radius": "10px",
+  "surface": "#111827", "line": "#334155", "hover": "#233044",
+  "accent_hi": "#60a5fa", "accent_lo": "#1d4ed8",
+  "ghost": "#475569", "disabled": "#64748b", "hit": "#22c55e",
 }
 
-def build_qss():
-    t = TOKENS
+
+def _base(t):
     return f"""
 QMainWindow {{ background: {t['bg']}; color:{t['text']}; }}
 QStatusBar {{ background:{t['panel']}; color:{t['muted']}; }}
 QToolButton {{ color:{t['text']}; }}
 QPushButton {{ background:{t['accent']}; color:white; border-radius:8px; padding:6px 10px; }}
-QSlider::groove:horizontal {{ height:6px; background:#334155; border-radius:3px; }}
+QSlider::groove:horizontal {{ height:6px; background:{t['line']}; border-radius:3px; }}
 QSlider::handle:horizontal {{ width:16px; border-radius:8px; background:white; margin:-5px 0; }}
-QGroupBox {{ border:1px solid #334155; border-radius:8px; margin-top:12px; }}
+QGroupBox {{ border:1px solid {t['line']}; border-radius:8px; margin-top:12px; }}
 QGroupBox::title {{ subcontrol-origin: margin; left: 10px; padding: 0 4px; color:{t['muted']}; }}
 """
+
+
+def _pads(t):
+    return f"""
+QWidget#PadsContent {{ background: transparent; }}
+QWidget#EffectsHolder {{ background:{t['surface']}; border:1px solid {t['bg']}; border-radius:22px; }}
+QPushButton#EffectsToggle {{
+    background-color:{t['bg']}; color:{t['text']}; border:1px solid {t['line']};
+    border-radius:14px; padding:10px 14px; font-size:15px; font-weight:600;
+}}
+QPushButton#EffectsToggle:hover {{ background-color:{t['hover']}; }}
+QWidget#EffectsContainer {{ background-color:{t['panel']}; border:1px solid {t['bg']}; border-radius:18px; }}
+QWidget#PadBoard {{ background-color:{t['panel']}; border:1px solid {t['bg']}; border-radius:28px; }}
+QWidget#PadBoard QPushButton {{
+    background-color:{t['bg']}; color:{t['text']}; border:1px solid {t['line']};
+    border-radius:16px; font-size:20px; font-weight:700; letter-spacing:0.6px;
+}}
+QWidget#PadBoard QPushButton:hover {{ background-color:{t['accent']}; border-color:{t['accent_hi']}; }}
+QWidget#PadBoard QPushButton:pressed {{ background-color:{t['accent_lo']}; }}
+QWidget#PadBoard QPushButton[hit="true"] {{ border:2px solid {t['hit']}; }}
+QLabel#SetGhostPrev, QLabel#SetGhostNext {{
+    background-color:{t['surface']}; border:1px dashed {t['bg']}; border-radius:10px;
+    font-size:14px; font-weight:600;
+}}
+QLabel#SetGhostPrev {{ color:{t['ghost']}; }}
+QLabel#SetGhostNext {{ color:{t['muted']}; }}
+QWidget#PadSetNav {{ background:{t['surface']}; border:1px solid {t['bg']}; border-radius:22px; }}
+QWidget#PadSetNav QPushButton {{
+    background-color:{t['bg']}; color:{t['text']}; border:1px solid {t['line']};
+    border-radius:12px; font-size:22px; font-weight:700;
+}}
+QWidget#PadSetNav QPushButton:hover {{ background-color:{t['accent']}; }}
+QWidget#PadSetNav QLabel {{ color:{t['muted']}; font-weight:600; font-size:18px; }}
+"""
+
+
+def _effects(t):
+    return f"""
+QWidget#EffectsPage {{ color:{t['text']}; }}
+QWidget#EffectsPage QLabel {{ color:{t['text']}; }}
+QWidget#EffectsPage QGroupBox {{ color:{t['text']}; }}
+QWidget#EffectsPage QCheckBox {{ color:{t['text']}; }}
+QWidget#EffectsPage QPushButton {{ color:{t['text']}; }}
+QWidget#EffectsPage QPushButton[active="true"] {{ background:{t['accent_lo']}; }}
+"""
+
+
+def _calibration(t):
+    return f"""
+QWidget#CalibrationPage QLabel#PageTitle {{ font-size:24px; font-weight:700; margin-bottom:20px; }}
+QWidget#CalibrationPage QPushButton {{
+    background-color:{t['bg']}; color:{t['text']}; border:1px solid {t['line']};
+    border-radius:12px; padding:10px 14px;
+}}
+QWidget#CalibrationPage QPushButton:hover {{ background-color:{t['accent']}; }}
+QWidget#CalibrationPage QPushButton:checked {{ background-color:{t['accent_lo']}; }}
+QWidget#CalibrationPage QLineEdit {{
+    background-color:{t['surface']}; color:{t['text']}; border:1px solid {t['line']};
+    border-radius:12px; padding:10px;
+}}
+"""
+
+
+def _note_selector(t):
+    return f"""
+QDialog#NoteSelectorDialog {{ background-color:{t['surface']}; color:{t['text']}; border-radius:8px; }}
+QDialog#NoteSelectorDialog QLabel {{ color:{t['text']}; font-weight:500; margin-bottom:4px; }}
+QDialog#NoteSelectorDialog QListWidget {{
+    background-color:{t['bg']}; color:{t['text']}; border:1px solid {t['line']}; outline:none;
+}}
+QDialog#NoteSelectorDialog QListWidget::item {{ padding:6px 10px; }}
+QDialog#NoteSelectorDialog QListWidget::item:selected {{ background-color:{t['accent']}; color:white; }}
+QDialog#NoteSelectorDialog QPushButton {{
+    background-color:{t['accent']}; border-radius:6px; color:white; padding:6px 14px;
+}}
+QDialog#NoteSelectorDialog QPushButton:disabled {{ background-color:{t['line']}; color:{t['disabled']}; }}
+"""
+
+
+COMPONENTS = {
+    "base": _base,
+    "pads": _pads,
+    "effects": _effects,
+    "calibration": _calibration,
+    "note_selector": _note_selector,
+}
+
+_COMPILED = {}
+
+
+def component_qss(name, tokens=None):
+    """Rules of a single component (e.g. to style a widget outside the main app)."""
+    return COMPONENTS[name](tokens or TOKENS)
+
+
+def build_qss(tokens=None):
+    """Compile every component into one application stylesheet (cached per token set)."""
+    t = tokens or TOKENS
+    key = tuple(sorted(t.items()))
+    qss = _COMPILED.get(key)
+    if qss is None:
+        qss = "".join(rule(t) for rule in COMPONENTS.values())
+        _COMPILED[key] = qss
+    return qss
+
+
+def set_state(widget, name, value=True):
+    """Toggle a dynamic state property and re-polish only if it actually changed."""
+    value = bool(value)
+    if bool(widget.property(name)) == value:
+        return False
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    return True
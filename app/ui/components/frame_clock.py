@@ -0,0 +1,73 @@
+"""Shared UI frame clock: one timer drives every animated widget, and it stops when idle."""
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QGuiApplication
+
+
+class FrameClock(QObject):
+    """Ticks once per display frame while at least one animator is awake.
+
+    An animator is any object with ``advance(dt_ms) -> bool``; it returns
+    False once it has nothing left to animate and is then dropped until the
+    next ``wake()``. With no awake animators the timer is stopped, so an idle
+    window costs no timer wakeups at all.
+    """
+
+    def __init__(self, interval_ms: Optional[int] = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._awake = {}
+        self._last = 0.0
+        self.ticks = 0
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms or self._frame_interval())
+        self.timer.timeout.connect(self._tick)
+
+    @staticmethod
+    def _frame_interval() -> int:
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 60.0
+        return max(8, int(1000.0 / (rate if rate > 1.0 else 60.0)))
+
+    def wake(self, animator) -> None:
+        # dict ordenado: los animadores avanzan en el orden en que despertaron
+        self._awake[id(animator)] = animator
+        if not self.timer.isActive():
+            self._last = time.perf_counter()
+            self.timer.start()
+
+    def sleep(self, animator) -> None:
+        self._awake.pop(id(animator), None)
+
+    def is_running(self) -> bool:
+        return self.timer.isActive()
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        dt_ms = (now - self._last) * 1000.0
+        self._last = now
+        self.ticks += 1
+        for key, animator in list(self._awake.items()):
+            try:
+                alive = animator.advance(dt_ms)
+            except RuntimeError:
+                # el widget de Qt ya fue destruido
+                alive = False
+            if not alive:
+                self._awake.pop(key, None)
+        if not self._awake:
+            self.timer.stop()
+
+
+_SHARED: Optional[FrameClock] = None
+
+
+def shared_clock() -> FrameClock:
+    """The application-wide clock (created on first use, after the QApplication)."""
+    global _SHARED
+    if _SHARED is None:
+        _SHARED = FrameClock()
+    return _SHARED
@@ -41,44 +41,6 @@ class NoteSelectorDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
-        self.setStyleSheet(
-            """
-            QDialog#NoteSelectorDialog {
-                background-color: #111827;
-                color: #e5e7eb;
-                border-radius: 8px;
-            }
-            QDialog#NoteSelectorDialog QLabel {
-                color: #e5e7eb;
-                font-weight: 500;
-                margin-bottom: 4px;
-            }
-            QDialog#NoteSelectorDialog QListWidget {
-                background-color: #1f2937;
-                color: #e5e7eb;
-                border: 1px solid #334155;
-                outline: none;
-            }
-            QDialog#NoteSelectorDialog QListWidget::item {
-                padding: 6px 10px;
-            }
-            QDialog#NoteSelectorDialog QListWidget::item:selected {
-                background-color: #3b82f6;
-                color: white;
-            }
-            QDialog#NoteSelectorDialog QPushButton {
-                background-color: #3b82f6;
-                border-radius: 6px;
-                color: white;
-                padding: 6px 14px;
-            }
-            QDialog#NoteSelectorDialog QPushButton:disabled {
-                background-color: #334155;
-                color: #64748b;
-            }
-            """
-        )
-
     def set_current_note(self, note: str) -> None:
         row = self.list.findItems(note, Qt.MatchExactly)
         if row:
@@ -0,0 +1,54 @@
+"""Follow a background SoundFont load from the GUI thread."""
+from __future__ import annotations
+
+from typing import Callable
+
+from PyQt5.QtCore import QObject, QTimer
+
+# estado que recibe on_done cuando la carga se cancelo (otra la reemplazo)
+CANCELLED = "cancelado"
+
+STAGE_LABELS = {
+    "pendiente": "En espera",
+    "lectura": "Leyendo",
+    "carga": "Cargando",
+    "cambio": "Activando",
+    "descarga": "Liberando el anterior",
+}
+
+
+def describe(load) -> str:
+    label = STAGE_LABELS.get(load.stage, load.stage)
+    return f"{label} {load.path.name}: {int(load.progress * 100)} %"
+
+
+def watch_sf2_load(
+    parent: QObject,
+    load,
+    on_progress: Callable[[str], None],
+    on_done: Callable[[str | None], None],
+    interval_ms: int = 50,
+) -> QTimer:
+    """Poll ``load`` (a ``SoundFontLoad``) and report on the GUI thread.
+
+    ``on_progress`` gets a readable status line; ``on_done`` gets None on
+    success, ``CANCELLED`` when the load was cancelled, or the error text.
+    """
+    timer = QTimer(parent)
+    timer.setInterval(interval_ms)
+
+    def poll() -> None:
+        if not load.done():
+            on_progress(describe(load))
+            return
+        timer.stop()
+        timer.deleteLater()
+        if load.stage == CANCELLED:
+            on_done(CANCELLED)
+            return
+        on_done(load.error)
+
+    timer.timeout.connect(poll)
+    timer.start()
+    poll()
+    return timer
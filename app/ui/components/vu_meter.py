@@ -0,0 +1,156 @@
+"""Segmented VU meter painted with QPainter from cached pixmaps."""
+from __future__ import annotations
+
+import math
+
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QColor, QLinearGradient, QPainter, QPixmap
+from PyQt5.QtWidgets import QWidget
+
+from app.ui.components.frame_clock import FrameClock, shared_clock
+
+UNLIT = QColor("#2b3648")
+PEAK = QColor("#FFA726")
+CLIP = QColor("#ef4444")
+
+
+# verde hasta el 60 %, amarillo hacia el 85 %, rojo arriba
+GRADIENT_STOPS = ((0.0, "#16a34a"), (0.6, "#22c55e"), (0.75, "#facc15"), (1.0, "#ef4444"))
+
+
+class VuMeter(QWidget):
+    """One widget per meter; repaints only when the lit segments or the peak move.
+
+    Ballistics follow the legacy TIMBAL 2.0 ``Vu`` (fast attack / slow release
+    smoothing on input, a fixed decay and a peak-hold segment that falls back
+    one segment at a time), expressed per millisecond so they run at any frame
+    rate. Decay is driven by a shared ``FrameClock``; an idle meter is not
+    ticked at all.
+    """
+
+    def __init__(
+        self,
+        segments: int = 21,
+        range_db: float = 48.0,
+        parent: QWidget | None = None,
+        clock: FrameClock | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.setMinimumSize(48, 320)
+        self.segments = int(segments)
+        self.range_db = float(range_db)
+        self.spacing = 4
+        self._lit = None
+        self._unlit = None
+        # nivel en segmentos (float) con la misma balistica del Vu viejo
+        self._level = 0.0
+        self._alpha_up = 0.6
+        self._alpha_down = 0.15
+        # el Vu viejo bajaba 3/127 de escala cada 60 ms
+        self._decay_per_ms = 3.0 * self.segments / 127.0 / 60.0
+        self._peak_index = -1
+        self._peak_hold_ms = 0.0
+        self.peak_hold_ms = 480.0
+        self.peak_fall_ms = 240.0
+        self._clip_ms = 0.0
+        self._shown = (0, -1, False)
+        self.clock = clock or shared_clock()
+
+    # -- entrada -----------------------------------------------------------
+    def set_value(self, fraction: float) -> None:
+        """Feed a 0..1 reading (0 = silence, 1 = top segment)."""
+        target = max(0.0, min(1.0, float(fraction))) * self.segments
+        alpha = self._alpha_up if target >= self._level else self._alpha_down
+        self._level = alpha * target + (1.0 - alpha) * self._level
+        active = int(self._level)
+        if active > 0 and active - 1 >= self._peak_index:
+            self._peak_index = min(self.segments - 1, active - 1)
+            self._peak_hold_ms = self.peak_hold_ms
+        self._refresh()
+        self.clock.wake(self)
+
+    def actualizar(self, value: int) -> None:
+        """Legacy entry point: MIDI velocity 0..127."""
+        self.set_value(int(value) / 127.0)
+
+    def set_peak(self, peak: float) -> None:
+        """Feed a rendered peak (linear, 1.0 = 0 dBFS)."""
+        if peak >= 1.0:
+            self._clip_ms = 1000.0
+            self.clock.wake(self)
+        if peak <= 0.0:
+            self._refresh()
+            return
+        db = 20.0 * math.log10(peak)
+        self.set_value((db + self.range_db) / self.range_db)
+
+    # -- balistica -----------------------------------------------------------
+    def advance(self, dt_ms: float) -> bool:
+        """One frame of decay; returns False once the meter is fully at rest."""
+        if self._level > 0.0:
+            self._level = max(0.0, self._level - self._decay_per_ms * dt_ms)
+        if self._peak_index >= 0:
+            self._peak_hold_ms -= dt_ms
+            if self._peak_hold_ms <= 0.0:
+                self._peak_index -= 1
+                self._peak_hold_ms += self.peak_fall_ms
+        if self._clip_ms > 0.0:
+            self._clip_ms = max(0.0, self._clip_ms - dt_ms)
+        self._refresh()
+        return self._level > 0.0 or self._peak_index >= 0 or self._clip_ms > 0.0
+
+    def is_idle(self) -> bool:
+        return self._level <= 0.0 and self._peak_index < 0 and self._clip_ms <= 0.0
+
+    def _refresh(self) -> None:
+        state = (int(self._level), self._peak_index, self._clip_ms > 0.0)
+        if state != self._shown:
+            self._shown = state
+            self.update()
+
+    # -- pintado -------------------------------------------------------------
+    def _segment_rect(self, idx: int) -> QRect:
+        h = self.height()
+        seg_h = (h - self.spacing * (self.segments - 1)) / self.segments
+        top = h - (idx + 1) * seg_h - idx * self.spacing
+        return QRect(0, int(round(top)), self.width(), max(1, int(round(seg_h))))
+
+    def _build_pixmaps(self) -> None:
+        ratio = self.devicePixelRatioF()
+        size = self.size() * ratio
+        self._lit = QPixmap(size)
+        self._unlit = QPixmap(size)
+        for pixmap in (self._lit, self._unlit):
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+        gradient = QLinearGradient(0, self.height(), 0, 0)
+        for stop, color in GRADIENT_STOPS:
+            gradient.setColorAt(stop, QColor(color))
+        lit, unlit = QPainter(self._lit), QPainter(self._unlit)
+        for idx in range(self.segments):
+            rect = self._segment_rect(idx)
+            lit.fillRect(rect, gradient)
+            unlit.fillRect(rect, UNLIT)
+        lit.end()
+        unlit.end()
+
+    def resizeEvent(self, event) -> None:
+        self._lit = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event) -> None:
+        if self._lit is None:
+            self._build_pixmaps()
+        active, peak, clip = self._shown
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._unlit)
+        if active > 0:
+            top = self._segment_rect(min(active, self.segments) - 1).top()
+            painter.setClipRect(QRect(0, top, self.width(), self.height() - top))
+            painter.drawPixmap(0, 0, self._lit)
+            painter.setClipping(False)
+        if active <= peak < self.segments:
+            painter.fillRect(self._segment_rect(peak), PEAK)
+        if clip:
+            painter.fillRect(self._segment_rect(self.segments - 1), CLIP)
+        painter.end()
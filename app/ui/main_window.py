@@ -1,15 +1,21 @@
 ﻿import os, sys
-import subprocess
+import time
 from pathlib import Path
 
-import mido
-from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QAction
-from PyQt5.QtCore import Qt, QCoreApplication
+from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QAction, QActionGroup
+from PyQt5.QtCore import Qt, QCoreApplication, QTimer
 
 from app.theme.qss import build_qss
-from app.audio.engine_legacy import SoundEngine
-from app.state.settings import load_config, save_config
-from app.ui.pages.pads import PadsPage
+from app.audio.dispatch import DEFAULT_DISPATCH, DISPATCH_LABELS, DISPATCH_MODES
+from app.audio.latency import LATENCY_PROFILES, PROFILE_LABELS
+from app.audio.log import SINK, get_channel
+from app.audio.sf2_loader import DEFAULT_LOADING, LOADING_LABELS, LOADING_MODES
+from app.state.settings import CONFIG_PATH, STORE, load_config, save_config
+from app.startup import PROFILE
+# el motor, las paginas, la biblioteca de SF2, los presets y la calibracion se importan
+# donde se usan: el motor deja numpy y FluidSynth a su hilo de arranque
+
+_log = get_channel("ui")
 
 
 def run_new_ui():
@@ -19,6 +25,7 @@ def run_new_ui():
 
     app = QApplication(sys.argv)
     app.setStyleSheet(build_qss())
+    PROFILE.mark("QApplication")
 
     config = load_config()
     sf2_entry = config.get('last_sf2')
@@ -32,23 +39,49 @@ def run_new_ui():
         config['last_sf2'] = str(resolved)
         save_config(config)
 
+    from app.audio.engine_legacy import SoundEngine
+    from app.audio.voices import VoicePolicy
+    from app.ui.pages.pads import DEFAULT_NOTE_SETS, to_midi
+
     try:
-        engine = SoundEngine(resolved)
+        # FluidSynth y el SF2 se cargan en segundo plano; la ventana aparece ya
+        engine = SoundEngine(
+            resolved,
+            driver_cache=config.get('audio_driver'),
+            latency_profile=config.get('latency_profile'),
+            sample_loading=config.get('sf2_loading'),
+            # el juego de notas con el que arrancan los pads (modo "notes")
+            active_notes=[to_midi(note) for note in DEFAULT_NOTE_SETS[0]],
+            voice_policy=VoicePolicy.from_dict(config.get('voice_policy')),
+            # 'sequencer' (golpes al sello de captura + un retardo fijo) solo si se eligio en el menu
+            dispatch_mode=config['dispatch_mode'] if config.get('dispatch_mode') in DISPATCH_MODES else DEFAULT_DISPATCH,
+            schedule_ms=config.get('schedule_ms'),
+        )
     except Exception as exc:
         QMessageBox.critical(None, "Error", f"No se pudo iniciar el motor de audio\n{exc}")
         return
     win = MainWindow(engine, config)
     win.resize(1400, 820)
     win.show()
+    PROFILE.mark("window shown")
+    win.watch_engine_ready()
     sys.exit(app.exec_())
 
 
 class MainWindow(QMainWindow):
     def __init__(self, engine, config):
+        from app.audio.sf2_library import SoundFontLibrary
+        from app.ui.pages.pads import PadsPage
+
         super().__init__()
         self.engine = engine
         self.config = config
         self.setWindowTitle("Timbal Digital - Nueva UI (beta segura)")
+        # fuentes recientes residentes en el synth + indice de metadatos junto a la config
+        self.library = SoundFontLibrary(
+            engine, CONFIG_PATH.parent / 'sf2_index.json', config.get('sf2_budget_mb', 512)
+        )
+        engine.library = self.library
 
         self.pads_page = PadsPage(engine, config)
         self.setCentralWidget(self.pads_page)
@@ -59,21 +92,73 @@ class MainWindow(QMainWindow):
 
         self._build_menu()
         self.statusBar().hide()
+        # calibracion y presets (lectura de disco) despues de mostrar la ventana
+        QTimer.singleShot(0, self._deferred_setup)
+
+    def _deferred_setup(self) -> None:
+        from app.state.presets import get_repository
+
+        self._apply_calibration_profile(self.config.get('calibration_profile'))
+        # presets copiados o editados a mano aparecen sin reiniciar
+        get_repository().watch()
+
+    def watch_engine_ready(self) -> None:
+        """Poll the engine's readiness from the GUI thread without blocking it."""
+        self._ready_timer = QTimer(self)
+        self._ready_timer.setInterval(30)
+        self._ready_timer.timeout.connect(self._check_engine_ready)
+        self._ready_timer.start()
+
+    def _check_engine_ready(self) -> None:
+        try:
+            ready = self.engine.wait_ready(0)
+        except Exception as exc:
+            self._ready_timer.stop()
+            PROFILE.print_once()
+            QMessageBox.critical(self, "Error", f"No se pudo iniciar el motor de audio\n{exc}")
+            return
+        if ready:
+            self._ready_timer.stop()
+            PROFILE.print_once()
+            self._remember_audio_driver()
+            self._warm_soundfonts()
+
+    def _warm_soundfonts(self) -> None:
+        current = self.config.get('last_sf2')
+        sfid = getattr(self.engine, 'sfid', None)
+        if not current or sfid is None:
+            return
+        self.library.adopt(current, sfid)
+        # las demas recientes quedan cargadas (sin sonar) mientras entren en el presupuesto
+        self.library.preload(self.library.recent[1:])
+
+    def _remember_audio_driver(self) -> None:
+        drivers = getattr(self.engine, 'drivers', None)
+        info = getattr(self.engine, 'driver_info', None)
+        if drivers is not None:
+            _log.info("Sondeo de drivers: %s", drivers.report())
+        if info and info != self.config.get('audio_driver'):
+            self.config['audio_driver'] = info
+            save_config(self.config)
 
     def _setup_midi(self):
         try:
+            import mido
             # Crear un puerto virtual con un nombre específico.
             # Otros programas pueden enviar mensajes a este puerto.
             port_name = "TimbalDigitalInput"
             self.midi_port = mido.open_input(name=port_name, virtual=True, callback=self._on_midi_message)
-            print(f"INFO: App principal escuchando en puerto MIDI virtual: {self.midi_port.name}")
+            _log.info("App principal escuchando en puerto MIDI virtual: %s", self.midi_port.name)
         except BaseException as e:
-            print(f"WARN: No se pudo abrir el puerto MIDI en la app principal: {e}")
+            _log.warn("No se pudo abrir el puerto MIDI en la app principal: %s", e)
 
     def _on_midi_message(self, message):
+        # sello de captura lo antes posible: el motor agenda el golpe a partir de aca
+        # (mido no entrega el delta de tiempo de rtmidi)
+        captured = time.perf_counter_ns()
         # Primero, disparamos el sonido en la app principal
         if message.type == 'note_on':
-            self.engine.disparar(message)
+            self.engine.disparar(message, at_ns=captured)
 
         # Luego, si el juego está abierto, le enviamos el golpe
         if self.dino_process and self.dino_process.poll() is None:
@@ -82,13 +167,18 @@ class MainWindow(QMainWindow):
                     self.dino_process.stdin.write("HIT\n")
                     self.dino_process.stdin.flush()
                 except Exception as e:
-                    print(f"ERROR: No se pudo comunicar con DINO_RITMO: {e}")
+                    _log.error("No se pudo comunicar con DINO_RITMO: %s", e)
 
     def closeEvent(self, event):
         if self.midi_port:
             self.midi_port.close()
         if self.dino_process:
             self.dino_process.kill()
+        if not STORE.flush():
+            QMessageBox.warning(
+                self, 'Configuracion', f'No se pudo guardar la configuracion:\n{STORE.last_error or "tiempo agotado"}'
+            )
+        SINK.flush()
         event.accept()
 
     def _build_menu(self) -> None:
@@ -96,13 +186,101 @@ class MainWindow(QMainWindow):
         act_change_sf2 = QAction('Cambiar SoundFont...', self)
         act_change_sf2.triggered.connect(self._change_soundfont)
         menu_config.addAction(act_change_sf2)
+        self.menu_recent_sf2 = menu_config.addMenu('SoundFonts recientes')
+        self.menu_recent_sf2.aboutToShow.connect(self._populate_recent_sf2_menu)
+        self.menu_calibration = menu_config.addMenu('Perfil de calibracion')
+        self.menu_calibration.aboutToShow.connect(self._populate_calibration_menu)
+        menu_latency = menu_config.addMenu('Latencia de audio')
+        latency_group = QActionGroup(menu_latency)
+        current_latency = getattr(self.engine, 'latency_profile', None)
+        for name in LATENCY_PROFILES:
+            act = QAction(PROFILE_LABELS.get(name, name), menu_latency, checkable=True)
+            act.setChecked(name == current_latency)
+            act.triggered.connect(lambda _, n=name: self._select_latency_profile(n))
+            latency_group.addAction(act)
+            menu_latency.addAction(act)
+        menu_loading = menu_config.addMenu('Carga de muestras')
+        loading_group = QActionGroup(menu_loading)
+        current_loading = getattr(self.engine, 'sample_loading', DEFAULT_LOADING)
+        for name in LOADING_MODES:
+            act = QAction(LOADING_LABELS.get(name, name), menu_loading, checkable=True)
+            act.setChecked(name == current_loading)
+            act.triggered.connect(lambda _, n=name: self._select_sample_loading(n))
+            loading_group.addAction(act)
+            menu_loading.addAction(act)
+        menu_dispatch = menu_config.addMenu('Despacho de golpes')
+        dispatch_group = QActionGroup(menu_dispatch)
+        current_dispatch = getattr(self.engine, 'dispatch_mode', DEFAULT_DISPATCH)
+        for name in DISPATCH_MODES:
+            act = QAction(DISPATCH_LABELS.get(name, name), menu_dispatch, checkable=True)
+            act.setChecked(name == current_dispatch)
+            act.triggered.connect(lambda _, n=name: self._select_dispatch_mode(n))
+            dispatch_group.addAction(act)
+            menu_dispatch.addAction(act)
 
         menu_games = self.menuBar().addMenu('Juegos')
         act_dino = QAction('Iniciar DINO RITMO', self)
         act_dino.triggered.connect(self._launch_dino_ritmo)
         menu_games.addAction(act_dino)
 
+    def _select_latency_profile(self, name: str) -> None:
+        try:
+            self.engine.set_latency_profile(name)
+        except Exception as exc:
+            QMessageBox.critical(self, 'Error', f'No se pudo reconfigurar el audio\n{exc}')
+            return
+        self.config['latency_profile'] = name
+        save_config(self.config)
+        self._remember_audio_driver()
+
+    def _select_sample_loading(self, name: str) -> None:
+        self.config['sf2_loading'] = name
+        save_config(self.config)
+        if name != getattr(self.engine, 'sample_loading', DEFAULT_LOADING):
+            # synth.dynamic-sample-loading solo se lee al crear el sintetizador
+            QMessageBox.information(self, 'Carga de muestras', 'El cambio se aplica al reiniciar la aplicacion.')
+
+    def _select_dispatch_mode(self, name: str) -> None:
+        self.config['dispatch_mode'] = name
+        save_config(self.config)
+        if name != getattr(self.engine, 'dispatch_mode', DEFAULT_DISPATCH):
+            # el modo de despacho (y el secuenciador) se fijan al crear el motor
+            QMessageBox.information(self, 'Despacho de golpes', 'El cambio se aplica al reiniciar la aplicacion.')
+
+    def _populate_calibration_menu(self) -> None:
+        from app.state.settings import calibration_profile_names
+
+        menu = self.menu_calibration
+        menu.clear()
+        group = QActionGroup(menu)
+        current = self.config.get('calibration_profile')
+        for name in [None] + calibration_profile_names():
+            act = QAction(name or 'Sin calibracion', menu, checkable=True)
+            act.setChecked(name == current)
+            act.triggered.connect(lambda _, n=name: self._select_calibration_profile(n))
+            group.addAction(act)
+            menu.addAction(act)
+
+    def _select_calibration_profile(self, name) -> None:
+        from app.state.settings import set_active_calibration_profile
+
+        set_active_calibration_profile(self.config, name)
+        self._apply_calibration_profile(name)
+
+    def _apply_calibration_profile(self, name) -> None:
+        from app.audio.calibration import apply_profile
+        from app.state.settings import load_calibration_profile
+
+        profile = load_calibration_profile(name) if name else None
+        if name and profile is None:
+            _log.warn("Perfil de calibracion no encontrado: %s", name)
+        skipped = apply_profile(self.engine, profile)
+        if skipped:
+            _log.warn("Perfil %s: pads sin nota MIDI registrada: %s", name, skipped)
+
     def _launch_dino_ritmo(self):
+        import subprocess
+
         if self.dino_process and self.dino_process.poll() is None:
             QMessageBox.information(self, "DINO RITMO", "El juego ya está abierto.")
             return
@@ -124,12 +302,52 @@ class MainWindow(QMainWindow):
         chosen, _ = QFileDialog.getOpenFileName(self, 'Seleccionar SoundFont', str(directory), 'SoundFont (*.sf2)')
         if not chosen:
             return
-        path = Path(chosen)
+        self._switch_soundfont(Path(chosen))
+
+    def _populate_recent_sf2_menu(self) -> None:
+        menu = self.menu_recent_sf2
+        menu.clear()
+        known = {info.path: info for info in self.library.known()}
+        resident = set(self.library.resident())
+        for key in self.library.recent:
+            info = known.get(key)
+            if info is None:
+                continue
+            # todo sale del indice: no se abre ningun archivo para armar el menu
+            mark = ' *' if key in resident else ''
+            label = f"{info.name} - {len(info.presets)} presets, {info.sample_bytes / 1e6:.0f} MB{mark}"
+            act = QAction(label, menu)
+            act.setToolTip(', '.join(name for _, _, name in info.presets[:12]))
+            act.triggered.connect(lambda _, p=key: self._switch_soundfont(Path(p)))
+            menu.addAction(act)
+        if menu.isEmpty():
+            empty = menu.addAction('(vacio)')
+            empty.setEnabled(False)
+
+    def _switch_soundfont(self, path: Path) -> None:
+        from app.ui.components.sf2_progress import watch_sf2_load
+
         try:
-            self.engine.load_sf2_live(path)
+            load = self.library.select(path)
         except Exception as exc:
             QMessageBox.critical(self, 'Error', f'No se pudo cambiar el SoundFont\n{exc}')
             return
+        # sin dialogo modal: los pads siguen sonando con la fuente actual durante la carga
+        status = self.statusBar()
+        status.show()
+        watch_sf2_load(self, load, status.showMessage, lambda error: self._soundfont_loaded(path, error))
+
+    def _soundfont_loaded(self, path: Path, error: str | None) -> None:
+        from app.ui.components.sf2_progress import CANCELLED
+
+        status = self.statusBar()
+        status.clearMessage()
+        status.hide()
+        if error == CANCELLED:
+            return
+        if error:
+            QMessageBox.critical(self, 'Error', f'No se pudo cambiar el SoundFont\n{error}')
+            return
         self.config['last_sf2'] = str(path)
         save_config(self.config)
         QMessageBox.information(self, 'SoundFont', f'SoundFont cargado: {path.name}')
@@ -2,16 +2,25 @@
 Página de calibración de pads.
 """
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QGridLayout, QMessageBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QGridLayout, QMessageBox, QComboBox
 )
 from PyQt5.QtCore import Qt
-from app.state.settings import save_calibration_profile
+from app.audio.calibration import MEDIUM_TARGET, apply_profile
+from app.state.settings import (
+    calibration_profile_names,
+    load_calibration_profile,
+    save_calibration_profile,
+    set_active_calibration_profile,
+)
+
+CURVE_LABELS = (("linear", "Lineal"), ("gamma", "Gamma"), ("piecewise", "Por tramos"))
 
 class CalibrationPage(QWidget):
     def __init__(self, engine, config: dict | None = None) -> None:
         super().__init__()
         self.engine = engine
         self.config = config if config is not None else {}
+        self.setObjectName("CalibrationPage")
         self._build_ui()
 
     def _build_ui(self):
@@ -56,6 +65,21 @@ class CalibrationPage(QWidget):
         calibration_layout.addWidget(self.hard_hit_value, 1, 1)
         calibration_layout.addWidget(self.hard_hit_button, 1, 2)
 
+        # Medium hit (optional extra capture)
+        self.medium_hit_label = QLabel("Golpe medio (opcional)")
+        self.medium_hit_value = QLabel("-")
+        self.medium_hit_button = QPushButton("Capturar valor medio")
+        self.medium_hit_button.clicked.connect(self._start_capturing_medium)
+        calibration_layout.addWidget(self.medium_hit_label, 2, 0)
+        calibration_layout.addWidget(self.medium_hit_value, 2, 1)
+        calibration_layout.addWidget(self.medium_hit_button, 2, 2)
+
+        calibration_layout.addWidget(QLabel("Curva"), 3, 0)
+        self.curve_combo = QComboBox()
+        for key, label in CURVE_LABELS:
+            self.curve_combo.addItem(label, key)
+        calibration_layout.addWidget(self.curve_combo, 3, 1, 1, 2)
+
         main_layout.addLayout(calibration_layout)
 
         # Save profile
@@ -64,16 +88,18 @@ class CalibrationPage(QWidget):
         self.profile_name_input.setPlaceholderText("Nombre del perfil de calibración")
         save_button = QPushButton("Guardar Perfil")
         save_button.clicked.connect(self._save_profile)
+        apply_button = QPushButton("Usar Perfil")
+        apply_button.clicked.connect(self._activate_profile)
         save_layout.addWidget(self.profile_name_input)
         save_layout.addWidget(save_button)
+        save_layout.addWidget(apply_button)
         main_layout.addLayout(save_layout)
 
         self.selected_pad = -1
         self.calibrating_midi_note = None
         self.capturing_soft = False
         self.capturing_hard = False
-
-        self._apply_styles()
+        self.capturing_medium = False
 
     def _select_pad(self, pad_idx: int):
         for i, btn in enumerate(self.pad_buttons):
@@ -83,6 +109,7 @@ class CalibrationPage(QWidget):
         self.calibrating_midi_note = None
         self.soft_hit_value.setText("-")
         self.hard_hit_value.setText("-")
+        self.medium_hit_value.setText("-")
         QMessageBox.information(self, "Calibración", f"Pad {pad_idx + 1} seleccionado. Por favor, golpea el pad una vez para identificarlo.")
 
     def on_midi_message(self, message):
@@ -102,16 +129,27 @@ class CalibrationPage(QWidget):
             elif self.capturing_hard:
                 self.hard_hit_value.setText(str(velocity))
                 self.capturing_hard = False
+            elif self.capturing_medium:
+                self.medium_hit_value.setText(str(velocity))
+                self.capturing_medium = False
 
     def _start_capturing_soft(self):
         if self.selected_pad != -1:
             self.capturing_soft = True
             self.capturing_hard = False
+            self.capturing_medium = False
 
     def _start_capturing_hard(self):
         if self.selected_pad != -1:
             self.capturing_hard = True
             self.capturing_soft = False
+            self.capturing_medium = False
+
+    def _start_capturing_medium(self):
+        if self.selected_pad != -1:
+            self.capturing_medium = True
+            self.capturing_soft = False
+            self.capturing_hard = False
 
     def _save_profile(self):
         profile_name = self.profile_name_input.text()
@@ -130,39 +168,36 @@ class CalibrationPage(QWidget):
             QMessageBox.warning(self, "Error", "Por favor, captura los valores para el golpe suave y fuerte.")
             return
 
+        if int(soft_value) >= int(hard_value):
+            QMessageBox.warning(self, "Error", "El golpe fuerte debe dar una velocidad mayor que el suave.")
+            return
+
         settings = {
             "pad": self.selected_pad,
+            "note": self.calibrating_midi_note,
             "soft": int(soft_value),
-            "hard": int(hard_value)
+            "hard": int(hard_value),
+            "mode": self.curve_combo.currentData(),
         }
+        medium_value = self.medium_hit_value.text()
+        if medium_value != "-":
+            settings["points"] = [[int(medium_value), MEDIUM_TARGET]]
         save_calibration_profile(profile_name, settings)
+        if self.config.get("calibration_profile") == profile_name:
+            self._apply_to_engine(profile_name)
         QMessageBox.information(self, "Éxito", f"Perfil de calibración '{profile_name}' guardado.")
 
-    def _apply_styles(self) -> None:
-        self.setStyleSheet("""
-            QLabel#PageTitle {
-                font-size: 24px;
-                font-weight: 700;
-                margin-bottom: 20px;
-            }
-            QPushButton {
-                background-color: #1f2937;
-                color: #e5e7eb;
-                border: 1px solid #334155;
-                border-radius: 12px;
-                padding: 10px 14px;
-            }
-            QPushButton:hover {
-                background-color: #3b82f6;
-            }
-            QPushButton:checked {
-                background-color: #1d4ed8;
-            }
-            QLineEdit {
-                background-color: #111827;
-                color: #e5e7eb;
-                border: 1px solid #334155;
-                border-radius: 12px;
-                padding: 10px;
-            }
-        """)
+    def _activate_profile(self):
+        profile_name = self.profile_name_input.text()
+        if profile_name not in calibration_profile_names():
+            QMessageBox.warning(self, "Error", "No existe un perfil guardado con ese nombre.")
+            return
+        set_active_calibration_profile(self.config, profile_name)
+        self._apply_to_engine(profile_name)
+
+    def _apply_to_engine(self, profile_name: str):
+        profile = load_calibration_profile(profile_name)
+        skipped = apply_profile(self.engine, profile)
+        if skipped:
+            pads = ", ".join(str(pad + 1) for pad in skipped)
+            QMessageBox.warning(self, "Calibración", f"Pads sin nota MIDI registrada (recalibrar): {pads}")
@@ -16,8 +16,11 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QFileDialog,
     QMessageBox,
+    QProgressBar,
 )
 
+from app.theme.qss import set_state
+from app.ui.components.sf2_progress import CANCELLED, watch_sf2_load
 from app.ui.pages.effects_presets import get_reverb_preset
 from app.state.settings import load_config, save_config
 
@@ -32,13 +35,6 @@ class EffectsPage(QWidget):
         self._last_reverb_level_value = initial_level if initial_level > 0 else 40
         self.setObjectName("EffectsPage")
         self._build_ui()
-        self.setStyleSheet(
-            "QWidget#EffectsPage{color:#e5e7eb;}"
-            "QWidget#EffectsPage QLabel{color:#e5e7eb;}"
-            "QWidget#EffectsPage QGroupBox{color:#e5e7eb;}"
-            "QWidget#EffectsPage QCheckBox{color:#e5e7eb;}"
-            "QWidget#EffectsPage QPushButton{color:#e5e7eb;}"
-        )
 
     def _build_ui(self) -> None:
         layout = QVBoxLayout(self)
@@ -76,10 +72,12 @@ class EffectsPage(QWidget):
         rev_layout.addWidget(self.sld_rev_damp)
 
         presets_row = QHBoxLayout()
+        self.preset_buttons = {}
         for key, label in (("seco", "Preset: Seco"), ("media", "Preset: Media"), ("sala", "Preset: Sala")):
             btn = QPushButton(label)
             btn.clicked.connect(lambda _, name=key: self.apply_reverb_preset(name))
             presets_row.addWidget(btn)
+            self.preset_buttons[key] = btn
         rev_layout.addLayout(presets_row)
 
         reverb_box.setLayout(rev_layout)
@@ -125,6 +123,16 @@ class EffectsPage(QWidget):
         self.chk_limiter.stateChanged.connect(lambda state: self.audio.set_limiter_enabled(bool(state)))
         dyn_layout.addWidget(self.chk_limiter)
 
+        self.lbl_gr = QLabel("Reduccion limitador: 0.0 dB")
+        self.bar_gr = QProgressBar()
+        self.bar_gr.setRange(0, 200)  # decimas de dB
+        self.bar_gr.setTextVisible(False)
+        self.bar_gr.setInvertedAppearance(True)
+        self.bar_gr.setFixedHeight(8)
+        dyn_layout.addWidget(self.lbl_gr)
+        dyn_layout.addWidget(self.bar_gr)
+        self._gr_display = 0.0
+
         self.lbl_gate = QLabel(f"Filtro golpes leves: {self.min_velocity}")
         self.sld_gate = QSlider(Qt.Horizontal)
         self.sld_gate.setRange(0, 40)
@@ -157,6 +165,21 @@ class EffectsPage(QWidget):
 
     def apply_reverb_preset(self, preset: str) -> None:
         params = get_reverb_preset(preset)
+        scene_of = getattr(self.audio, 'scene', None)
+        if scene_of is not None:
+            changes = {}
+            if params.get('room') is not None:
+                changes['reverb_room'] = int(params['room']) / 100.0
+            if params.get('damp') is not None:
+                changes['reverb_damp'] = int(params['damp']) / 100.0
+            if params.get('level') is not None:
+                # mismas reglas que _apply_reverb_level
+                level = max(0, min(100, int(params['level'])))
+                changes.update(reverb_level=level / 100.0, reverb_send=min(1.0, level / 60.0),
+                               reverb_active=level > 0)
+            self.recall_scene(scene_of()._replace(**changes))
+            self._mark_preset(preset)
+            return
         room = params.get('room')
         if room is not None:
             self._set_slider(self.sld_rev_room, int(room), self._apply_reverb_room)
@@ -166,6 +189,39 @@ class EffectsPage(QWidget):
         level = params.get('level')
         if level is not None:
             self._set_level_slider(int(level))
+        self._mark_preset(preset)
+
+    def recall_scene(self, scene) -> None:
+        """Apply a whole engine scene in one batch and bring the controls in line with it."""
+        self.audio.apply_scene(scene)
+        level = int(round(scene.reverb_level * 100)) if scene.reverb_active else 0
+        for slider, value in (
+            (self.sld_rev_room, int(round(scene.reverb_room * 100))),
+            (self.sld_rev_damp, int(round(scene.reverb_damp * 100))),
+            (self.sld_rev_level, level),
+            (self.sld_bright, int(scene.brightness)),
+            (self.sld_boost, int(round(scene.velocity_gain))),
+            (self.sld_master, int(round(scene.master_db * 10))),
+        ):
+            slider.blockSignals(True)
+            slider.setValue(value)
+            slider.blockSignals(False)
+        self.chk_limiter.blockSignals(True)
+        self.chk_limiter.setChecked(scene.limiter)
+        self.chk_limiter.blockSignals(False)
+        if level > 0:
+            self._last_reverb_level_value = level
+        self._sync_reverb_toggle(scene.reverb_active)
+        self.lbl_rev_level.setText(self._format_reverb_level())
+        self.lbl_rev_room.setText(f"Reverb room: {self.audio.reverb_roomsize:.2f}")
+        self.lbl_rev_damp.setText(f"Reverb damp: {self.audio.reverb_damping:.2f}")
+        self.lbl_bright.setText(f"Brillo (CC74): {int(scene.brightness)}")
+        self.lbl_boost.setText(f"Boost (vel x): {self.audio.velocity_gain:.0f}")
+        self.lbl_master.setText(f"Master boost (dB): {self.audio.master_db:+.1f}")
+
+    def _mark_preset(self, preset: str | None) -> None:
+        for key, btn in self.preset_buttons.items():
+            set_state(btn, 'active', key == preset)
 
     def _set_slider(self, slider: QSlider, value: int, callback: Callable[[int], None]) -> None:
         bounded = int(max(slider.minimum(), min(slider.maximum(), value)))
@@ -211,8 +267,12 @@ class EffectsPage(QWidget):
 
     def _apply_brightness(self, value: int) -> None:
         try:
-            for ch in range(16):
-                self.audio.fs.cc(ch, 74, int(value))
+            setter = getattr(self.audio, 'set_brightness', None)
+            if setter is not None:
+                setter(int(value))
+            else:
+                for ch in range(16):
+                    self.audio.fs.cc(ch, 74, int(value))
         except Exception:
             pass
         self.lbl_bright.setText(f"Brillo (CC74): {int(value)}")
@@ -230,6 +290,23 @@ class EffectsPage(QWidget):
         self.audio.set_master_gain_db(db)
         self.lbl_master.setText(f"Master boost (dB): {self.audio.master_db:+.1f}")
 
+    def advance(self, dt_ms: float) -> bool:
+        """Frame-clock hook for the gain-reduction meter; sleeps once it reads 0 dB."""
+        poll = getattr(self.audio, 'limiter_reduction_db', None)
+        if poll is None or not self.isVisible():
+            return False
+        try:
+            reduction = float(poll())
+        except Exception:
+            return False
+        # subida inmediata, caida suave (x0.8 cada 66 ms) para que los picos cortos se vean
+        self._gr_display = max(reduction, self._gr_display * 0.8 ** (dt_ms / 66.0))
+        if self._gr_display < 0.05:
+            self._gr_display = 0.0
+        self.bar_gr.setValue(int(min(20.0, self._gr_display) * 10))
+        self.lbl_gr.setText(f"Reduccion limitador: {self._gr_display:.1f} dB")
+        return self._gr_display > 0.0
+
     def _apply_gate(self, value: int) -> None:
         self.min_velocity = max(0, int(value))
         self.lbl_gate.setText(f"Filtro golpes leves: {self.min_velocity}")
@@ -254,11 +331,32 @@ class EffectsPage(QWidget):
         if not chosen:
             return
         path = Path(chosen)
+        library = getattr(self.audio, 'library', None)
+        start_load = library.select if library is not None else getattr(self.audio, 'load_sf2_async', None)
         try:
-            self.audio.load_sf2_live(path)
+            if start_load is None:
+                self.audio.load_sf2_live(path)
+            else:
+                load = start_load(path)
         except Exception as exc:
             QMessageBox.critical(self, 'Error', f'No se pudo cargar el SoundFont\n{exc}')
             return
+        if start_load is None:
+            self._sf2_loaded(path, None)
+            return
+        # la fuente actual sigue sonando mientras se carga la nueva
+        self.btn_sf.setEnabled(False)
+        watch_sf2_load(self, load, self.lbl_sf.setText, lambda error: self._sf2_loaded(path, error))
+
+    def _sf2_loaded(self, path: Path, error: str | None) -> None:
+        self.btn_sf.setEnabled(True)
+        if error == CANCELLED:
+            self.lbl_sf.setText(self._current_sf_text())
+            return
+        if error:
+            self.lbl_sf.setText(self._current_sf_text())
+            QMessageBox.critical(self, 'Error', f'No se pudo cargar el SoundFont\n{error}')
+            return
         self.config['last_sf2'] = str(path)
         save_config(self.config)
         self.lbl_sf.setText(self._current_sf_text())
@@ -1,8 +1,14 @@
-﻿"""Reverb preset definitions in legacy units (0-100)."""
+﻿"""Reverb preset definitions in legacy units (0-100).
+
+The built-in presets below can be extended with user presets of kind
+``reverb`` stored in the preset repository.
+"""
 from __future__ import annotations
 
 from typing import Dict, List
 
+from app.state.presets import get_repository
+
 _PRESETS: Dict[str, Dict[str, object]] = {
     'seco': {'active': False, 'level': 0, 'room': None, 'damp': None},
     'media': {'active': True, 'level': 25, 'room': 45, 'damp': 25},
@@ -13,9 +19,13 @@ _PRESETS: Dict[str, Dict[str, object]] = {
 def get_reverb_preset(name: str) -> Dict[str, object]:
     """Return a copy of the preset definition for the given name."""
     key = (name or '').lower()
-    return dict(_PRESETS.get(key, _PRESETS['media']))
+    if key in _PRESETS:
+        return dict(_PRESETS[key])
+    user = get_repository().get('reverb', name) if name else None
+    return dict(_PRESETS['media'], **user) if user else dict(_PRESETS['media'])
 
 
 def available_reverb_presets() -> List[str]:
     """Return the list of available preset identifiers."""
-    return list(_PRESETS.keys())
+    user = [name for name in get_repository().names('reverb') if name.lower() not in _PRESETS]
+    return list(_PRESETS.keys()) + user
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import List
 
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtWidgets import (
     QGridLayout,
     QHBoxLayout,
@@ -13,12 +13,19 @@ from PyQt5.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
-from mido import Message
 
+from app.audio.log import get_channel
+from app.theme.qss import set_state
+from app.ui.components.frame_clock import shared_clock
 from app.ui.components.note_selector import NoteSelectorDialog
+from app.ui.components.vu_meter import VuMeter
 from app.ui.pages.effects import EffectsPage
 
+_log = get_channel("ui")
+
 NOTE_NAMES = "C C# D D# E F F# G G# A A# B".split()
+HIT_PEAK = 0.03  # ~ -30 dBFS: el pad se marca como golpeado
+HIT_GATE_MS = 250  # note_off automatico de los golpes con el mouse
 
 
 def to_midi(note: str) -> int:
@@ -36,40 +43,10 @@ DEFAULT_NOTE_SETS: List[List[str]] = [
 ]
 
 
-class Vu(QWidget):
-    def __init__(self) -> None:
-        super().__init__()
-        self.setMinimumSize(48, 320)
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 6, 0, 6)
-        layout.setSpacing(4)
-        self.bars: List[QLabel] = []
-        for _ in range(21):
-            bar = QLabel()
-            bar.setFixedHeight(18)
-            bar.setStyleSheet("background:#2b3648;")
-            layout.addWidget(bar)
-            self.bars.append(bar)
-        layout.addStretch(1)
-        self.level = 0
-        self.timer = QTimer(self)
-        self.timer.setInterval(60)
-        self.timer.timeout.connect(self._tick)
-        self.timer.start()
-
-    def actualizar(self, value: int) -> None:
-        self.level = max(self.level, int(value))
-
-    def _tick(self) -> None:
-        self.level = max(0, self.level - 6)
-        active = self.level // 9
-        for idx, bar in enumerate(reversed(self.bars)):
-            bar.setStyleSheet(
-                "background:#22c55e" if idx < active else "background:#2b3648;"
-            )
-
-
 class PadsPage(QWidget):
+    # emitida desde el hilo de audio; Qt la entrega en el hilo de la GUI
+    levels_active = pyqtSignal()
+
     def __init__(self, engine, config: dict | None = None) -> None:
         super().__init__()
         self.engine = engine
@@ -130,7 +107,7 @@ class PadsPage(QWidget):
         vu_grid = QGridLayout()
         vu_grid.setHorizontalSpacing(18)
         for idx in range(5):
-            vu = Vu()
+            vu = VuMeter()
             vu.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
             vu_grid.addWidget(vu, 0, idx)
             vu_grid.setColumnStretch(idx, 1)
@@ -208,95 +185,17 @@ class PadsPage(QWidget):
         wrapper.addWidget(container)
         wrapper.addStretch(1)
 
-        self._apply_styles()
         self._set_effects_visible(not effects_collapsed, init=True)
         self._refresh_ui()
 
-    def _apply_styles(self) -> None:
-        self.setStyleSheet(
-            """
-            QWidget#PadsContent {
-                background: transparent;
-            }
-            QWidget#EffectsHolder {
-                background: #111827;
-                border: 1px solid #1f2937;
-                border-radius: 22px;
-            }
-            QPushButton#EffectsToggle {
-                background-color: #1f2937;
-                color: #e5e7eb;
-                border: 1px solid #334155;
-                border-radius: 14px;
-                padding: 10px 14px;
-                font-size: 15px;
-                font-weight: 600;
-            }
-            QPushButton#EffectsToggle:hover {
-                background-color: #233044;
-            }
-            QWidget#EffectsContainer {
-                background-color: #0f172a;
-                border: 1px solid #1f2937;
-                border-radius: 18px;
-            }
-            QWidget#PadBoard {
-                background-color: #0f172a;
-                border: 1px solid #1f2937;
-                border-radius: 28px;
-            }
-            QWidget#PadBoard QPushButton {
-                background-color: #1f2937;
-                color: #e5e7eb;
-                border: 1px solid #334155;
-                border-radius: 16px;
-                font-size: 20px;
-                font-weight: 700;
-                letter-spacing: 0.6px;
-            }
-            QWidget#PadBoard QPushButton:hover {
-                background-color: #3b82f6;
-                border-color: #60a5fa;
-            }
-            QWidget#PadBoard QPushButton:pressed {
-                background-color: #1d4ed8;
-            }
-            QLabel#SetGhostPrev, QLabel#SetGhostNext {
-                background-color: #111827;
-                border: 1px dashed #1f2937;
-                border-radius: 10px;
-                font-size: 14px;
-                font-weight: 600;
-            }
-            QLabel#SetGhostPrev {
-                color: #475569;
-            }
-            QLabel#SetGhostNext {
-                color: #94a3b8;
-            }
-            QWidget#PadSetNav {
-                background: #111827;
-                border: 1px solid #1f2937;
-                border-radius: 22px;
-            }
-            QWidget#PadSetNav QPushButton {
-                background-color: #1f2937;
-                color: #e5e7eb;
-                border: 1px solid #334155;
-                border-radius: 12px;
-                font-size: 22px;
-                font-weight: 700;
-            }
-            QWidget#PadSetNav QPushButton:hover {
-                background-color: #3b82f6;
-            }
-            QWidget#PadSetNav QLabel {
-                color: #94a3b8;
-                font-weight: 600;
-                font-size: 18px;
-            }
-            """
-        )
+        # Niveles reales del audio renderizado: se leen en el reloj compartido solo mientras suena algo
+        self._last_levels_seq = 0
+        self.clock = shared_clock()
+        self.levels_active.connect(self._wake_levels)
+        listen = getattr(self.engine, 'set_level_listener', None)
+        if listen is not None:
+            listen(self.levels_active.emit)
+            self._wake_levels()
 
     def _set_effects_visible(self, expanded: bool, *, init: bool = False) -> None:
         self.effects_container.setVisible(expanded)
@@ -337,28 +236,58 @@ class PadsPage(QWidget):
             lbl.setText(self.note_sets[next_index][idx])
 
         self.set_label.setText(f"{self.active_set + 1}/{len(self.note_sets)}")
+        self._route_pad_notes()
+
+    def _route_pad_notes(self) -> None:
+        route = getattr(self.engine, 'set_pad_notes', None)
+        if route is None:
+            return
+        try:
+            route([to_midi(note) for note in self._current_notes()])
+        except Exception as exc:
+            _log.warn("No se pudieron rutear las notas de los pads: %s", exc)
+
+    def _wake_levels(self) -> None:
+        self.clock.wake(self)
+
+    def advance(self, dt_ms: float) -> bool:
+        """Frame-clock hook: feed the meters while the engine output is audible."""
+        try:
+            snap = self.engine.levels()
+        except Exception:
+            return False
+        if snap is None:
+            return False
+        if snap.seq != self._last_levels_seq:
+            self._last_levels_seq = snap.seq
+            for vu, btn, peak in zip(self.vus, self.pad_buttons, snap.pad_peak):
+                vu.set_peak(peak)
+                set_state(btn, 'hit', peak > HIT_PEAK)
+            if self.effects_container.isVisible():
+                self.clock.wake(self.effects_widget)
+        return snap.audible()
 
     def _change_set(self, delta: int) -> None:
         self.active_set = (self.active_set + delta) % len(self.note_sets)
         self._refresh_ui()
 
     def _trigger_pad(self, pad_idx: int) -> None:
+        from mido import Message
+
         note_name = self._current_notes()[pad_idx]
         midi_note = to_midi(note_name)
         velocity = 110
-        self.vus[pad_idx].actualizar(velocity)
+        if getattr(self.engine, 'levels', lambda: None)() is None:
+            # sin medicion real: el vumetro refleja la velocidad del golpe
+            self.vus[pad_idx].actualizar(velocity)
         try:
+            # el motor suelta la nota a tiempo aunque el hilo de la GUI este ocupado
             self.engine.disparar(
-                Message('note_on', note=midi_note, velocity=velocity, channel=0)
-            )
-            QTimer.singleShot(
-                250,
-                lambda n=midi_note: self.engine.disparar(
-                    Message('note_off', note=n, velocity=0, channel=0)
-                ),
+                Message('note_on', note=midi_note, velocity=velocity, channel=0),
+                auto_off_ms=HIT_GATE_MS,
             )
         except Exception as exc:
-            print("hit error:", exc)
+            _log.warn("No se pudo disparar el pad %d: %s", pad_idx + 1, exc)
 
     def _edit_pad_note(self, pad_idx: int) -> None:
         dialog = NoteSelectorDialog(self)
@@ -367,3 +296,4 @@ class PadsPage(QWidget):
             new_note = dialog.note()
             self.note_sets[self.active_set][pad_idx] = new_note
             self.pad_buttons[pad_idx].setText(new_note)
+            self._route_pad_notes()
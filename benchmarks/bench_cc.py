@@ -0,0 +1,106 @@
+"""FFI calls per second while dragging the effects sliders.
+
+Replays a drag of the brightness slider (CC74, 0 -> 127 -> 0) and of the reverb
+level slider (``set_reverb`` + ``set_reverb_send`` + ``set_reverb_active`` per
+tick) at ``--tick-hz`` slider updates per second, with an audio block every
+``--block`` frames at 48 kHz.
+
+"legacy" writes the controllers the way the engine used to: every call, all 16
+channels. "cached" is the current ``SoundEngine``: per-channel value cache,
+only the channels in use, and slider values coalesced to one flush per audio
+block (a stand-in audio thread calls the block hook).
+
+Run from the repository root::
+
+    python -m benchmarks.bench_cc --seconds 3 --tick-hz 250 --block 256
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+from benchmarks.bench_scenes import make_engine
+
+RATE = 48000
+
+
+def drag(seconds: float, tick_hz: float, on_tick) -> None:
+    ticks = int(seconds * tick_hz)
+    start = time.perf_counter()
+    for n in range(ticks):
+        due = start + n / tick_hz
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        phase = (n / max(1, ticks - 1)) * 2.0
+        on_tick(phase if phase <= 1.0 else 2.0 - phase)
+
+
+def legacy_tick(fs, slider: str, x: float) -> None:
+    if slider == "brillo":
+        for ch in range(16):
+            fs.cc(ch, 74, int(round(x * 127)))
+        return
+    value = int(round(x * 100))
+    fs.set_reverb(0.7, 0.2, 0.9, value / 100.0)
+    send = int(round(min(1.0, value / 60.0) * 127))
+    for ch in range(16):
+        fs.cc(ch, 91, send)
+    # set_reverb_active volvia a escribir el send y prendia/apagaba la reverb
+    for ch in range(16):
+        fs.cc(ch, 91, send)
+    fs.reverb_on() if value > 0 else fs.reverb_off()
+
+
+def cached_tick(engine, slider: str, x: float) -> None:
+    if slider == "brillo":
+        engine.set_brightness(int(round(x * 127)))
+        return
+    value = int(round(x * 100))
+    engine.set_reverb(level=value / 100.0)
+    engine.set_reverb_send(min(1.0, value / 60.0))
+    engine.set_reverb_active(value > 0)
+
+
+def run(engine, slider: str, legacy: bool, args) -> float:
+    fs = engine.fs
+    stop = threading.Event()
+
+    def audio() -> None:
+        period = args.block / RATE
+        while not stop.wait(period):
+            engine._flush_cc()
+
+    engine._cc_on_block = True
+    worker = threading.Thread(target=audio, daemon=True)
+    worker.start()
+    fs.calls = 0
+    if legacy:
+        drag(args.seconds, args.tick_hz, lambda x: legacy_tick(fs, slider, x))
+    else:
+        drag(args.seconds, args.tick_hz, lambda x: cached_tick(engine, slider, x))
+    time.sleep(2 * args.block / RATE)
+    stop.set()
+    worker.join()
+    return fs.calls / args.seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--tick-hz", type=float, default=250.0)
+    parser.add_argument("--block", type=int, default=256)
+    args = parser.parse_args()
+
+    engine = make_engine(0.0)
+    print(f"{'slider':<10}{'legacy llamadas/s':>19}{'cached llamadas/s':>19}")
+    for slider in ("brillo", "reverb"):
+        before = run(engine, slider, True, args)
+        after = run(engine, slider, False, args)
+        print(f"{slider:<10}{before:19.0f}{after:19.0f}")
+    print(f"cache: {engine.cc_calls} escrituras, {engine.cc_skipped} omitidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Enqueue-to-noteon latency of the note dispatch paths.
+
+Simulates a 15 Hz tremolo on five pads (75 hits/s, each followed by its
+note_off) and measures the time between the producer handing the hit over and
+the consumer calling ``noteon`` on a stand-in synth. Compares the old
+``queue.Queue`` + tuple path, the ``EventRing`` path used by ``SoundEngine``
+and the inline "direct" mode. The time is split into ``--rounds`` that run
+the modes in turn, so a burst of machine noise hits all of them alike
+instead of skewing the tail of whichever mode was running.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_dispatch --seconds 30
+"""
+from __future__ import annotations
+
+import argparse
+import queue
+import threading
+import time
+
+from app.audio.dispatch import EV_OFF, EV_ON, EventRing
+
+PADS = (45, 52, 57, 60, 64)
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class _Synth:
+    """Records the latency of every noteon relative to its enqueue stamp."""
+
+    def __init__(self) -> None:
+        self.latencies_ns = []
+        self.pending_stamp = 0
+
+    def noteon(self, ch, note, vel) -> None:
+        self.latencies_ns.append(time.perf_counter_ns() - self.pending_stamp)
+
+    def noteoff(self, ch, note) -> None:
+        pass
+
+
+def _tremolo(hz: float, seconds: float, emit) -> None:
+    period = 1.0 / hz
+    offset = period / len(PADS)
+    start = time.perf_counter()
+    hits = int(seconds * hz)
+    for n in range(hits):
+        for pad, note in enumerate(PADS):
+            due = start + n * period + pad * offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            emit(EV_ON, note, 100)
+            emit(EV_OFF, note, 0)
+
+
+def run_queue(hz: float, seconds: float) -> list:
+    synth = _Synth()
+    q = queue.Queue()
+
+    def consumer():
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            typ, note, vel, stamp = item
+            if typ == "on":
+                synth.pending_stamp = stamp
+                synth.noteon(0, note, vel)
+            else:
+                synth.noteoff(0, note)
+
+    worker = threading.Thread(target=consumer, daemon=True)
+    worker.start()
+    _tremolo(hz, seconds, lambda kind, note, vel: q.put(
+        ("on" if kind == EV_ON else "off", note, vel, time.perf_counter_ns())))
+    q.put(None)
+    worker.join()
+    return synth.latencies_ns
+
+
+def run_ring(hz: float, seconds: float) -> list:
+    synth = _Synth()
+    ring = EventRing()
+    done = threading.Event()
+
+    def play(kind, note, vel, stamp):
+        if kind == EV_ON:
+            synth.pending_stamp = stamp
+            synth.noteon(0, note, vel)
+        else:
+            synth.noteoff(0, note)
+
+    def consumer():
+        while not done.is_set() or len(ring):
+            if ring.wait(timeout=0.05):
+                ring.drain(play)
+
+    worker = threading.Thread(target=consumer, daemon=True)
+    worker.start()
+    _tremolo(hz, seconds, lambda kind, note, vel: ring.push(kind, note, vel, time.perf_counter_ns()))
+    done.set()
+    worker.join()
+    return synth.latencies_ns
+
+
+def run_direct(hz: float, seconds: float) -> list:
+    synth = _Synth()
+
+    def emit(kind, note, vel):
+        synth.pending_stamp = time.perf_counter_ns()
+        if kind == EV_ON:
+            synth.noteon(0, note, vel)
+        else:
+            synth.noteoff(0, note)
+
+    _tremolo(hz, seconds, emit)
+    return synth.latencies_ns
+
+
+MODES = {"queue": run_queue, "ring": run_ring, "direct": run_direct}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hz", type=float, default=15.0, help="Frecuencia de tremolo por pad.")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rounds", type=int, default=10, help="Turnos alternando los modos.")
+    parser.add_argument("--mode", choices=sorted(MODES), action="append")
+    args = parser.parse_args()
+
+    names = args.mode or list(MODES)
+    rounds = max(1, args.rounds)
+    print(f"tremolo {args.hz:.0f} Hz x {len(PADS)} pads, {args.seconds:.0f} s por modo en {rounds} turnos")
+    samples = {name: [] for name in names}
+    for _ in range(rounds):
+        for name in names:
+            samples[name] += MODES[name](args.hz, args.seconds / rounds)
+    for name in names:
+        lat = [ns / 1000.0 for ns in samples[name]]
+        print(
+            f"{name:>6}: n={len(lat):5d}  p50={percentile(lat, 50):8.1f} us"
+            f"  p99={percentile(lat, 99):8.1f} us  max={max(lat, default=0.0):8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Voice count and render CPU of the +30 dB master boost, old vs new.
+
+"layers" reproduces the previous engine: above FluidSynth's +20 dB gain cap the
+same note was fired on ``ceil(desired/10)`` channels (4 at +30 dB) and every
+note_off went to all of them. "stage" fires one note on channel 0 and applies
+the remaining +10 dB in ``OutputStage`` on the rendered float blocks.
+
+Both modes render a five-pad tremolo offline through ``fluid_synth_process`` in
+blocks of the current latency profile and report the peak and mean active voice
+count plus the process CPU time per second of rendered audio.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_gain_stage ruta/al/timbal.sf2 --seconds 10
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from pathlib import Path
+
+from app.audio.bootstrap_fluidsynth import bootstrap
+from app.audio.latency import get_profile
+from app.audio.output import BlockRenderer, OutputStage, fluid_lib
+
+PADS = (45, 52, 57, 60, 64)
+MASTER_DB = 30.0
+SYNTH_GAIN_CAP = 10.0
+LAYERS = 4
+
+
+def run(fluidsynth, lib, sf2: Path, mode: str, hz: float, seconds: float, period: int, rate: int) -> dict:
+    fs = fluidsynth.Synth(gain=SYNTH_GAIN_CAP, samplerate=float(rate))
+    try:
+        sid = fs.sfload(str(sf2))
+        if sid == -1:
+            raise RuntimeError(f"No se pudo cargar {sf2}")
+        channels = LAYERS if mode == "layers" else 1
+        for ch in range(channels):
+            fs.program_select(ch, sid, 0, 0)
+        stage = OutputStage()
+        desired = 10.0 ** (MASTER_DB / 20.0)
+        stage.set_gain_linear(desired / SYNTH_GAIN_CAP if mode == "stage" else 1.0)
+        renderer = BlockRenderer(lib, fs.synth, period)
+
+        total_blocks = int(seconds * rate / period)
+        hit_every = max(1, int(rate / (hz * len(PADS)) / period))
+        voices = []
+        hit = 0
+        t0 = time.process_time()
+        for block_no in range(total_blocks):
+            if block_no % hit_every == 0:
+                note = PADS[hit % len(PADS)]
+                for ch in range(channels):
+                    fs.noteoff(ch, note)
+                    fs.noteon(ch, note, 110)
+                hit += 1
+            block, _ = renderer.render(period)
+            stage.process(block)
+            voices.append(lib.active_voices(fs.synth))
+        cpu = time.process_time() - t0
+    finally:
+        fs.delete()
+    return {
+        "hits": hit,
+        "peak_voices": max(voices),
+        "mean_voices": sum(voices) / len(voices),
+        "cpu_ms_per_s": cpu * 1000.0 / seconds,
+        "clipped_blocks": stage.clipped_blocks,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sf2", type=Path)
+    parser.add_argument("--hz", type=float, default=15.0, help="golpes por segundo y pad")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--profile", default=None)
+    args = parser.parse_args()
+
+    fluidsynth = bootstrap()
+    lib = fluid_lib(fluidsynth)
+    if lib is None:
+        raise SystemExit("Se necesita NumPy y una libfluidsynth con fluid_synth_process")
+    profile = get_profile(args.profile)
+    period, rate = profile["period_size"], profile["sample_rate"]
+    layers = int(math.ceil(10.0 ** (MASTER_DB / 20.0) / SYNTH_GAIN_CAP))
+    print(f"master +{MASTER_DB:.0f} dB, bloque {period} @ {rate} Hz, {layers} capas en modo viejo")
+    print(f"{'modo':<8}{'golpes':>8}{'voces max':>11}{'voces media':>13}{'CPU ms/s':>10}{'clip':>7}")
+    for mode in ("layers", "stage"):
+        r = run(fluidsynth, lib, args.sf2, mode, args.hz, args.seconds, period, rate)
+        print(
+            f"{mode:<8}{r['hits']:8d}{r['peak_voices']:11d}{r['mean_voices']:13.1f}"
+            f"{r['cpu_ms_per_s']:10.1f}{r['clipped_blocks']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""CPU cost of the look-ahead limiter per audio block.
+
+Feeds the limiter synthetic drum-like material (decaying bursts that overlap
+and push the sum well above the ceiling) in blocks of the given period and
+reports the time per block against the block's real-time budget. Also checks
+that no output sample exceeds the ceiling.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_limiter --rate 48000 --period 64
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.audio.limiter import LookaheadLimiter
+from benchmarks.bench_dispatch import percentile
+
+
+def drum_material(rate: int, seconds: float, hz: float = 15.0) -> np.ndarray:
+    frames = int(rate * seconds)
+    out = np.zeros((2, frames), dtype=np.float32)
+    rng = np.random.default_rng(7)
+    decay = np.exp(-np.arange(int(rate * 0.4)) / (rate * 0.08)).astype(np.float32)
+    for start in range(0, frames, int(rate / hz)):
+        hit = rng.standard_normal(decay.size).astype(np.float32) * decay * rng.uniform(0.6, 2.5)
+        end = min(frames, start + hit.size)
+        out[:, start:end] += hit[: end - start]
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--period", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    limiter = LookaheadLimiter(args.rate)
+    source = drum_material(args.rate, args.seconds)
+    block = np.empty((2, args.period), dtype=np.float32)
+    peak = 0.0
+    costs = []
+    for start in range(0, source.shape[1] - args.period + 1, args.period):
+        block[:] = source[:, start:start + args.period]
+        t0 = time.perf_counter_ns()
+        limiter.process(block)
+        costs.append((time.perf_counter_ns() - t0) / 1000.0)
+        peak = max(peak, float(np.abs(block).max()))
+
+    budget_us = args.period * 1e6 / args.rate
+    p50, p99 = percentile(costs, 50), percentile(costs, 99)
+    print(f"{len(costs)} bloques de {args.period} @ {args.rate} Hz (presupuesto {budget_us:.0f} us)")
+    print(f"look-ahead {limiter.lookahead} muestras, ataque {limiter.attack}, release {limiter.release_ms:.0f} ms")
+    print(f"p50 {p50:.1f} us  p99 {p99:.1f} us  max {max(costs):.1f} us  ({p99 / budget_us * 100:.1f}% del bloque en p99)")
+    print(f"pico de entrada {float(np.abs(source).max()):.2f}, pico de salida {peak:.4f} (techo {limiter.ceiling})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Note-off timing of pad hits: one QTimer.singleShot per hit vs the engine queue.
+
+Plays a roll from the GUI thread the way ``PadsPage._trigger_pad`` does, on
+a ``SoundEngine`` with a stand-in synth that stamps every ``noteoff``.
+"qtimer" sends the note_on and arms a ``QTimer.singleShot`` for the note_off,
+like the pads page used to; "motor" passes ``auto_off_ms`` to ``disparar`` and
+the render thread releases the note (``NoteOffQueue``, ring dispatch);
+"secuenciador" does the same with the sequencer dispatch: a stand-in audio
+thread calls ``_on_block`` every ``--period`` frames and a stand-in
+``fluidsynth.Sequencer`` stamps the note_off at the frame it was given (the
+hit itself plays ``schedule_delay_ms()`` after the trigger).
+
+Each mode runs with the event loop idle and with a busy GUI (a timer that
+blocks the loop ``--busy-ms`` every ``--busy-every`` ms, like a heavy repaint).
+Reports how late the note_off lands after hit + gate (p50/p99/max), note_offs
+that never arrived and the GUI-thread time spent per hit. Hits followed by
+another hit of the same note within the gate (the busy loop bunches them) are
+left out: the engine drops their note_off on purpose and the new hit's own
+note_off takes over.
+
+Run from the repository root (``QT_QPA_PLATFORM=offscreen`` works headless)::
+
+    python -m benchmarks.bench_note_off --seconds 5 --hz 8 --gate 100
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import sys
+import threading
+import time
+
+from mido import Message
+from PyQt5.QtCore import QElapsedTimer, Qt, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from app.audio.timing import SCHEDULE_MARGIN_MS, StreamClock
+from app.audio.voices import VoicePolicy
+from benchmarks.bench_dispatch import percentile
+from benchmarks.bench_scenes import make_engine
+from benchmarks.bench_sf2_memory import PADS
+from benchmarks.bench_timing import _Sequencer, _Stream
+
+RATE = 48000
+
+
+class _OffSynth:
+    """Stand-in synth that stamps the note_offs."""
+
+    def __init__(self) -> None:
+        self.offs = {note: [] for note in range(128)}
+
+    def noteoff(self, ch, note):
+        self.offs[note].append(time.perf_counter_ns())
+
+    def _count(self, *args):
+        pass
+
+    cc = set_reverb = reverb_on = reverb_off = set_gain = program_select = noteon = _count
+
+
+class _OffSequencer(_Sequencer):
+    """Stand-in sequencer that stamps each note_off with the wall time of its frame."""
+
+    def __init__(self, stream: _Stream, offs: dict) -> None:
+        super().__init__(stream)
+        self.offs = offs
+
+    def note_off(self, time, channel, key, dest=None, absolute=True):
+        self.offs[key].append(int(self.stream.host_ns(time)))
+
+
+def run(
+    app: QApplication,
+    mode: str,
+    seconds: float,
+    hz: float,
+    gate_ms: int,
+    busy_ms: float,
+    busy_every: int,
+    period: int = 128,
+):
+    synth = _OffSynth()
+    engine = make_engine(synth=synth)
+    # sin ahogos: los unicos note_off son los del golpe
+    engine.set_voice_policy(VoicePolicy(per_note=0))
+    stream = None
+    delay_ns = 0
+    if mode == "secuenciador":
+        stream = _Stream(engine, RATE, period)
+        engine._seq = _OffSequencer(stream, synth.offs)
+        engine._seq_dest = 0
+        engine.stream_clock = StreamClock(RATE)
+        engine._delay_ns = delay_ns = int((period * 1000.0 / RATE + SCHEDULE_MARGIN_MS) * 1e6)
+        threading.Thread(target=stream.run, daemon=True).start()
+    hits = {note: [] for note in PADS}
+    gui_ns = [0]
+    count = [0]
+
+    def trigger():
+        start = time.perf_counter_ns()
+        note = PADS[count[0] % len(PADS)]
+        count[0] += 1
+        hits[note].append(start)
+        if mode != "qtimer":
+            engine.disparar(Message("note_on", note=note, velocity=110), auto_off_ms=gate_ms, at_ns=start)
+        else:
+            engine.disparar(Message("note_on", note=note, velocity=110))
+            QTimer.singleShot(gate_ms, lambda n=note: engine.disparar(Message("note_off", note=n, velocity=0)))
+        gui_ns[0] += time.perf_counter_ns() - start
+
+    def busy():
+        end = time.perf_counter() + busy_ms / 1000.0
+        while time.perf_counter() < end:
+            pass
+
+    roll = QTimer()
+    roll.setTimerType(Qt.PreciseTimer)
+    roll.setInterval(max(1, int(round(1000.0 / (hz * len(PADS))))))
+    roll.timeout.connect(trigger)
+    load = QTimer()
+    load.setInterval(busy_every)
+    load.timeout.connect(busy)
+    roll.start()
+    if busy_ms > 0:
+        load.start()
+    clock = QElapsedTimer()
+    clock.start()
+    while clock.elapsed() < seconds * 1000:
+        app.processEvents()
+        time.sleep(0.0005)
+    roll.stop()
+    load.stop()
+    # los note_off pendientes
+    clock.restart()
+    while clock.elapsed() < gate_ms + 200:
+        app.processEvents()
+        time.sleep(0.001)
+    if stream is not None:
+        stream.running = False
+
+    late = []
+    missing = superseded = 0
+    gate_ns = gate_ms * 1_000_000
+    for note, starts in hits.items():
+        offs = sorted(synth.offs[note])
+        for i, start in enumerate(starts):
+            due = start + delay_ns + gate_ns
+            following = starts[i + 1] if i + 1 < len(starts) else None
+            if following is not None and following + delay_ns < due:
+                # otro golpe de la nota antes del note_off: el motor lo anula a proposito
+                superseded += 1
+                continue
+            # el note_off de este golpe: el primero desde poco antes de su hora (QTimer
+            # puede adelantarse un 5%) y antes de la hora del golpe siguiente
+            k = bisect.bisect_left(offs, due - gate_ns // 10)
+            if k < len(offs) and (following is None or offs[k] < following + delay_ns + gate_ns):
+                late.append((offs[k] - due) / 1e6)
+            else:
+                missing += 1
+    return {
+        "hits": count[0],
+        "superseded": superseded,
+        "p50": percentile(late, 50),
+        "p99": percentile(late, 99),
+        "max": max(late) if late else 0.0,
+        "missing": missing,
+        "gui_us": gui_ns[0] / 1000.0 / count[0] if count[0] else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--hz", type=float, default=8.0, help="golpes por segundo por pad")
+    parser.add_argument("--gate", type=int, default=100, help="note_off tras el golpe (ms)")
+    parser.add_argument("--busy-ms", type=float, default=30.0, help="bloqueo de la GUI (ms)")
+    parser.add_argument("--busy-every", type=int, default=70, help="cada cuanto se bloquea (ms)")
+    parser.add_argument("--period", type=int, default=128, help="cuadros por bloque (secuenciador)")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(
+        f"redoble de {len(PADS)} pads a {args.hz:g} Hz, note_off a {args.gate} ms; "
+        f"GUI ocupada {args.busy_ms:g} ms cada {args.busy_every} ms"
+    )
+    print(f"{'modo':<14}{'GUI':<9}{'golpes':>7}{'p50 ms':>8}{'p99 ms':>8}{'max ms':>8}{'perdidos':>10}{'anulados':>10}{'GUI us/golpe':>14}")
+    for busy in (0.0, args.busy_ms):
+        for mode in ("qtimer", "motor", "secuenciador"):
+            r = run(app, mode, args.seconds, args.hz, args.gate, busy, args.busy_every, args.period)
+            print(
+                f"{mode:<14}{'ocupada' if busy else 'libre':<9}{r['hits']:7d}{r['p50']:8.2f}{r['p99']:8.2f}"
+                f"{r['max']:8.2f}{r['missing']:10d}{r['superseded']:10d}{r['gui_us']:14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
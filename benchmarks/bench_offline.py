@@ -0,0 +1,70 @@
+"""Offline render throughput: real-time factor and voices per second.
+
+Renders ``--seconds`` of pad rolls on the synthetic timpani SF2 of
+``bench_sf2_memory`` through an offline ``SoundEngine`` (same block path and
+output stage as the live callback), at increasing hit rates, and reports how
+many seconds of audio are rendered per wall second, the peak polyphony and
+the voice-seconds rendered per second. ``--wav`` also writes the densest run,
+to listen to or to diff against a previous render.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_offline --seconds 10 --block 64
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from mido import Message
+
+from app.audio.engine_legacy import SoundEngine
+from benchmarks.bench_sf2_memory import PADS, write_timpani_sf2
+
+RATES = (5, 20, 80, 200)
+
+
+def roll(seconds: float, hits_per_second: float, gate: float = 0.25):
+    events = []
+    n = 0
+    period = 1.0 / hits_per_second
+    while n * period < seconds:
+        t = n * period
+        note = PADS[n % len(PADS)]
+        velocity = 40 + (n * 37) % 88
+        events.append((t, Message("note_on", note=note, velocity=velocity)))
+        events.append((t + gate, Message("note_off", note=note, velocity=0)))
+        n += 1
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--block", type=int, default=64)
+    parser.add_argument("--mb", type=int, default=32, help="tamano del SF2 de prueba")
+    parser.add_argument("--wav", type=Path, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sf2 = Path(tmp) / "timbales.sf2"
+        write_timpani_sf2(sf2, args.mb, 1, 6, 3)
+        engine = SoundEngine(sf2, offline=True)
+        try:
+            engine.wait_ready(30.0)
+        except RuntimeError as exc:
+            print(f"FluidSynth no disponible: {exc}")
+            return
+        print(f"{'golpes/s':>9}{'x tiempo real':>15}{'voces pico':>12}{'voces*s/s':>12}")
+        result = None
+        for rate in RATES:
+            result = engine.render(roll(args.seconds, rate), args.seconds + 1.0, args.block)
+            print(f"{rate:9d}{result.realtime_factor:15.1f}{result.peak_voices:12d}{result.voices_per_second:12.0f}")
+        if args.wav is not None and result is not None:
+            result.write_wav(args.wav)
+            print(f"WAV: {args.wav}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Preset switch cost: full disk read per load vs the indexed repository.
+
+"legacy" reproduces the old ``load_preset``: open + read + ``json.loads`` of the
+file on every switch. "repo" goes through ``PresetRepository.get``, which
+after the first hit is an LRU lookup plus a copy of the body. Uses a temporary
+folder with presets of every kind; the first switch to each preset is included.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_presets --switches 5000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app.state.presets import PresetRepository
+from benchmarks.bench_dispatch import percentile
+
+NOTE_SETS = [["A2", "E3", "A3", "C4", "E4"], ["E2", "B2", "E3", "G#3", "B3"], ["D2", "A2", "D3", "F#3", "A3"]]
+
+
+def populate(repo: PresetRepository, count: int) -> list:
+    keys = []
+    for n in range(count):
+        repo.save("reverb", f"rev{n}", {"active": True, "level": n % 100, "room": 50, "damp": 20})
+        repo.save("dynamics", f"din{n}", {"master_db": 18.0, "velocity_gain": 30.0, "limiter": True})
+        repo.save("note_set", f"notas{n}", {"sets": NOTE_SETS})
+        pads = {str(pad): {"pad": pad, "note": 45 + pad, "soft": 20, "hard": 110, "mode": "gamma"} for pad in range(5)}
+        repo.save("calibration", f"cal{n}", {"pads": pads})
+        keys += [("reverb", f"rev{n}"), ("dynamics", f"din{n}"), ("note_set", f"notas{n}"), ("calibration", f"cal{n}")]
+    return keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=5000)
+    parser.add_argument("--presets", type=int, default=6, help="presets por tipo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        keys = populate(PresetRepository(root), args.presets)
+        rng = random.Random(5)
+        order = [rng.choice(keys) for _ in range(args.switches)]
+
+        t0 = time.perf_counter()
+        repo = PresetRepository(root)
+        index_ms = (time.perf_counter() - t0) * 1000.0
+
+        def legacy(kind, name):
+            return json.loads((root / kind / f"{name}.json").read_text(encoding="utf-8"))
+
+        print(f"indice inicial: {len(repo.list())} presets en {index_ms:.2f} ms")
+        print(f"{'modo':<8}{'p50 us':>10}{'p99 us':>10}{'max us':>10}{'lecturas':>10}")
+        for label, load in (("legacy", legacy), ("repo", repo.get)):
+            samples = []
+            for kind, name in order:
+                t = time.perf_counter()
+                load(kind, name)
+                samples.append((time.perf_counter() - t) * 1e6)
+            reads = repo.disk_reads if label == "repo" else len(order)
+            print(f"{label:<8}{percentile(samples, 50):10.1f}{percentile(samples, 99):10.1f}{max(samples):10.1f}{reads:10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Reverb preset recall: slider callbacks vs one scene batch.
+
+"legacy" replays the FluidSynth writes the old ``EffectsPage.apply_reverb_preset``
+made through the engine of the time (``set_reverb`` three times, each
+pushing all four parameters, ``set_reverb_send`` with CC91 on every channel
+and ``set_reverb_active`` writing the send again plus ``reverb_on``/``off``),
+straight on the stand-in synth and on the calling thread: the engine
+methods now go through the cached, coalesced CC path and would no longer
+measure the old per-call writes. "scene" calls
+``SoundEngine.apply_scene`` with the same target and waits for the render
+thread to finish the batch. Both run against a stand-in synth that counts
+FluidSynth calls and busy-waits ``--call-us`` per call to stand for the
+ctypes + synth mutex cost (0 measures the Python overhead alone); the presets
+cycle seco -> media -> sala.
+
+Reports the cost on the calling (GUI) thread, the recall latency until the
+last FluidSynth call was made, and the calls per recall.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_scenes --recalls 3000 --call-us 2
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.audio.engine_legacy import SoundEngine
+from app.ui.pages.effects_presets import get_reverb_preset
+from benchmarks.bench_dispatch import percentile
+
+PRESETS = ("seco", "media", "sala")
+
+
+class _Synth:
+    """Stand-in for fluidsynth.Synth: counts calls and spends ``call_us`` on each."""
+
+    def __init__(self, call_us: float) -> None:
+        self.calls = 0
+        self.settings = {}
+        self.call_ns = int(call_us * 1000)
+
+    def _count(self, *args) -> None:
+        self.calls += 1
+        end = time.perf_counter_ns() + self.call_ns
+        while time.perf_counter_ns() < end:
+            pass
+
+    cc = set_reverb = reverb_on = reverb_off = set_gain = program_select = noteon = noteoff = _count
+
+
+def make_engine(call_us: float = 0.0, synth=None) -> SoundEngine:
+    with tempfile.NamedTemporaryFile(suffix=".sf2", delete=False) as fh:
+        sf2 = Path(fh.name)
+    engine = SoundEngine(sf2)
+    try:
+        engine.wait_ready(5.0)
+    except RuntimeError:
+        pass  # sin FluidSynth en esta maquina: se sigue con el sintetizador de prueba
+    sf2.unlink()
+    engine.fs = synth if synth is not None else _Synth(call_us)
+    engine.sfid = 1
+    engine.error = None
+    engine.ok.set()
+    return engine
+
+
+def legacy_recall(fs, reverb: dict, preset: str) -> None:
+    params = get_reverb_preset(preset)
+    # cada set_reverb reenviaba los cuatro parametros guardados
+    if params["room"] is not None:
+        reverb["room"] = params["room"] / 100.0
+        fs.set_reverb(reverb["room"], reverb["damp"], reverb["width"], reverb["level"])
+    if params["damp"] is not None:
+        reverb["damp"] = params["damp"] / 100.0
+        fs.set_reverb(reverb["room"], reverb["damp"], reverb["width"], reverb["level"])
+    level = params["level"]
+    reverb["level"] = level / 100.0
+    fs.set_reverb(reverb["room"], reverb["damp"], reverb["width"], reverb["level"])
+    send = int(round(min(1.0, level / 60.0) * 127))
+    for ch in range(16):
+        fs.cc(ch, 91, send)
+    # set_reverb_active volvia a escribir el send y prendia/apagaba la reverb
+    for ch in range(16):
+        fs.cc(ch, 91, send if level > 0 else 0)
+    fs.reverb_on() if level > 0 else fs.reverb_off()
+
+
+def scene_for(engine: SoundEngine, preset: str):
+    params = get_reverb_preset(preset)
+    changes = {}
+    if params["room"] is not None:
+        changes["reverb_room"] = params["room"] / 100.0
+    if params["damp"] is not None:
+        changes["reverb_damp"] = params["damp"] / 100.0
+    level = params["level"]
+    changes.update(reverb_level=level / 100.0, reverb_send=min(1.0, level / 60.0), reverb_active=level > 0)
+    return engine.scene()._replace(**changes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recalls", type=int, default=3000)
+    parser.add_argument("--call-us", type=float, default=2.0, help="costo simulado por llamada a FluidSynth")
+    args = parser.parse_args()
+
+    engine = make_engine(args.call_us)
+    synth = engine.fs
+    print(f"{'modo':<8}{'GUI p50 us':>12}{'GUI p99 us':>12}{'recall p50 us':>15}{'recall p99 us':>15}{'llamadas':>10}")
+
+    caller = []
+    reverb = {"room": 0.70, "damp": 0.20, "width": 0.90, "level": 0.60}
+    synth.calls = 0
+    for n in range(args.recalls):
+        t0 = time.perf_counter()
+        legacy_recall(synth, reverb, PRESETS[n % len(PRESETS)])
+        caller.append((time.perf_counter() - t0) * 1e6)
+    calls = synth.calls / args.recalls
+    print(f"{'legacy':<8}{percentile(caller, 50):12.1f}{percentile(caller, 99):12.1f}"
+          f"{percentile(caller, 50):15.1f}{percentile(caller, 99):15.1f}{calls:10.1f}")
+
+    caller, recall = [], []
+    synth.calls = 0
+    for n in range(args.recalls):
+        target = scene_for(engine, PRESETS[n % len(PRESETS)])
+        engine.last_recall = None
+        t0 = time.perf_counter()
+        engine.apply_scene(target)
+        caller.append((time.perf_counter() - t0) * 1e6)
+        while engine.last_recall is None:
+            time.sleep(0)
+        recall.append(engine.last_recall["latency_us"])
+    calls = synth.calls / args.recalls
+    print(f"{'scene':<8}{percentile(caller, 50):12.1f}{percentile(caller, 99):12.1f}"
+          f"{percentile(recall, 50):15.1f}{percentile(recall, 99):15.1f}{calls:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""SoundFont library: metadata lookups and switching between recent fonts.
+
+Builds ``--fonts`` synthetic SF2 files (valid RIFF/sfbk layout with a ``--mb``
+sample chunk and ``--presets`` preset headers) and measures:
+
+* metadata: ``read_sf2_info`` parsing every file (what a picker would do to
+  list presets) vs ``SoundFontLibrary.info`` answering from the index;
+* switching: alternating between two fonts with a full reload each time (the
+  old ``load_sf2_async`` + unload) vs ``SoundFontLibrary.select`` once both
+  are resident, which is only a ``program_select`` between blocks.
+
+The synth is the stand-in from ``bench_sf2_swap`` (one API mutex, ``sfload``
+reads the whole file), so the reload numbers are a lower bound of FluidSynth's.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_sf2_library --fonts 8 --mb 64 --switches 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+from app.audio.sf2_library import SoundFontLibrary, read_sf2_info
+from benchmarks.bench_dispatch import percentile
+from benchmarks.bench_scenes import make_engine
+from benchmarks.bench_sf2_swap import _Synth, evict
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack("<4sI", tag, len(data)) + data + (b"\0" if len(data) & 1 else b"")
+
+
+def write_sf2(path: Path, title: str, mb: int, presets: int) -> None:
+    info = _chunk(b"INAM", title.encode("latin-1") + b"\0")
+    phdr = b"".join(
+        struct.pack("<20sHHHIII", f"Timbal {n}".encode(), n % 128, n // 128, 0, 0, 0, 0)
+        for n in range(presets)
+    ) + struct.pack("<20sHHHIII", b"EOP", 0, 0, 0, 0, 0, 0)
+    pdta = _chunk(b"LIST", b"pdta" + _chunk(b"phdr", phdr))
+    block = os.urandom(1 << 20)
+    smpl_len = mb << 20
+    with open(path, "wb") as fh:
+        body_len = 4 + 12 + len(info) + 12 + 8 + smpl_len + len(pdta)
+        fh.write(struct.pack("<4sI4s", b"RIFF", body_len, b"sfbk"))
+        fh.write(_chunk(b"LIST", b"INFO" + info))
+        fh.write(struct.pack("<4sI4s", b"LIST", 4 + 8 + smpl_len, b"sdta"))
+        fh.write(struct.pack("<4sI", b"smpl", smpl_len))
+        for _ in range(mb):
+            fh.write(block)
+        fh.write(pdta)
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1e6
+
+
+def bench_info(paths, library) -> tuple:
+    cold = []
+    for path in paths:
+        evict(path)
+        cold.append(timed(lambda: read_sf2_info(path)))
+    for path in paths:
+        library.info(path)
+    indexed = [timed(lambda: library.info(path)) for path in paths for _ in range(50)]
+    return cold, indexed
+
+
+def bench_switch(a: Path, b: Path, switches: int, resident: bool, budget_mb: float) -> list:
+    engine = make_engine(synth=_Synth())
+    library = SoundFontLibrary(engine, None, budget_mb)
+    times = []
+    for n in range(switches + 2):
+        path = (a, b)[n % 2]
+        t0 = time.perf_counter()
+        if resident:
+            load = library.select(path)
+        else:
+            load = engine.load_sf2_async(path)
+        load.result(60.0)
+        if n >= 2:
+            times.append((time.perf_counter() - t0) * 1000.0)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fonts", type=int, default=8)
+    parser.add_argument("--mb", type=int, default=64, help="muestras por SF2")
+    parser.add_argument("--presets", type=int, default=128)
+    parser.add_argument("--switches", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for n in range(args.fonts):
+            path = Path(tmp) / f"timbal_{n}.sf2"
+            write_sf2(path, f"Timbal {n}", args.mb, args.presets)
+            paths.append(path)
+        library = SoundFontLibrary(make_engine(synth=_Synth()), Path(tmp) / "index.json")
+        cold, indexed = bench_info(paths, library)
+        info = library.info(paths[0])
+        print(f"{info.name}: {len(info.presets)} presets, {info.sample_bytes / 1e6:.0f} MB de muestras")
+        print(f"{'metadatos':<12}{'p50 us':>10}{'p99 us':>10}")
+        print(f"{'parseo':<12}{percentile(cold, 50):10.1f}{percentile(cold, 99):10.1f}")
+        print(f"{'indice':<12}{percentile(indexed, 50):10.1f}{percentile(indexed, 99):10.1f}")
+
+        budget = 3 * args.mb
+        print(f"{'cambio':<12}{'p50 ms':>10}{'p99 ms':>10}")
+        for label, resident in (("recarga", False), ("residente", True)):
+            times = bench_switch(paths[0], paths[1], args.switches, resident, budget)
+            print(f"{label:<12}{percentile(times, 50):10.2f}{percentile(times, 99):10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Resident memory and first-hit latency per sample loading strategy.
+
+Writes a synthetic multi-layer timpani SF2 (``--presets`` kits, one zone per
+``--range`` semitones from C2 to B4 and ``--layers`` velocity layers per zone,
+each with its own sample, about ``--mb`` MB in total) and, for each of
+``LOADING_MODES``, starts a fresh Python process that:
+
+* creates a FluidSynth synth (``synth.dynamic-sample-loading`` on for
+  "dynamic"), loads the font (for "notes", the subset of ``build_subset`` for
+  the five pads of the first note set) and selects preset 0 on the pad channels;
+* reports the resident memory added by the load + select, the load and select
+  times, and the first hit of every pad: the ``noteon`` call plus rendering
+  the first 64-frame block, vs the same hit once warm.
+
+The "notes" subset is also built and timed here (cold page cache) even when
+FluidSynth is not installed; the memory and latency columns need the library.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_sf2_memory --mb 256 --presets 4 --layers 6
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.audio.sf2_loader import LOADING_MODES, rss_bytes
+from app.audio.sf2_subset import build_subset
+
+PADS = (45, 52, 57, 60, 64)
+LOW, HIGH = 36, 71
+RATE = 44100
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack("<4sI", tag, len(data)) + data + (b"\0" if len(data) & 1 else b"")
+
+
+def _name(text: str) -> bytes:
+    return text.encode("latin-1")[:19].ljust(20, b"\0")
+
+
+def write_timpani_sf2(path: Path, mb: int, presets: int, layers: int, width: int) -> int:
+    """Write the test font; return the number of samples."""
+    ranges = [(lo, min(HIGH, lo + width - 1)) for lo in range(LOW, HIGH + 1, width)]
+    count = presets * len(ranges) * layers
+    frames = max(64, (mb << 20) // (2 * count) - 46)
+    phdr, pbag, pgen, inst, ibag, igen, shdr = [], [], [], [], [], [], []
+    sample = 0
+    with open(path, "wb") as fh:
+        # cabecera con el largo del RIFF corregido al final
+        fh.write(b"RIFF\0\0\0\0sfbk")
+        fh.write(_chunk(b"LIST", b"INFO" + _chunk(b"ifil", struct.pack("<HH", 2, 1))
+                        + _chunk(b"isng", b"EMU8000\0") + _chunk(b"INAM", b"Timbales de prueba\0")))
+        smpl_len = count * (frames + 46) * 2
+        fh.write(struct.pack("<4sI4s4sI", b"LIST", 12 + smpl_len, b"sdta", b"smpl", smpl_len))
+        for kit in range(presets):
+            phdr.append(struct.pack("<20sHHHIII", _name(f"Timbales {kit + 1}"), kit, 0, len(pbag), 0, 0, 0))
+            pbag.append(struct.pack("<HH", len(pgen), 0))
+            pgen.append(struct.pack("<HH", 41, kit))
+            inst.append(struct.pack("<20sH", _name(f"Timbal {kit + 1}"), len(ibag)))
+            for lo, hi in ranges:
+                root = (lo + hi) // 2
+                for layer in range(layers):
+                    vlo = layer * 128 // layers
+                    vhi = (layer + 1) * 128 // layers - 1
+                    ibag.append(struct.pack("<HH", len(igen), 0))
+                    igen.append(struct.pack("<HBB", 43, lo, hi))
+                    igen.append(struct.pack("<HBB", 44, vlo, vhi))
+                    igen.append(struct.pack("<HH", 53, sample))
+                    # golpe amortiguado: seno de la nota con decaimiento exponencial
+                    freq = 440.0 * 2 ** ((root - 69) / 12.0)
+                    amp = 4000 + 24000 * (layer + 1) / layers
+                    wave = [
+                        int(amp * math.exp(-4.0 * n / frames) * math.sin(2 * math.pi * freq * n / RATE))
+                        for n in range(min(frames, 4096))
+                    ]
+                    data = struct.pack(f"<{len(wave)}h", *wave) + bytes(2 * (frames - len(wave)) + 92)
+                    start = sample * (frames + 46)
+                    fh.write(data)
+                    shdr.append(struct.pack(
+                        "<20sIIIIIBbHH", _name(f"k{kit}n{root}v{layer}"),
+                        start, start + frames, start + 8, start + frames - 8, RATE, root, 0, 0, 1,
+                    ))
+                    sample += 1
+        phdr.append(struct.pack("<20sHHHIII", _name("EOP"), 0, 0, len(pbag), 0, 0, 0))
+        pbag.append(struct.pack("<HH", len(pgen), 0))
+        pgen.append(bytes(4))
+        inst.append(struct.pack("<20sH", _name("EOI"), len(ibag)))
+        ibag.append(struct.pack("<HH", len(igen), 0))
+        igen.append(bytes(4))
+        shdr.append(struct.pack("<20sIIIIIBbHH", _name("EOS"), 0, 0, 0, 0, 0, 0, 0, 0, 0))
+        pdta = {
+            b"phdr": phdr, b"pbag": pbag, b"pmod": [bytes(10)], b"pgen": pgen,
+            b"inst": inst, b"ibag": ibag, b"imod": [bytes(10)], b"igen": igen, b"shdr": shdr,
+        }
+        order = (b"phdr", b"pbag", b"pmod", b"pgen", b"inst", b"ibag", b"imod", b"igen", b"shdr")
+        fh.write(_chunk(b"LIST", b"pdta" + b"".join(_chunk(k, b"".join(pdta[k])) for k in order)))
+        size = fh.tell()
+        fh.seek(4)
+        fh.write(struct.pack("<I", size - 8))
+    return count
+
+
+def evict(path: Path) -> None:
+    if hasattr(os, "posix_fadvise"):
+        with open(path, "rb") as fh:
+            os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _fluidsynth():
+    try:
+        from app.audio.bootstrap_fluidsynth import bootstrap
+
+        return bootstrap()
+    except Exception:
+        pass
+    try:
+        import fluidsynth
+
+        return fluidsynth
+    except Exception:
+        return None
+
+
+def child(mode: str, font: str) -> dict:
+    fluidsynth = _fluidsynth()
+    if fluidsynth is None:
+        return {"error": "FluidSynth no disponible"}
+    options = {"synth.dynamic-sample-loading": 1} if mode == "dynamic" else {}
+    fs = fluidsynth.Synth(samplerate=float(RATE), **options)
+    before = rss_bytes()
+    t0 = time.perf_counter()
+    sid = fs.sfload(font)
+    t1 = time.perf_counter()
+    for ch in range(6):
+        fs.program_select(ch, sid, 0, 0)
+    t2 = time.perf_counter()
+    after = rss_bytes()
+
+    def hit(note: int) -> float:
+        start = time.perf_counter()
+        fs.noteon(0, note, 100)
+        fs.get_samples(64)
+        elapsed = (time.perf_counter() - start) * 1e6
+        fs.noteoff(0, note)
+        fs.get_samples(4096)
+        return elapsed
+
+    first = [hit(note) for note in PADS]
+    warm = [hit(note) for note in PADS]
+    fs.delete()
+    return {
+        "rss_mb": (after - before) / 1e6 if before is not None and after is not None else float("nan"),
+        "load_ms": (t1 - t0) * 1000.0,
+        "select_ms": (t2 - t1) * 1000.0,
+        "first_us": max(first),
+        "warm_us": max(warm),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=int, default=256)
+    parser.add_argument("--presets", type=int, default=4)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--range", type=int, default=3, help="semitonos por zona")
+    parser.add_argument("--child", nargs=2, metavar=("MODO", "SF2"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sf2 = Path(tmp) / "timbales.sf2"
+        samples = write_timpani_sf2(sf2, args.mb, args.presets, args.layers, args.range)
+        evict(sf2)
+        t0 = time.perf_counter()
+        subset = build_subset(sf2, 0, 0, PADS, cache_dir=Path(tmp) / "cache")
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        print(f"{sf2.name}: {sf2.stat().st_size / 1e6:.0f} MB, {samples} muestras")
+        print(
+            f"subconjunto {list(PADS)}: {subset.zones} zonas de preset, {subset.samples} muestras, "
+            f"{subset.size / 1e6:.1f} MB, armado en {build_ms:.0f} ms (cache frio)"
+        )
+        print(f"{'modo':<10}{'RSS MB':>9}{'carga ms':>10}{'select ms':>11}{'1er golpe us':>14}{'caliente us':>13}")
+        for mode in LOADING_MODES:
+            font = subset.path if mode == "notes" else sf2
+            evict(font)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_sf2_memory", "--child", mode, str(font)],
+                capture_output=True, text=True,
+            )
+            try:
+                r = json.loads(out.stdout.strip().splitlines()[-1])
+            except (ValueError, IndexError):
+                r = {"error": (out.stderr.strip().splitlines() or ["sin salida"])[-1]}
+            if "error" in r:
+                print(f"{mode:<10}{r['error']}")
+                continue
+            print(
+                f"{mode:<10}{r['rss_mb']:9.1f}{r['load_ms']:10.1f}{r['select_ms']:11.1f}"
+                f"{r['first_us']:14.0f}{r['warm_us']:13.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Pad hits during a SoundFont change: blocking load vs background load + swap.
+
+Five pads are hit continuously at ``--hz`` each through ``SoundEngine.disparar``
+(ring dispatch, render thread) while the SoundFont is replaced one second in.
+The stand-in synth serialises every call on one mutex, like FluidSynth's API
+lock, and its ``sfload`` really reads the file under that mutex; the file is
+evicted from the page cache before each run (``posix_fadvise``) so the read
+hits the disk as a freshly chosen SF2 would.
+
+"blocking" is the old ``load_sf2_live`` on the caller (GUI) thread: sfload,
+program_select, sfunload. "async" is ``load_sf2_async``: pre-read outside the
+mutex, sfload from the page cache, swap on the render thread, unload after.
+Reports how long the GUI thread was blocked, late notes (> ``--late-ms``
+behind schedule), the worst lateness and notes that never sounded.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_sf2_swap --mb 128 --seconds 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from mido import Message
+
+from benchmarks.bench_scenes import make_engine
+
+PADS = (45, 52, 57, 60, 64)
+
+
+class _Synth:
+    """Stand-in synth: one API mutex, real file reads in sfload."""
+
+    def __init__(self) -> None:
+        self.api = threading.Lock()
+        self.settings = {}
+        self.noteons = []
+        self.fonts = {}
+        self.last_id = 0
+
+    def noteon(self, ch, note, vel) -> None:
+        with self.api:
+            self.noteons.append(time.perf_counter())
+
+    def sfload(self, path, update_midi_preset=0) -> int:
+        with self.api:
+            data = Path(path).read_bytes()
+            self.last_id += 1
+            self.fonts[self.last_id] = data
+            return self.last_id
+
+    def sfunload(self, sid, update_midi_preset=0) -> None:
+        with self.api:
+            self.fonts.pop(sid, None)
+
+    def _call(self, *args) -> None:
+        with self.api:
+            pass
+
+    noteoff = cc = program_select = set_reverb = reverb_on = reverb_off = set_gain = _call
+
+
+def evict(path: Path) -> None:
+    with open(path, "rb") as fh:
+        os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def run(sf2: Path, mode: str, args) -> dict:
+    synth = _Synth()
+    engine = make_engine(synth=synth)
+    engine.sfid = synth.sfload(__file__)
+    evict(sf2)
+    period = 1.0 / args.hz
+    schedule = []
+
+    def hitter() -> None:
+        start = time.perf_counter()
+        n = 0
+        while True:
+            for pad, note in enumerate(PADS):
+                due = start + n * period + pad * period / len(PADS)
+                if due - start > args.seconds:
+                    return
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                schedule.append(due)
+                engine.disparar(Message("note_on", note=note, velocity=100))
+                engine.disparar(Message("note_off", note=note, velocity=0))
+            n += 1
+
+    worker = threading.Thread(target=hitter)
+    worker.start()
+    time.sleep(1.0)
+    t0 = time.perf_counter()
+    if mode == "blocking":
+        sid = synth.sfload(str(sf2))
+        for ch in range(6):
+            synth.program_select(ch, sid, 0, 0)
+        synth.sfunload(engine.sfid, True)
+        engine.sfid = sid
+        gui_ms = (time.perf_counter() - t0) * 1000.0
+    else:
+        load = engine.load_sf2_async(sf2)
+        gui_ms = (time.perf_counter() - t0) * 1000.0
+        load.result(60.0)
+    swap_ms = (time.perf_counter() - t0) * 1000.0
+    worker.join()
+    time.sleep(0.2)
+    played = synth.noteons
+    lateness = [(t - due) * 1000.0 for t, due in zip(played, schedule)]
+    return {
+        "gui_ms": gui_ms,
+        "swap_ms": swap_ms,
+        "late": sum(1 for x in lateness if x > args.late_ms),
+        "worst": max(lateness) if lateness else 0.0,
+        "lost": len(schedule) - len(played) + engine.ring.dropped,
+        "hits": len(schedule),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=int, default=128, help="tamano del SF2 de prueba")
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--hz", type=float, default=15.0, help="golpes por segundo por pad")
+    parser.add_argument("--late-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sf2 = Path(tmp) / "grande.sf2"
+        with open(sf2, "wb") as fh:
+            block = os.urandom(1 << 20)
+            for _ in range(args.mb):
+                fh.write(block)
+            fh.flush()
+            os.fsync(fh.fileno())
+        print(f"{'modo':<10}{'GUI ms':>9}{'cambio ms':>11}{'tarde':>8}{'peor ms':>10}{'perdidas':>10}{'golpes':>8}")
+        for mode in ("blocking", "async"):
+            r = run(sf2, mode, args)
+            print(f"{mode:<10}{r['gui_ms']:9.1f}{r['swap_ms']:11.1f}{r['late']:8d}{r['worst']:10.1f}{r['lost']:10d}{r['hits']:8d}")
+
+
+if __name__ == "__main__":
+    main()
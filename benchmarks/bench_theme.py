@@ -0,0 +1,96 @@
+"""Window construction and restyle cost: per-widget stylesheets vs one compiled theme.
+
+"legacy" reproduces the previous layout: the application only carried the base
+rules and every page/dialog called ``setStyleSheet`` with its own block, and a
+pad state change restyled the button with ``setStyleSheet``. "theme" installs
+``build_qss()`` once on the application and flips states with ``set_state``
+(dynamic property + polish).
+
+Run from the repository root (``QT_QPA_PLATFORM=offscreen`` works headless)::
+
+    python -m benchmarks.bench_theme --rounds 20
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from PyQt5.QtWidgets import QApplication
+
+from app.theme.qss import build_qss, component_qss, set_state
+from app.ui.pages.pads import PadsPage
+from benchmarks.bench_dispatch import percentile
+
+
+class _Engine:
+    """Just enough of SoundEngine for the pages to build."""
+
+    reverb_level = 0.6
+    reverb_roomsize = 0.7
+    reverb_damping = 0.2
+    reverb_send = 1.0
+    master_db = 20.0
+    max_master_db = 30.0
+    limiter_enabled = False
+    velocity_gain = 30.0
+    fs = None
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def build_page(app: QApplication, legacy: bool) -> float:
+    t0 = time.perf_counter()
+    page = PadsPage(_Engine(), {})
+    if legacy:
+        page.setStyleSheet(component_qss("pads"))
+        page.effects_widget.setStyleSheet(component_qss("effects"))
+    page.resize(1400, 820)
+    page.show()
+    app.processEvents()
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    page.close()
+    page.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def restyle(app: QApplication, legacy: bool, rounds: int) -> float:
+    page = PadsPage(_Engine(), {})
+    page.show()
+    app.processEvents()
+    hit_rule = "border:2px solid #22c55e;"
+    t0 = time.perf_counter()
+    for n in range(rounds):
+        on = n % 2 == 0
+        for btn in page.pad_buttons:
+            if legacy:
+                btn.setStyleSheet(hit_rule if on else "")
+            else:
+                set_state(btn, "hit", on)
+        app.processEvents()
+    elapsed = (time.perf_counter() - t0) * 1e6 / (rounds * len(page.pad_buttons))
+    page.close()
+    page.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'modo':<8}{'construir p50':>15}{'p99':>9}{'restyle us/boton':>19}")
+    for name, legacy in (("legacy", True), ("theme", False)):
+        app.setStyleSheet(component_qss("base") if legacy else build_qss())
+        build_page(app, legacy)  # calentamiento
+        builds = [build_page(app, legacy) for _ in range(args.rounds)]
+        per_button = restyle(app, legacy, args.rounds * 10)
+        print(f"{name:<8}{percentile(builds, 50):13.1f}ms{percentile(builds, 99):7.1f}ms{per_button:17.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Timing jitter of MIDI hits: immediate ring dispatch vs sequencer scheduling.
+
+A producer thread plays a 5-pad roll at ``--hz`` per pad with exact capture
+stamps, calling ``SoundEngine.disparar(msg, at_ns=stamp)`` like the MIDI
+callback does. A stand-in audio thread calls ``SoundEngine._on_block`` every
+``--period`` frames at ``--rate`` (as the FluidSynth driver callback would)
+and keeps the stream position. Where each note_on lands in the stream is
+taken from the stand-ins:
+
+* "anillo": the render thread calls ``noteon`` on a stand-in synth; like
+  FluidSynth, the note starts with the next block rendered after the call;
+* "secuenciador": ``_schedule_event`` hands a tick to a stand-in
+  ``fluidsynth.Sequencer``, which plays the note at that frame.
+
+Reports the capture -> stream latency (mean) and its jitter (standard
+deviation, p1..p99 spread and max - min) in ms, plus the events that came in
+too late for the fixed delay. ``--load`` adds a thread that grabs the GIL in
+bursts, like the GUI redrawing.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_timing --seconds 5 --period 128 --load
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+
+from mido import Message
+
+from app.audio.timing import SCHEDULE_MARGIN_MS, StreamClock
+from benchmarks.bench_dispatch import percentile
+from benchmarks.bench_scenes import make_engine
+from benchmarks.bench_sf2_memory import PADS
+
+
+class _Stream:
+    """Stand-in audio callback: a block every ``period`` frames of wall time."""
+
+    def __init__(self, engine, rate: int, period: int) -> None:
+        self.engine = engine
+        self.rate = rate
+        self.period = period
+        self.frame = 0
+        self.start_ns = 0
+        self.running = True
+
+    def run(self) -> None:
+        self.start_ns = time.perf_counter_ns()
+        block_ns = self.period * 1e9 / self.rate
+        n = 0
+        while self.running:
+            due = self.start_ns + n * block_ns
+            delay = (due - time.perf_counter_ns()) / 1e9
+            if delay > 0:
+                time.sleep(delay)
+            self.engine._on_block()
+            n += 1
+            self.frame = n * self.period
+
+    def host_ns(self, frame: float) -> float:
+        """Wall time at which ``frame`` of the stream is due."""
+        return self.start_ns + frame * 1e9 / self.rate
+
+
+class _Synth:
+    """Stand-in synth: a noteon starts with the next rendered block."""
+
+    def __init__(self) -> None:
+        self.stream = None
+        self.frames = []
+
+    def noteon(self, ch, note, vel):
+        self.frames.append(self.stream.frame + self.stream.period)
+
+    def _count(self, *args):
+        pass
+
+    cc = set_reverb = reverb_on = reverb_off = set_gain = program_select = noteoff = _count
+
+
+class _Sequencer:
+    """Stand-in ``fluidsynth.Sequencer`` with one tick per frame."""
+
+    def __init__(self, stream: _Stream) -> None:
+        self.stream = stream
+        self.frames = []
+
+    def get_tick(self):
+        return self.stream.frame
+
+    def note_on(self, time, channel, key, velocity, dest=None, absolute=True):
+        self.frames.append(time)
+
+    def note_off(self, time, channel, key, dest=None, absolute=True):
+        pass
+
+
+def _load(stop: threading.Event) -> None:
+    # rafagas de trabajo en Python (GIL tomado) como un repintado de la GUI
+    while not stop.is_set():
+        end = time.perf_counter() + 0.008
+        while time.perf_counter() < end:
+            pass
+        time.sleep(0.012)
+
+
+def run(mode: str, seconds: float, hz: float, rate: int, period: int, load: bool) -> dict:
+    synth = _Synth()
+    engine = make_engine(synth=synth)
+    stream = _Stream(engine, rate, period)
+    synth.stream = stream
+    landed = synth.frames
+    if mode == "secuenciador":
+        seq = _Sequencer(stream)
+        engine._seq = seq
+        engine._seq_dest = 0
+        engine.stream_clock = StreamClock(rate)
+        engine._delay_ns = int((period * 1000.0 / rate + SCHEDULE_MARGIN_MS) * 1e6)
+        landed = seq.frames
+    audio = threading.Thread(target=stream.run, daemon=True)
+    audio.start()
+    stop = threading.Event()
+    if load:
+        threading.Thread(target=_load, args=(stop,), daemon=True).start()
+    time.sleep(0.1)
+
+    captured = []
+    t0 = time.perf_counter_ns() + 10_000_000
+    step = 1e9 / (hz * len(PADS))
+    for n in range(int(seconds * hz * len(PADS))):
+        due = t0 + int(n * step)
+        delay = (due - time.perf_counter_ns()) / 1e9
+        if delay > 0:
+            time.sleep(delay)
+        stamp = time.perf_counter_ns()
+        captured.append(stamp)
+        engine.disparar(Message("note_on", note=PADS[n % len(PADS)], velocity=100), at_ns=stamp)
+    time.sleep(0.1)
+    stop.set()
+    stream.running = False
+    audio.join()
+
+    lat = [(stream.host_ns(frame) - stamp) / 1e6 for stamp, frame in zip(captured, landed)]
+    return {
+        "hits": len(captured),
+        "landed": len(landed),
+        "mean": statistics.fmean(lat) if lat else 0.0,
+        "std": statistics.pstdev(lat) if lat else 0.0,
+        "spread": percentile(lat, 99) - percentile(lat, 1),
+        "range": max(lat) - min(lat) if lat else 0.0,
+        "late": engine.late_events,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--hz", type=float, default=15.0, help="golpes por segundo por pad")
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--period", type=int, default=128, help="cuadros por bloque de audio")
+    parser.add_argument("--load", action="store_true", help="otro hilo compitiendo por el GIL")
+    args = parser.parse_args()
+
+    print(
+        f"redoble de {len(PADS)} pads a {args.hz:g} Hz; bloques de {args.period} cuadros a {args.rate} Hz "
+        f"({args.period * 1000.0 / args.rate:.2f} ms){', con carga' if args.load else ''}"
+    )
+    print(f"{'modo':<14}{'golpes':>7}{'latencia ms':>13}{'desvio ms':>11}{'p1-p99 ms':>11}{'max-min ms':>12}{'tarde':>7}")
+    for mode in ("anillo", "secuenciador"):
+        r = run(mode, args.seconds, args.hz, args.rate, args.period, args.load)
+        if r["landed"] != r["hits"]:
+            print(f"{mode:<14}solo {r['landed']} de {r['hits']} golpes llegaron al stream")
+            continue
+        print(
+            f"{mode:<14}{r['hits']:7d}{r['mean']:13.2f}{r['std']:11.3f}{r['spread']:11.3f}"
+            f"{r['range']:12.3f}{r['late']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Per-hit cost of velocity shaping: inline formula vs precomputed tables.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_velocity
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from app.audio.velocity import build_velocity_table, compose
+
+GAMMA = 1.2
+VELOCITY_GAIN = 3.0
+MASTER_LINEAR = 10.0
+CEILING = 0.94
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=200_000)
+    args = parser.parse_args()
+
+    base = build_velocity_table(GAMMA, VELOCITY_GAIN, MASTER_LINEAR, CEILING)
+    tables = [base] * 128
+    tables[57] = compose([min(127, v + 10) for v in range(128)], base)
+    hits = [(45 + (i % 5) * 3, 1 + (i * 37) % 127) for i in range(1024)]
+
+    def formula():
+        # Copia del calculo que hacia disparar() en cada golpe
+        for note, vel in hits:
+            x = max(0.0, min(1.0, vel / 127.0))
+            shaped = pow(x, GAMMA) * 127.0
+            master_scale = MASTER_LINEAR if MASTER_LINEAR < 1.0 else 1.0
+            v = int(max(1, min(127, shaped * VELOCITY_GAIN * master_scale)))
+            ceiling = int(max(1, min(127, round(CEILING * 127))))
+            if v > ceiling:
+                v = ceiling
+
+    def table():
+        for note, vel in hits:
+            tables[note][vel]
+
+    rounds = max(1, args.hits // len(hits))
+    total = rounds * len(hits)
+    for name, fn in (("formula", formula), ("table", table)):
+        seconds = min(timeit.repeat(fn, number=rounds, repeat=5))
+        print(f"{name:>8}: {seconds / total * 1e9:8.1f} ns/hit")
+    rebuild = min(timeit.repeat(
+        lambda: build_velocity_table(GAMMA, VELOCITY_GAIN, MASTER_LINEAR, CEILING), number=100, repeat=5))
+    print(f" rebuild: {rebuild / 100 * 1e6:8.1f} us/tabla")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Voices and render cost of a long timbal roll, with and without the voice policy.
+
+Renders (``offline.render``) a 5-pad roll at ``--hz`` hits per second per pad
+for ``--seconds`` through the engine, each hit released ``--gate`` seconds
+later the way the pads page does. The synth is a stand-in that models what
+matters here: every voice rings for its release (``--release`` seconds, scaled
+by the channel's ``fluid_synth_set_gen`` release offset), a new hit of a note
+releases the previous one on the same channel, voices over the polyphony are
+stolen and ``get_samples`` costs one sine per active voice, so the render
+cost follows the voice count like FluidSynth's.
+
+For every second of audio it reports the mean and peak voices and the CPU
+spent rendering it, for ``VoicePolicy(per_note=0, polyphony=256)`` (no cap:
+FluidSynth's default behaviour) and for the policy given on the command line.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_voices --seconds 20 --hz 15 --per-note 3
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from mido import Message
+
+from app.audio.voices import GEN_VOLENVRELEASE, VoicePolicy
+from benchmarks.bench_scenes import make_engine
+from benchmarks.bench_sf2_memory import PADS
+
+RATE = 48000
+WINDOW_S = 0.1
+
+
+class _VoiceSynth:
+    """Stand-in synth with voices that ring through their release."""
+
+    def __init__(self, release_s: float, polyphony: int) -> None:
+        self.synth = self
+        self.release_s = release_s
+        self.polyphony = polyphony
+        self.release_tc = [0.0] * 16
+        # voz: [canal, nota, fase, cuadros desde el release o -1]
+        self.voices = []
+        self.steals = 0
+        self.frames = 0
+        self.cpu_s = 0.0
+        self._t = np.arange(4096, dtype=np.float32)
+
+    def get_setting(self, name):
+        return RATE if name == "synth.sample-rate" else None
+
+    def noteon(self, ch, note, vel):
+        self.noteoff(ch, note)
+        if len(self.voices) >= self.polyphony:
+            # como FluidSynth: se roba primero una voz en release, la mas vieja
+            released = [v for v in self.voices if v[3] >= 0]
+            victim = max(released, key=lambda v: v[3]) if released else self.voices[0]
+            self.voices.remove(victim)
+            self.steals += 1
+        self.voices.append([ch, note, 0, -1])
+
+    def noteoff(self, ch, note):
+        for voice in self.voices:
+            if voice[0] == ch and voice[1] == note and voice[3] < 0:
+                voice[3] = 0
+
+    def get_samples(self, frames):
+        start = time.process_time()
+        out = np.zeros(frames, dtype=np.float32)
+        t = self._t[:frames]
+        alive = []
+        for voice in self.voices:
+            ch, note, phase, released = voice
+            step = 2.0 * np.pi * 440.0 * 2 ** ((note - 69) / 12.0) / RATE
+            out += np.sin(phase + step * t) * 0.01
+            voice[2] = phase + step * frames
+            if released >= 0:
+                voice[3] = released + frames
+                if voice[3] >= self.release_s * 2 ** (self.release_tc[ch] / 1200.0) * RATE:
+                    continue
+            alive.append(voice)
+        self.voices = alive
+        self.frames += frames
+        self.cpu_s += time.process_time() - start
+        return np.repeat((out * 32767).astype(np.int16), 2)
+
+    def _count(self, *args):
+        pass
+
+    cc = set_reverb = reverb_on = reverb_off = set_gain = program_select = _count
+
+
+class _Lib:
+    """The ``_FluidLib`` calls the voice manager makes, against ``_VoiceSynth``."""
+
+    @staticmethod
+    def set_gen(synth, ch, gen, value):
+        if gen == GEN_VOLENVRELEASE:
+            synth.release_tc[ch] = value
+        return 0
+
+    @staticmethod
+    def active_voices(synth):
+        return len(synth.voices)
+
+    @staticmethod
+    def set_polyphony(synth, polyphony):
+        synth.polyphony = polyphony
+        return 0
+
+
+def run(policy: VoicePolicy, seconds: float, hz: float, gate: float, release: float):
+    synth = _VoiceSynth(release, policy.polyphony)
+    engine = make_engine(synth=synth)
+    engine.offline = True
+    engine.dispatch_mode = "direct"
+    engine._lib = _Lib
+    engine.set_voice_policy(policy)
+    engine.set_pad_notes(PADS)
+
+    windows = []
+    last = [0.0]
+
+    def sample(e):
+        windows.append((len(synth.voices), synth.cpu_s - last[0]))
+        last[0] = synth.cpu_s
+
+    period = 1.0 / hz
+    events = []
+    for n in range(int(seconds * hz)):
+        for pad, note in enumerate(PADS):
+            t = n * period + pad * period / len(PADS)
+            events.append((t, Message("note_on", note=note, velocity=60 + (n + pad) % 50)))
+            events.append((t + gate, Message("note_off", note=note, velocity=0)))
+    events += [(i * WINDOW_S, sample) for i in range(1, int(seconds / WINDOW_S) + 1)]
+    engine.render(events, seconds)
+    per_second = int(round(1.0 / WINDOW_S))
+    rows = []
+    for i in range(0, len(windows), per_second):
+        chunk = windows[i:i + per_second]
+        voices = [v for v, _ in chunk]
+        rows.append((sum(voices) / len(voices), max(voices), sum(c for _, c in chunk) * 1000.0))
+    return rows, engine.voice_stats(), synth.steals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--hz", type=float, default=15.0, help="golpes por segundo por pad")
+    parser.add_argument("--gate", type=float, default=0.15, help="note_off tras el golpe (s)")
+    parser.add_argument("--release", type=float, default=3.0, help="release de las voces (s)")
+    parser.add_argument("--per-note", type=int, default=VoicePolicy().per_note)
+    parser.add_argument("--polyphony", type=int, default=VoicePolicy().polyphony)
+    parser.add_argument("--choke-tc", type=float, default=VoicePolicy().choke_tc)
+    args = parser.parse_args()
+
+    policies = {
+        "sin tope": VoicePolicy(per_note=0, polyphony=256),
+        "timbal": VoicePolicy(args.per_note, args.polyphony, args.choke_tc),
+    }
+    results = {name: run(p, args.seconds, args.hz, args.gate, args.release) for name, p in policies.items()}
+    names = list(policies)
+    print(f"redoble de {len(PADS)} pads a {args.hz:g} Hz, release {args.release:g} s")
+    print(f"{'seg':>4}" + "".join(f"{name + ' voces':>17}{'max':>5}{'CPU ms':>8}" for name in names))
+    for sec in range(len(results[names[0]][0])):
+        line = f"{sec + 1:4d}"
+        for name in names:
+            mean, peak, cpu = results[name][0][sec]
+            line += f"{mean:17.1f}{peak:5d}{cpu:8.1f}"
+        print(line)
+    for name in names:
+        rows, stats, steals = results[name]
+        cpu = [c for _, _, c in rows]
+        tail = cpu[len(cpu) // 2:]
+        print(
+            f"{name}: pico {stats['peak']} voces, {steals} robadas, {stats['chokes']} ahogos "
+            f"({stats['choked_hits']} golpes), CPU {sum(tail) / len(tail):.1f} ms por segundo de audio "
+            f"(segunda mitad)"
+        )
+
+
+if __name__ == "__main__":
+    main()
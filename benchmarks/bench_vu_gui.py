@@ -0,0 +1,154 @@
+"""GUI-thread cost of the pad VU meters: legacy QLabel bars vs VuMeter.
+
+Shows five meters, feeds them a drum-like level stream at the pads page polling
+rate (~30 Hz) and lets their own ballistics timers run. Meanwhile a probe timer
+that should fire every 5 ms records how late it actually fires, which is the
+delay a pad click would see waiting for the event loop. Reports the process
+CPU time per second and the probe lateness p50/p99/max, both while animating
+and at rest (no input: the shared frame clock should stop completely).
+
+Run from the repository root (``QT_QPA_PLATFORM=offscreen`` works headless)::
+
+    python -m benchmarks.bench_vu_gui --seconds 10
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import List
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QVBoxLayout, QWidget
+
+from app.ui.components.frame_clock import shared_clock
+from app.ui.components.vu_meter import VuMeter
+from benchmarks.bench_dispatch import percentile
+
+
+class LegacyVu(QWidget):
+    """The previous pads.py meter: 21 QLabels restyled on every 60 ms tick."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setMinimumSize(48, 320)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 6, 0, 6)
+        layout.setSpacing(4)
+        self.bars: List[QLabel] = []
+        for _ in range(21):
+            bar = QLabel()
+            bar.setFixedHeight(18)
+            bar.setStyleSheet("background:#2b3648;")
+            layout.addWidget(bar)
+            self.bars.append(bar)
+        layout.addStretch(1)
+        self.level = 0
+        self.timer = QTimer(self)
+        self.timer.setInterval(60)
+        self.timer.timeout.connect(self._tick)
+        self.timer.start()
+
+    def set_peak(self, peak: float) -> None:
+        self.level = max(self.level, int(peak * 189))
+
+    def _tick(self) -> None:
+        self.level = max(0, self.level - 6)
+        active = self.level // 9
+        for idx, bar in enumerate(reversed(self.bars)):
+            bar.setStyleSheet(
+                "background:#22c55e" if idx < active else "background:#2b3648;"
+            )
+
+
+def settle(app: QApplication, timeout: float = 5.0) -> None:
+    """Let meters left over from the previous run finish decaying."""
+    clock = shared_clock()
+    end = time.perf_counter() + timeout
+    while clock.is_running() and time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def run(app: QApplication, factory, seconds: float, animate: bool = True) -> dict:
+    settle(app)
+    window = QWidget()
+    row = QHBoxLayout(window)
+    meters = [factory() for _ in range(5)]
+    for meter in meters:
+        row.addWidget(meter)
+    window.resize(420, 520)
+    window.show()
+    app.processEvents()
+
+    rng = random.Random(3)
+    levels = [0.0] * len(meters)
+
+    def feed() -> None:
+        for idx, meter in enumerate(meters):
+            if rng.random() < 0.15:
+                levels[idx] = rng.uniform(0.4, 1.1)
+            else:
+                levels[idx] *= 0.8
+            meter.set_peak(levels[idx])
+
+    lateness = []
+    probe_period = 0.005
+    expected = [time.perf_counter() + probe_period]
+
+    def probe() -> None:
+        now = time.perf_counter()
+        lateness.append((now - expected[0]) * 1000.0)
+        expected[0] = now + probe_period
+
+    feeder = QTimer()
+    feeder.setInterval(33)
+    feeder.timeout.connect(feed)
+    prober = QTimer()
+    prober.setInterval(int(probe_period * 1000))
+    prober.timeout.connect(probe)
+
+    ticks0 = shared_clock().ticks
+    cpu0 = time.process_time()
+    if animate:
+        feeder.start()
+    prober.start()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.0005)
+    cpu = time.process_time() - cpu0
+    feeder.stop()
+    prober.stop()
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return {
+        "cpu_ms_per_s": cpu * 1000.0 / seconds,
+        "p50": percentile(lateness, 50),
+        "p99": percentile(lateness, 99),
+        "max": max(lateness) if lateness else 0.0,
+        "ticks": shared_clock().ticks - ticks0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'medidor':<10}{'estado':<10}{'CPU ms/s':>10}{'lat p50':>10}{'lat p99':>10}{'lat max':>10}{'ticks':>8}")
+    for name, factory in (("QLabel", LegacyVu), ("VuMeter", VuMeter)):
+        for animate in (True, False):
+            r = run(app, factory, args.seconds, animate)
+            state = "animado" if animate else "reposo"
+            print(
+                f"{name:<10}{state:<10}{r['cpu_ms_per_s']:10.1f}{r['p50']:10.2f}{r['p99']:10.2f}"
+                f"{r['max']:10.2f}{r['ticks']:8d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
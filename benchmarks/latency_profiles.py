@@ -0,0 +1,87 @@
+"""Offline measurement of the latency each buffer profile adds.
+
+Renders through FluidSynth without an audio driver (``get_samples``) in blocks
+of the profile's period size, issues a note_on at a block boundary and looks
+for the first output sample above the silence threshold. The reported total is
+the synthesis onset + the expected wait for the next block + the driver's
+output buffering (period size x periods), i.e. what the hit really costs once
+it reaches the synth.
+
+Run from the repository root::
+
+    python -m benchmarks.latency_profiles ruta/al/timbal.sf2 --note 57
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from app.audio.bootstrap_fluidsynth import bootstrap
+from app.audio.latency import LATENCY_PROFILES, buffer_latency_ms
+
+SILENCE = 64  # umbral en muestras int16 (~ -54 dBFS)
+
+
+def measure(fluidsynth, sf2: Path, profile: dict, note: int, velocity: int, trials: int) -> dict:
+    import numpy as np
+
+    rate = profile["sample_rate"]
+    period = profile["period_size"]
+    fs = fluidsynth.Synth(samplerate=float(rate))
+    try:
+        sid = fs.sfload(str(sf2))
+        if sid == -1:
+            raise RuntimeError(f"No se pudo cargar {sf2}")
+        fs.program_select(0, sid, 0, 0)
+        onsets = []
+        for _ in range(trials):
+            # bloques de silencio para vaciar colas y colas de reverb del golpe anterior
+            for _ in range(int(rate // period)):
+                fs.get_samples(period)
+            fs.noteon(0, note, velocity)
+            rendered = 0
+            onset = None
+            while onset is None and rendered < rate:
+                block = np.abs(np.asarray(fs.get_samples(period), dtype=np.int32))
+                loud = np.flatnonzero(block > SILENCE)
+                if loud.size:
+                    onset = rendered + int(loud[0]) // 2  # intercalado estereo
+                rendered += period
+            fs.noteoff(0, note)
+            if onset is not None:
+                onsets.append(onset)
+    finally:
+        fs.delete()
+    if not onsets:
+        raise RuntimeError("La nota no produjo audio audible")
+    onset_ms = sum(onsets) / len(onsets) * 1000.0 / rate
+    block_wait_ms = period / 2 * 1000.0 / rate
+    buffer_ms = buffer_latency_ms(profile)
+    return {
+        "onset_ms": onset_ms,
+        "block_wait_ms": block_wait_ms,
+        "buffer_ms": buffer_ms,
+        "total_ms": onset_ms + block_wait_ms + buffer_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sf2", type=Path)
+    parser.add_argument("--note", type=int, default=57)
+    parser.add_argument("--velocity", type=int, default=110)
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+
+    fluidsynth = bootstrap()
+    print(f"{'perfil':<10}{'onset':>9}{'espera':>9}{'buffer':>9}{'total':>9}  (ms)")
+    for name, profile in LATENCY_PROFILES.items():
+        r = measure(fluidsynth, args.sf2, profile, args.note, args.velocity, args.trials)
+        print(
+            f"{name:<10}{r['onset_ms']:9.2f}{r['block_wait_ms']:9.2f}"
+            f"{r['buffer_ms']:9.2f}{r['total_ms']:9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Engine benchmark suite: hit streams through ``SoundEngine``, results as JSON.
+
+Drives the real engine (``engine_legacy.SoundEngine``, ring dispatch) with
+synthetic hit streams on two synth backends:
+
+* ``dummy``: the ``_DummyFS`` of ``app/audio/engine.py`` (without its prints),
+  so the numbers are the engine's own dispatch cost;
+* ``fluidsynth``: the real library with a live audio driver, plus an offline
+  engine (``offline=True``) rendering the same stream for the real-time factor
+  and the peak voice count. Skipped when FluidSynth or a driver is missing.
+
+Streams (``STREAMS``): single hits, 5-pad rolls at 8, 12 and 15 Hz per pad (the
+firmware tremolo range), flams (grace note 20 ms before the main hit) and a
+burst of events pushed as fast as possible. For each one: events per second,
+enqueue -> noteon latency (percentiles and a histogram), CPU time per hit
+and, with FluidSynth, real-time factor and peak voices.
+
+``--json`` saves everything with the commit and platform; ``--compare`` reads a
+previous file and flags metrics that got more than ``--tolerance`` worse.
+
+Run from the repository root::
+
+    python -m benchmarks.suite --seconds 5 --json bench.json --compare base.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from mido import Message
+
+from app.audio.dispatch import EV_ON
+from app.audio.engine import _DummyFS
+from app.audio.engine_legacy import SoundEngine
+from benchmarks.bench_dispatch import percentile
+from benchmarks.bench_scenes import make_engine
+from benchmarks.bench_sf2_memory import PADS, write_timpani_sf2
+
+HIST_EDGES_US = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+BURST_EVENTS = 20000
+# metricas donde subir es empeorar / donde bajar es empeorar
+WORSE_UP = ("lat_p50_us", "lat_p99_us", "cpu_per_hit_us")
+WORSE_DOWN = ("events_per_s", "realtime_factor")
+
+
+def single(seconds: float):
+    return [(n * 0.5, PADS[2], 100) for n in range(int(seconds * 2))]
+
+
+def roll(hz: float):
+    def stream(seconds: float):
+        period = 1.0 / hz
+        hits = []
+        for n in range(int(seconds * hz)):
+            for pad, note in enumerate(PADS):
+                hits.append((n * period + pad * period / len(PADS), note, 60 + (n + pad) % 50))
+        return hits
+
+    return stream
+
+
+def flams(seconds: float):
+    hits = []
+    for n in range(int(seconds * 4)):
+        t = n * 0.25
+        note = PADS[n % len(PADS)]
+        hits.append((t, note, 50))
+        hits.append((t + 0.020, note, 110))
+    return hits
+
+
+STREAMS = {
+    "golpe": single,
+    "redoble_8hz": roll(8.0),
+    "redoble_12hz": roll(12.0),
+    "redoble_15hz": roll(15.0),
+    "flam": flams,
+}
+
+
+class _QuietDummy(_DummyFS):
+    """``_DummyFS`` without the per-note prints (they would dominate the timing)."""
+
+    def noteon(self, ch, note, vel):
+        pass
+
+    def noteoff(self, ch, note):
+        pass
+
+
+class _Probe:
+    """Wraps ``SoundEngine._play_event`` to record enqueue -> noteon latency."""
+
+    def __init__(self, engine: SoundEngine) -> None:
+        self.engine = engine
+        self.latencies_ns = []
+        self.events = 0
+        self.drained = threading.Event()
+        self.expected = 0
+        play = engine._play_event
+
+        def recorded(kind, note, vel, stamp):
+            play(kind, note, vel, stamp)
+            now = time.perf_counter_ns()
+            if kind == EV_ON and stamp:
+                self.latencies_ns.append(now - stamp)
+            self.events += 1
+            if self.events >= self.expected:
+                self.drained.set()
+
+        engine._play_event = recorded
+
+    def reset(self, expected: int) -> None:
+        self.latencies_ns = []
+        self.events = 0
+        self.expected = expected
+        self.drained.clear()
+
+
+def histogram(latencies_us):
+    counts = [0] * (len(HIST_EDGES_US) + 1)
+    for value in latencies_us:
+        for i, edge in enumerate(HIST_EDGES_US):
+            if value <= edge:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={edge}" for edge in HIST_EDGES_US] + [f">{HIST_EDGES_US[-1]}"]
+    return dict(zip(labels, counts))
+
+
+def play_stream(engine: SoundEngine, probe: _Probe, hits, gate: float = 0.15) -> dict:
+    """Play ``hits`` in real time (note_off ``gate`` s later); return the dispatch metrics."""
+    events = sorted(
+        [(t, Message("note_on", note=n, velocity=v)) for t, n, v in hits]
+        + [(t + gate, Message("note_off", note=n, velocity=0)) for t, n, _ in hits],
+        key=lambda e: e[0],
+    )
+    probe.reset(len(events))
+    cpu0 = time.process_time()
+    start = time.perf_counter()
+    for due, msg in events:
+        delay = start + due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        engine.disparar(msg)
+    probe.drained.wait(2.0)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu0
+    return _metrics(probe, wall, cpu, len(hits))
+
+
+def burst(engine: SoundEngine, probe: _Probe, count: int = BURST_EVENTS) -> dict:
+    """Push ``count`` events back to back; events/s is what the render thread keeps up with."""
+    on = [Message("note_on", note=PADS[i % len(PADS)], velocity=100) for i in range(count // 2)]
+    off = [Message("note_off", note=PADS[i % len(PADS)], velocity=0) for i in range(count // 2)]
+    probe.reset(count)
+    dropped = engine.ring.dropped
+    cpu0 = time.process_time()
+    start = time.perf_counter()
+    for a, b in zip(on, off):
+        engine.disparar(a)
+        engine.disparar(b)
+    # el anillo lleno descarta eventos: se espera a los que entraron
+    deadline = start + 10.0
+    while probe.events + engine.ring.dropped - dropped < count and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu0
+    result = _metrics(probe, wall, cpu, count // 2)
+    result["dropped"] = engine.ring.dropped - dropped
+    return result
+
+
+def _metrics(probe: _Probe, wall: float, cpu: float, hits: int) -> dict:
+    lat = [ns / 1000.0 for ns in probe.latencies_ns]
+    return {
+        "hits": hits,
+        "events": probe.events,
+        "events_per_s": probe.events / wall if wall > 0 else 0.0,
+        "lat_p50_us": percentile(lat, 50),
+        "lat_p95_us": percentile(lat, 95),
+        "lat_p99_us": percentile(lat, 99),
+        "lat_max_us": max(lat) if lat else 0.0,
+        "lat_hist_us": histogram(lat),
+        "cpu_per_hit_us": cpu / hits * 1e6 if hits else 0.0,
+    }
+
+
+def offline_metrics(offline: SoundEngine, hits, seconds: float, gate: float = 0.15) -> dict:
+    events = [(t, Message("note_on", note=n, velocity=v)) for t, n, v in hits]
+    events += [(t + gate, Message("note_off", note=n, velocity=0)) for t, n, _ in hits]
+    result = offline.render(events, seconds + 1.0)
+    return {
+        "realtime_factor": result.realtime_factor,
+        "peak_voices": result.peak_voices,
+        "voices_per_s": result.voices_per_second,
+    }
+
+
+def run_backend(name: str, engine: SoundEngine, offline: SoundEngine | None, seconds: float) -> list:
+    probe = _Probe(engine)
+    rows = []
+    for stream, make in STREAMS.items():
+        hits = make(seconds)
+        metrics = play_stream(engine, probe, hits)
+        if offline is not None:
+            metrics.update(offline_metrics(offline, hits, seconds))
+        rows.append({"backend": name, "stream": stream, **metrics})
+        print(_line(rows[-1]))
+    rows.append({"backend": name, "stream": "rafaga", **burst(engine, probe)})
+    print(_line(rows[-1]))
+    return rows
+
+
+def fluidsynth_engines(sf2: Path | None, tmp: Path):
+    if sf2 is None:
+        sf2 = tmp / "timbales.sf2"
+        write_timpani_sf2(sf2, 32, 1, 6, 3)
+    try:
+        live = SoundEngine(sf2)
+        if not live.wait_ready(30.0):
+            return None, None, "FluidSynth no arranco"
+    except Exception as exc:
+        return None, None, str(exc)
+    try:
+        offline = SoundEngine(sf2, offline=True)
+        offline.wait_ready(30.0)
+    except Exception as exc:
+        print(f"fluidsynth: sin render offline ({exc})")
+        offline = None
+    return live, offline, None
+
+
+def _line(row: dict) -> str:
+    text = (
+        f"{row['backend']:<11}{row['stream']:<14}{row['events_per_s']:10.0f}"
+        f"{row['lat_p50_us']:9.1f}{row['lat_p99_us']:9.1f}{row['lat_max_us']:10.1f}{row['cpu_per_hit_us']:13.1f}"
+    )
+    if "realtime_factor" in row:
+        text += f"{row['realtime_factor']:9.1f}{row['peak_voices']:7d}"
+    return text
+
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or "?"
+    except Exception:
+        return "?"
+
+
+def compare(rows: list, baseline_path: Path, tolerance: float) -> int:
+    """Print metrics worse than ``baseline`` by more than ``tolerance``; return how many."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    old = {(r["backend"], r["stream"]): r for r in baseline.get("results", [])}
+    worse = 0
+    print(f"comparado con {baseline_path} ({baseline.get('commit', '?')}):")
+    for row in rows:
+        prev = old.get((row["backend"], row["stream"]))
+        if prev is None:
+            continue
+        for key in WORSE_UP + WORSE_DOWN:
+            if key not in row or not prev.get(key):
+                continue
+            change = (row[key] - prev[key]) / prev[key]
+            if (key in WORSE_UP and change > tolerance) or (key in WORSE_DOWN and change < -tolerance):
+                worse += 1
+                print(f"  PEOR {row['backend']}/{row['stream']} {key}: {prev[key]:.1f} -> {row[key]:.1f} ({change:+.0%})")
+    if not worse:
+        print("  sin regresiones")
+    return worse
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="duracion de cada secuencia")
+    parser.add_argument("--backend", choices=("dummy", "fluidsynth", "all"), default="all")
+    parser.add_argument("--sf2", type=Path, default=None, help="SoundFont real (por defecto uno sintetico)")
+    parser.add_argument("--json", type=Path, default=None, help="guardar resultados")
+    parser.add_argument("--compare", type=Path, default=None, help="resultados anteriores")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(
+        f"{'backend':<11}{'secuencia':<14}{'eventos/s':>10}{'p50 us':>9}{'p99 us':>9}{'max us':>10}"
+        f"{'CPU/golpe us':>13}{'x t.real':>9}{'voces':>7}"
+    )
+    rows = []
+    skipped = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.backend in ("dummy", "all"):
+            rows += run_backend("dummy", make_engine(synth=_QuietDummy()), None, args.seconds)
+        if args.backend in ("fluidsynth", "all"):
+            live, offline, error = fluidsynth_engines(args.sf2, Path(tmp))
+            if live is None:
+                skipped["fluidsynth"] = error
+                print(f"fluidsynth: omitido ({error})")
+            else:
+                rows += run_backend("fluidsynth", live, offline, args.seconds)
+
+    if args.json is not None:
+        doc = {
+            "commit": _commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "platform": platform.platform(),
+            "python": sys.version.split()[0],
+            "seconds": args.seconds,
+            "skipped": skipped,
+            "results": rows,
+        }
+        args.json.write_text(json.dumps(doc, indent=1), encoding="utf-8")
+        print(f"JSON: {args.json}")
+    if args.compare is not None:
+        if compare(rows, args.compare, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,25 @@
 
 import sys, argparse
 
+from app.startup import PROFILE
+
 def main():
     parser = argparse.ArgumentParser(description="Timbal Digital (legacy/new UI)")
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--legacy-ui", action="store_true", help="Iniciar la UI tradicional.")
     group.add_argument("--new-ui", action="store_true", help="Iniciar la UI nueva (refactor).")
+    parser.add_argument("--profile-startup", action="store_true", help="Mostrar el tiempo de cada fase del arranque.")
     args = parser.parse_args()
+    if args.profile_startup:
+        PROFILE.enable()
 
     if args.legacy_ui or not args.new_ui:
         from legacy.legacy_app import main as legacy_main
+        PROFILE.mark("imports")
         legacy_main()
     else:
         from app.ui.main_window import run_new_ui
+        PROFILE.mark("imports")
         run_new_ui()
 
 if __name__ == "__main__":